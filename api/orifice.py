@@ -9,12 +9,22 @@ In a production environment:
 - All socket/simulator code would be replaced with calls to the device's native API
 
 This implementation provides:
-1. A fallback simulator UI when no joystick is found (for development without hardware)
+1. A fallback simulator UI when no joystick is found (for development without hardware),
+   fed over TCP or a shared-memory ring, or an in-process synthetic waveform generator
+   for headless stress tests
 2. A consistent API interface that works the same in both mock and real environments
+3. Signal conditioning (calibration, dead-zone, One-Euro filtering) applied to every raw sample
+
+Calibration: `python -m api.orifice --calibrate` records the raw range while the device is moved
+through its full travel and saves it for that device in config/orifice_calibration.json.
 
 Usage:
     device = orifice.Orifice()
-    depth = device.depth  # 0-1024 range
+    # Once per frame, in the main loop:
+    for event in pygame.event.get():
+        device.handle_event(event)
+    device.latch()
+    depth = device.depth  # 0-1024 range, the same value for the whole frame
     # Remember to call device.close() when done
 """
 
@@ -25,14 +35,156 @@ import socket
 import threading
 import time
 import logging
+import json
+import math
+from collections import deque
+
+from api.shared_depth import SharedDepthRing
+from api.synthetic_depth import SyntheticDepthGenerator
 
-# Configure logging
+# The application configures handlers; importing the API must not
 logger = logging.getLogger('orifice.api')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+
+# Posted to the pygame event queue whenever the depth changes, from any backend,
+# so an idle main loop blocked in pygame.event.wait() wakes up immediately.
+DEPTHCHANGED = pygame.event.custom_type()
+
+JOYSTICK_DEPTH_AXIS = 1
+SAMPLE_BUFFER_SIZE = 256  # Most recent (timestamp, depth) samples kept in Orifice.samples
+MAX_DEPTH = 1024
+BACKENDS = ('auto', 'joystick', 'simulator', 'socket', 'shared_memory', 'synthetic')
+HOLD_INTERVAL = 0.005  # Re-feed the last raw value this often (s) so the filter settles when the input stops changing
+SAMPLE_LOG_INTERVAL = 5.0  # Seconds between summaries of received samples; the reader never logs per sample
+RING_WATCH_INTERVAL = 0.002  # Seconds between checks for new shared-memory input while the game may be idle
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'orifice_calibration.json')
+
+class DepthConditioner:
+    """
+    Streaming conditioning for raw depth samples
+    
+    Each sample goes through, in O(1):
+    1. Calibration: the device's raw min/max are stretched to 0-1024
+    2. Dead-zone: readings within dead_zone of either end snap to exactly 0 or 1024,
+       so a resting sensor reads a clean 0 rather than jittering around it
+    3. One-Euro filter: a low-pass whose cutoff rises with speed, smoothing jitter at
+       rest while keeping fast strokes responsive. It also yields a velocity estimate.
+    
+    The lag the filter adds is tracked while the signal is moving so min_cutoff and
+    beta can be tuned against it (see report()).
+    """
+    
+    MOTION_THRESHOLD = 50.0  # depth units/s above which lag is measured
+    
+    def __init__(self, raw_min=0.0, raw_max=MAX_DEPTH, dead_zone=8.0, min_cutoff=1.5, beta=0.01, d_cutoff=1.0):
+        """
+        Args:
+            raw_min (float): Raw reading at full retraction
+            raw_max (float): Raw reading at full insertion
+            dead_zone (float): Snap distance at each end, in output depth units
+            min_cutoff (float): Filter cutoff (Hz) at rest. Lower = smoother, laggier
+            beta (float): Cutoff increase per depth unit/s of speed. Higher = less lag on fast strokes
+            d_cutoff (float): Cutoff (Hz) for the velocity estimate
+        """
+        self.raw_min = raw_min
+        self.raw_max = raw_max
+        self.dead_zone = dead_zone
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.velocity = 0.0
+        self._value = None
+        self._timestamp = None
+        self._observed_min = None
+        self._observed_max = None
+        self._lag_ema = 0.0
+        self._lag_max = 0.0
+        self._cost_ema = 0.0
+        self.samples_processed = 0
+        
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+        
+    def process(self, raw, timestamp):
+        """
+        Condition one raw sample
+        
+        Args:
+            raw (float): Raw device reading
+            timestamp (float): time.monotonic() of the reading
+            
+        Returns:
+            int: Conditioned depth between 0-1024
+        """
+        started = time.perf_counter()
+        if self._observed_min is not None:
+            self._observed_min = min(self._observed_min, raw)
+            self._observed_max = max(self._observed_max, raw)
+        span = self.raw_max - self.raw_min
+        x = (raw - self.raw_min) / span * MAX_DEPTH if span else 0.0
+        x = max(0.0, min(float(MAX_DEPTH), x))
+        if self._value is None:
+            self._value = x
+        else:
+            dt = timestamp - self._timestamp
+            if dt > 0:
+                raw_velocity = (x - self._value) / dt
+                self.velocity += self._alpha(self.d_cutoff, dt) * (raw_velocity - self.velocity)
+                cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+                self._value += self._alpha(cutoff, dt) * (x - self._value)
+                if abs(raw_velocity) > self.MOTION_THRESHOLD and abs(self.velocity) > self.MOTION_THRESHOLD:
+                    lag = abs(x - self._value) / abs(self.velocity)  # Seconds the output trails the input
+                    self._lag_ema += 0.05 * (lag - self._lag_ema)
+                    self._lag_max = max(self._lag_max, lag)
+        self._timestamp = timestamp
+        # Dead-zone: snap the ends, stretch what's left back over the full range
+        usable = MAX_DEPTH - 2.0 * self.dead_zone
+        depth = (self._value - self.dead_zone) / usable * MAX_DEPTH if usable > 0 else self._value
+        depth = int(round(max(0.0, min(float(MAX_DEPTH), depth))))
+        self._cost_ema += 0.05 * ((time.perf_counter() - started) - self._cost_ema)
+        self.samples_processed += 1
+        return depth
+        
+    def start_calibration(self):
+        """Begin recording the raw range. Move the device through its full travel, then call finish_calibration()."""
+        self._observed_min = float('inf')
+        self._observed_max = float('-inf')
+        
+    def finish_calibration(self):
+        """
+        Adopt the raw range seen since start_calibration()
+        
+        Returns:
+            bool: False if too few samples arrived to calibrate
+        """
+        observed_min, observed_max = self._observed_min, self._observed_max
+        self._observed_min = self._observed_max = None
+        if observed_min is None or not observed_max > observed_min:
+            logger.warning("Calibration failed: the device did not move")
+            return False
+        self.raw_min, self.raw_max = observed_min, observed_max
+        logger.info(f"Calibrated raw range {self.raw_min}-{self.raw_max}")
+        return True
+        
+    def report(self):
+        """
+        Latency added by conditioning
+        
+        Returns:
+            dict: filter_lag_ms (smoothed lag while moving), filter_lag_max_ms,
+                  processing_us (average cost per sample), samples
+        """
+        return {
+            'filter_lag_ms': self._lag_ema * 1000.0,
+            'filter_lag_max_ms': self._lag_max * 1000.0,
+            'processing_us': self._cost_ema * 1e6,
+            'samples': self.samples_processed
+        }
+        
+    def settings(self):
+        return {'raw_min': self.raw_min, 'raw_max': self.raw_max, 'dead_zone': self.dead_zone,
+                'min_cutoff': self.min_cutoff, 'beta': self.beta, 'd_cutoff': self.d_cutoff}
 
 class Orifice:
     """
@@ -40,19 +192,32 @@ class Orifice:
     
     This class provides access to depth/penetration values either from:
     - A connected joystick (simulating a hardware device)
-    - The slider simulator (when no joystick is present)
+    - The slider simulator (when no joystick is present), over TCP or shared memory
+    - A synthetic waveform generator (backend='synthetic')
     
     In production deployment, this would connect to the actual Orifice
     hardware and its depth sensor, not a simulator.
     """
     
-    def __init__(self, host='127.0.0.1', port=12345):
+    def __init__(self, host='127.0.0.1', port=12345, conditioner=None, backend=None, synthetic=None, shared_memory_name=None):
         """
         Initialize the Orifice interface
         
         Args:
             host (str): Host for simulator socket connection (mock mode only)
             port (int): Port for simulator socket connection (mock mode only)
+                The socket backend connects to host:port without launching the simulator,
+                for a SliderServer (or a hardware bridge) that is already listening there.
+            conditioner (DepthConditioner): Signal conditioning to use instead of the
+                settings saved for this device in config/orifice_calibration.json
+            backend (str): One of BACKENDS. Defaults to the ORIFICE_BACKEND environment
+                variable, then 'auto' (joystick if present, else the slider simulator)
+            synthetic (SyntheticDepthGenerator): Generator for the synthetic backend. Defaults
+                to one built from the ORIFICE_SYNTHETIC spec, e.g. "sine:hz=2,rate=2000"
+            shared_memory_name (str): Name for the shared_memory backend's ring. Defaults to
+                ORIFICE_SHM_NAME. When set, an external producer (e.g. a hardware bridge) is
+                expected to attach to it; when unset, the slider simulator is launched on a
+                randomly named ring.
         """
         logger.info("Initializing Orifice API")
         pygame.init()
@@ -60,28 +225,75 @@ class Orifice:
 
         self.joystick_available = False
         self.depth_value = 0
+        self.latched_depth = None  # Per-frame snapshot set by latch()
+        self.samples = deque(maxlen=SAMPLE_BUFFER_SIZE)  # (time.monotonic(), depth) history
         self.socket_connected = False
         self.running = True
         self._depth_lock = threading.Lock()  # Thread safety
+        self._last_raw = None
+        self._last_raw_time = 0.0
+        self.samples_received = 0  # Raw readings from the device, not counting held repeats; read by the game's metrics
+        self.last_sample_time = None  # time.monotonic() of the latest of them
+        self._change_posted = False
+        self._change_time = None  # Timestamp of the first sample since the last latch() that changed the depth
+        self.latched_change_time = None  # The same for the depth latch() snapshotted, or None if it did not change
+        self.synthetic = None
+        self.ring = None  # SharedDepthRing for the shared_memory backend, drained in latch()
+
+        backend = backend or os.environ.get('ORIFICE_BACKEND', 'auto')
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Orifice backend '{backend}'. Expected one of {BACKENDS}")
+        if backend == 'joystick' and pygame.joystick.get_count() == 0:
+            raise RuntimeError("Joystick backend requested but no joystick is connected")
 
-        if pygame.joystick.get_count() > 0:
+        self.backend = 'socket' if backend in ('auto', 'simulator') else backend  # Refined below; names the input path in latency reports
+        if backend == 'synthetic':
+            self.synthetic = synthetic or SyntheticDepthGenerator.from_spec(os.environ.get('ORIFICE_SYNTHETIC', 'sine'))
+            self.device_name = 'synthetic'
+            self.conditioner = conditioner or self._load_conditioner(self.device_name)
+            self.synthetic.start(self._add_raw_sample)
+        elif backend == 'shared_memory':
+            shared_memory_name = shared_memory_name or os.environ.get('ORIFICE_SHM_NAME')
+            self.device_name = 'slider_simulator' if shared_memory_name is None else shared_memory_name
+            self.conditioner = conditioner or self._load_conditioner(self.device_name)
+            self.ring = SharedDepthRing.create(shared_memory_name)
+            if shared_memory_name is None:
+                logger.info("Launching slider simulator on shared memory")
+                try:
+                    subprocess.Popen(["python3", "api/slider_simulator.py", "--shared-memory", self.ring.name])
+                    logger.debug("Slider simulator process started")
+                except Exception as e:
+                    logger.error(f"Failed to start slider simulator: {e}")
+            else:
+                logger.info(f"Waiting for a producer on depth ring '{self.ring.name}'")
+            self.ring_watcher = threading.Thread(target=self._watch_ring, name='depth-ring-watcher', daemon=True)
+            self.ring_watcher.start()
+        elif backend not in ('simulator', 'socket') and pygame.joystick.get_count() > 0:
             # Using joystick as input method (closer to real hardware)
             self.joystick = pygame.joystick.Joystick(0)
             self.joystick.init()
             self.joystick_available = True
-            logger.info(f"Using joystick: {self.joystick.get_name()}")
+            self.backend = 'joystick'
+            self.device_name = self.joystick.get_name()
+            self.conditioner = conditioner or self._load_conditioner(self.device_name)
+            pygame.event.pump()
+            self._add_raw_sample(self._axis_to_raw(self.joystick.get_axis(JOYSTICK_DEPTH_AXIS)))  # Seed the cache; events take over from here
+            logger.info(f"Using joystick: {self.device_name}")
         else:
-            # No joystick: launch slider simulator
-            # NOTE: In production, this would connect to the actual device instead
-            logger.info("No joystick found, launching slider simulator")
-            try:
-                subprocess.Popen(["python3", "api/slider_simulator.py"])
-                logger.debug("Slider simulator process started")
-            except Exception as e:
-                logger.error(f"Failed to start slider simulator: {e}")
-                
-            # Give the server a moment to start
-            time.sleep(0.2)
+            self.device_name = 'slider_simulator'
+            self.conditioner = conditioner or self._load_conditioner(self.device_name)
+            if backend != 'socket':
+                # No joystick: launch slider simulator
+                # NOTE: In production, this would connect to the actual device instead
+                logger.info("No joystick found, launching slider simulator")
+                try:
+                    subprocess.Popen(["python3", "api/slider_simulator.py"])
+                    logger.debug("Slider simulator process started")
+                except Exception as e:
+                    logger.error(f"Failed to start slider simulator: {e}")
+
+                # Give the server a moment to start
+                time.sleep(0.2)
             
             # Start socket connection in a separate thread
             logger.debug(f"Connecting to simulator on {host}:{port}")
@@ -110,6 +322,7 @@ class Orifice:
             try:
                 self.client_socket.connect((host, port))
                 self.socket_connected = True
+                self.backend = 'socket'
                 logger.info(f"Connected to simulator on attempt {attempt+1}")
                 break
             except socket.error as e:
@@ -120,6 +333,9 @@ class Orifice:
             logger.info("Setting socket to non-blocking mode")
             self.client_socket.setblocking(0)  # Non-blocking for better performance
             buffer = ""
+            received = invalid = 0
+            new_value = None
+            summary_time = time.monotonic()
             
             while self.running:
                 try:
@@ -130,24 +346,32 @@ class Orifice:
                         while "\n" in buffer:
                             line, buffer = buffer.split("\n", 1)
                             try:
-                                with self._depth_lock:
-                                    new_value = int(line)
-                                    logger.debug(f"Received depth value: {new_value}")
-                                    self.depth_value = new_value
+                                new_value = int(line)
+                                self._add_raw_sample(new_value)
+                                received += 1
                             except ValueError:
-                                logger.error(f"Received invalid depth value: '{line}'")
+                                invalid += 1
+                                if invalid == 1:  # Later ones in this interval are only counted
+                                    logger.error("Received invalid depth value: %r", line)
                         # If no newline but we have data, process it
                         if buffer:
                             try:
-                                with self._depth_lock:
-                                    new_value = int(buffer)
-                                    logger.debug(f"Received depth value: {new_value}")
-                                    self.depth_value = new_value
+                                new_value = int(buffer)
+                                self._add_raw_sample(new_value)
+                                received += 1
                                 buffer = ""
                             except ValueError:
                                 pass  # Incomplete number, wait for more data
+                        now = time.monotonic()
+                        if now - summary_time >= SAMPLE_LOG_INTERVAL:
+                            if invalid > 1:
+                                logger.error("%d more invalid depth values in the last %.1fs", invalid - 1, now - summary_time)
+                            logger.debug("Received %d depth values in the last %.1fs (latest %s)", received, now - summary_time, new_value)
+                            received = invalid = 0
+                            summary_time = now
                 except BlockingIOError:
                     # No data available right now, no problem
+                    self._hold_sample()
                     time.sleep(0.001)
                 except Exception as e:
                     # Other errors, including disconnection
@@ -156,6 +380,146 @@ class Orifice:
         else:
             logger.error("Failed to connect to simulator after 5 attempts")
 
+    @staticmethod
+    def _axis_to_raw(y_axis):
+        y_axis = max(-1.0, min(1.0, y_axis))  # Clamp it clean
+        return (y_axis + 1.0) * 512  # Map to 0–1024, unquantized; the conditioner rounds
+        
+    @staticmethod
+    def _load_conditioner(device_name):
+        """Build a DepthConditioner from the settings saved for device_name, or defaults"""
+        try:
+            with open(CALIBRATION_PATH, 'r') as f:
+                settings = json.load(f).get(device_name, {})
+            logger.info(f"Loaded conditioning settings for {device_name}")
+            return DepthConditioner(**settings)
+        except FileNotFoundError:
+            return DepthConditioner()
+        except Exception as e:
+            logger.error(f"Ignoring unreadable calibration file {CALIBRATION_PATH}: {e}")
+            return DepthConditioner()
+            
+    def save_calibration(self):
+        """Store this device's conditioning settings in config/orifice_calibration.json"""
+        try:
+            with open(CALIBRATION_PATH, 'r') as f:
+                all_settings = json.load(f)
+        except (FileNotFoundError, ValueError):
+            all_settings = {}
+        all_settings[self.device_name] = self.conditioner.settings()
+        os.makedirs(os.path.dirname(CALIBRATION_PATH), exist_ok=True)
+        with open(CALIBRATION_PATH, 'w') as f:
+            json.dump(all_settings, f, indent=4)
+        logger.info(f"Saved conditioning settings for {self.device_name}")
+        
+    def _add_raw_sample(self, raw, timestamp=None, held=False):
+        """
+        Condition a raw reading and store the result. Runs on whichever thread receives the sample.
+        
+        Args:
+            raw (float): Raw device reading
+            timestamp (float): When it was taken, time.monotonic() based. Defaults to now;
+                synthetic sources pass their own so filtering is reproducible.
+            held (bool): A repeat of the last reading rather than a new one from the device
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        self._last_raw, self._last_raw_time = raw, time.monotonic()
+        if not held:
+            self.samples_received += 1
+            self.last_sample_time = self._last_raw_time
+        self._set_depth(self.conditioner.process(raw, now), now)
+        
+    def _hold_sample(self):
+        """Repeat the last raw reading while the input is still, so the filter output settles on it"""
+        if self._last_raw is not None and time.monotonic() - self._last_raw_time >= HOLD_INTERVAL:
+            self._add_raw_sample(self._last_raw, held=True)
+
+    def _watch_ring(self):
+        """
+        Post DEPTHCHANGED when the producer writes a new raw value, so an idle main loop blocked in
+        pygame.event.wait() wakes at once. Nothing else reads the samples until latch() drains them
+        (the event carries no depth), and at most one event is pending until the next latch().
+        """
+        last_raw = self.ring.latest_raw()
+        while self.running:
+            time.sleep(RING_WATCH_INTERVAL)
+            raw = self.ring.latest_raw()
+            if raw is None or raw == last_raw:
+                continue
+            last_raw = raw
+            with self._depth_lock:
+                post = not self._change_posted
+                self._change_posted = True
+            if post:
+                try:
+                    pygame.event.post(pygame.event.Event(DEPTHCHANGED))
+                except pygame.error:
+                    pass
+
+    def _drain_ring(self):
+        """Condition every sample the shared-memory producer wrote since the last frame"""
+        for timestamp, raw in self.ring.read_new():
+            self._add_raw_sample(raw, timestamp)
+
+    def _set_depth(self, value, timestamp):
+        """
+        Store a new conditioned depth sample from any backend
+        
+        Records the sample and, if the value changed, posts DEPTHCHANGED
+        (at most one until the next latch(), however fast samples arrive).
+        Safe to call from the socket reader thread.
+        """
+        with self._depth_lock:
+            changed = value != self.depth_value
+            if changed and self._change_time is None:
+                self._change_time = timestamp
+            self.depth_value = value
+            self.samples.append((timestamp, value))
+            post = changed and not self._change_posted
+            if post:
+                self._change_posted = True  # One pending event is enough to wake the loop; latch() re-arms it
+        if post:
+            try:
+                pygame.event.post(pygame.event.Event(DEPTHCHANGED, depth=value))
+            except pygame.error:
+                pass  # Event system not up (or already shut down); nothing is waiting on it
+
+    def handle_event(self, event):
+        """
+        Feed a pygame event to the device
+        
+        The joystick backend reads depth from JOYAXISMOTION events here instead of
+        pumping the event queue on every read. Call it for every event the main loop gets.
+        """
+        if (self.joystick_available and event.type == pygame.JOYAXISMOTION
+                and event.axis == JOYSTICK_DEPTH_AXIS and event.instance_id == self.joystick.get_instance_id()):
+            self._add_raw_sample(self._axis_to_raw(event.value))
+
+    def latch(self):
+        """
+        Snapshot the current depth for this frame
+        
+        Until the next latch(), depth returns the snapshot, so every screen reading it
+        during one frame sees the same value even while the socket thread keeps updating.
+        
+        The shared_memory backend has no reader thread: its samples are drained here.
+        
+        latched_change_time is set to when the snapshotted depth started to differ from the
+        previous snapshot (the timestamp of the first changing sample), for input latency tracing.
+        Sample timestamps are taken where the sample enters the game: the producer's clock for
+        synthetic and shared memory input, arrival for socket and joystick input.
+        """
+        if self.ring is not None:
+            self._drain_ring()
+        if self.joystick_available or self.ring is not None:
+            self._hold_sample()  # No samples arrive while the input is still
+        with self._depth_lock:
+            changed = self.depth_value != self.latched_depth
+            self.latched_change_time = self._change_time if changed else None
+            self._change_time = None
+            self.latched_depth = self.depth_value
+            self._change_posted = False
+
     def get_depth(self):
         """
         Get the current depth/penetration value
@@ -163,19 +527,29 @@ class Orifice:
         In the real implementation, this would read from the physical device.
         
         Returns:
-            int: Depth value between 0-1024
+            int: Depth value between 0-1024 (the latched value once latch() has been called)
         """
-        if self.joystick_available:
-            pygame.event.pump()
-            y_axis = self.joystick.get_axis(1)  # always -1.0 to 1.0
-            y_axis = max(-1.0, min(1.0, y_axis))  # Clamp it clean
-            penetration = int((y_axis + 1.0) * 512)  # Map to 0–1024
-            logger.debug(f"Joystick depth value: {penetration}")
-            return penetration
-        else:
-            with self._depth_lock:
-                logger.debug(f"Simulator depth value: {self.depth_value}")
-                return self.depth_value
+        if self.latched_depth is not None:
+            return self.latched_depth
+        with self._depth_lock:
+            return self.depth_value
+
+    def sample_age(self):
+        """
+        Seconds since the device last delivered a reading, or None before the first one
+        
+        A still joystick or slider sends nothing, so a growing age alone is not a fault.
+        """
+        if self.last_sample_time is None:
+            return None
+        return time.monotonic() - self.last_sample_time
+
+    @property
+    def velocity(self):
+        """
+        Filtered depth velocity, in depth units per second (positive = inserting)
+        """
+        return self.conditioner.velocity
 
     @property
     def depth(self):
@@ -196,7 +570,20 @@ class Orifice:
         This method should always be called when done using the device.
         """
         logger.info("Closing Orifice API connection")
+        report = self.conditioner.report()
+        logger.info(f"Depth conditioning: {report['samples']} samples, "
+                    f"filter lag {report['filter_lag_ms']:.1f} ms (max {report['filter_lag_max_ms']:.1f} ms), "
+                    f"{report['processing_us']:.1f} us/sample")
         self.running = False
+        if self.ring is not None:
+            self.ring_watcher.join()  # Before the ring's buffer goes away under it
+        if self.synthetic:
+            self.synthetic.stop()
+        if self.ring is not None:
+            if self.ring.dropped:
+                logger.warning(f"Depth ring dropped {self.ring.dropped} samples the game did not read in time")
+            self.ring.close()
+            self.ring = None
         if hasattr(self, 'client_socket') and self.socket_connected:
             try:
                 self.client_socket.close()
@@ -205,3 +592,45 @@ class Orifice:
                 logger.error(f"Error closing socket: {e}")
         pygame.quit()
         logger.debug("Pygame resources released")
+
+
+def run_calibration(device, seconds):
+    """
+    Record the device's raw range while it is moved end to end, then save it
+
+    Returns:
+        bool: False if the device did not move, in which case nothing is saved
+    """
+    print(f"Calibrating {device.device_name}: move it through its full travel, end to end, for {seconds:.0f} s")
+    device.conditioner.start_calibration()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for event in pygame.event.get():
+            device.handle_event(event)
+        device.latch()
+        time.sleep(0.01)
+    if not device.conditioner.finish_calibration():
+        return False
+    device.save_calibration()
+    settings = device.conditioner.settings()
+    print(f"Saved raw range {settings['raw_min']:.1f}-{settings['raw_max']:.1f} for {device.device_name} in {CALIBRATION_PATH}")
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Orifice device tools")
+    parser.add_argument('--calibrate', action='store_true', help="Record the device's raw range and save it to config/orifice_calibration.json")
+    parser.add_argument('--seconds', type=float, default=10.0, help="How long to record the sweep")
+    parser.add_argument('--backend', choices=BACKENDS, help="Defaults to ORIFICE_BACKEND, then auto")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.calibrate:
+        device = Orifice(backend=args.backend)
+        try:
+            calibrated = run_calibration(device, args.seconds)
+        finally:
+            device.close()
+        raise SystemExit(0 if calibrated else 1)
+    else:
+        parser.print_help()
@@ -0,0 +1,336 @@
+"""
+Shared-memory depth transport for the Orifice API
+
+A single-producer ring of timestamped raw depth samples in multiprocessing.shared_memory.
+The producer (the slider simulator, or a hardware bridge process) appends samples;
+Orifice drains them once per frame straight out of the shared buffer, with no socket,
+no reader thread and no lock.
+
+Every slot carries its own sequence number (a seqlock). The writer marks the slot odd
+while it writes and stores an even value derived from the sample index when it is done.
+A reader accepts a slot only if the sequence holds the expected even value both before
+and after copying it, so a torn or already-overwritten sample is counted as dropped
+instead of being returned.
+
+Layout (little endian):
+    header: magic b'ODR1', slot count (uint32), samples written (uint64), padded to 64 bytes
+    slot:   sequence (uint64), timestamp (float64, time.monotonic()), raw depth (float64)
+
+time.monotonic() is a system-wide clock, so timestamps written by the producer can be
+compared directly with the reader's clock.
+
+Usage:
+    ring = SharedDepthRing.create()              # consumer side (Orifice owns the segment)
+    writer = SharedDepthRing.attach(ring.name)   # producer process
+    writer.write(512.0)
+    for timestamp, raw in ring.read_new():
+        ...
+
+Benchmark against the TCP path:
+    python -m api.shared_depth --benchmark
+"""
+
+import argparse
+import multiprocessing
+import socket
+import struct
+import threading
+import time
+import logging
+from multiprocessing import resource_tracker, shared_memory
+
+logger = logging.getLogger('orifice.shared_depth')
+
+MAGIC = b'ODR1'
+HEADER = struct.Struct('<4sIQ')
+HEADER_SIZE = 64  # Header padded to a cache line so the write counter doesn't share one with slot 0
+COUNT_OFFSET = 8
+COUNT = struct.Struct('<Q')
+SEQUENCE = struct.Struct('<Q')
+SAMPLE = struct.Struct('<dd')
+SLOT_SIZE = SEQUENCE.size + SAMPLE.size
+DEFAULT_CAPACITY = 4096  # Slots; several seconds of samples at kHz rates between two frames
+MAX_DEPTH = 1024
+
+class SharedDepthRing:
+    """
+    One end of a shared-memory depth ring
+
+    Use create() on the consumer side, which owns and eventually unlinks the segment,
+    and attach() in the producer process. Only one process may write.
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self.buffer = shm.buf
+        magic, self.capacity, written = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory '{shm.name}' is not a depth ring")
+        self.name = shm.name
+        self.owner = owner
+        self.write_count = written  # Producer cursor; resumes where a previous producer stopped
+        self.read_count = written  # Consumer cursor; a new reader starts at the present
+        self.dropped = 0
+
+    @classmethod
+    def create(cls, name=None, capacity=DEFAULT_CAPACITY):
+        """
+        Allocate a new ring
+
+        Args:
+            name (str): Segment name, or None for a random one
+            capacity (int): Number of sample slots
+        """
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:  # Left behind by a run that crashed before unlinking it
+            stale = cls._reuse(name, capacity)
+            if stale is not None:
+                return stale
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, capacity, 0)
+        logger.info(f"Created depth ring '{shm.name}' with {capacity} slots")
+        return cls(shm, owner=True)
+
+    @classmethod
+    def _reuse(cls, name, capacity):
+        """
+        Take over an existing segment called name
+
+        A depth ring of the same capacity is adopted as it is, so a producer still attached
+        to it (a hardware bridge that outlived the game) keeps working. Anything else is
+        unlinked, and None is returned so the caller creates a fresh one.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            ring = cls(shm, owner=True)
+            if ring.capacity == capacity:
+                logger.warning(f"Reusing depth ring '{name}' left behind by an earlier run")
+                return ring
+        except (ValueError, struct.error):
+            pass
+        shm.close()
+        shm.unlink()
+        logger.warning(f"Replaced shared memory '{name}' left behind by an earlier run")
+        return None
+
+    @classmethod
+    def attach(cls, name, timeout=0.0, shared_tracker=False):
+        """
+        Open an existing ring by name
+
+        Args:
+            name (str): Segment name
+            timeout (float): Keep retrying this long (s) if the ring doesn't exist yet
+            shared_tracker (bool): True in a multiprocessing child of the owner, which shares
+                its resource tracker and so must leave the segment registered
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if shared_tracker:
+                    shm = shared_memory.SharedMemory(name=name)
+                else:
+                    try:
+                        shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+                    except TypeError:
+                        shm = shared_memory.SharedMemory(name=name)
+                        # Otherwise this process's resource tracker unlinks the consumer's segment when it exits
+                        resource_tracker.unregister(shm._name, 'shared_memory')
+                break
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+        logger.info(f"Attached to depth ring '{name}'")
+        return cls(shm, owner=False)
+
+    def write(self, raw, timestamp=None):
+        """
+        Append one sample (producer only)
+
+        Args:
+            raw (float): Raw depth reading
+            timestamp (float): time.monotonic() of the reading. Defaults to now.
+        """
+        index = self.write_count
+        offset = HEADER_SIZE + (index % self.capacity) * SLOT_SIZE
+        buffer = self.buffer
+        SEQUENCE.pack_into(buffer, offset, 2 * index + 1)  # Odd: slot is being written
+        SAMPLE.pack_into(buffer, offset + SEQUENCE.size, time.monotonic() if timestamp is None else timestamp, raw)
+        SEQUENCE.pack_into(buffer, offset, 2 * index + 2)
+        self.write_count = index + 1
+        COUNT.pack_into(buffer, COUNT_OFFSET, self.write_count)
+
+    def read_new(self):
+        """
+        Every sample written since the previous call (consumer only)
+
+        Samples the producer has already lapped are skipped and added to dropped.
+
+        Returns:
+            list: (timestamp, raw) tuples, oldest first
+        """
+        buffer = self.buffer
+        written = COUNT.unpack_from(buffer, COUNT_OFFSET)[0]
+        index = self.read_count
+        if written - index > self.capacity:
+            self.dropped += written - self.capacity - index
+            index = written - self.capacity
+        samples = []
+        while index < written:
+            offset = HEADER_SIZE + (index % self.capacity) * SLOT_SIZE
+            expected = 2 * index + 2
+            if SEQUENCE.unpack_from(buffer, offset)[0] == expected:
+                sample = SAMPLE.unpack_from(buffer, offset + SEQUENCE.size)
+                if SEQUENCE.unpack_from(buffer, offset)[0] == expected:
+                    samples.append(sample)
+                    index += 1
+                    continue
+            self.dropped += 1  # Overwritten while we were reading it
+            index += 1
+        self.read_count = written
+        return samples
+
+    def latest_raw(self):
+        """
+        The newest raw depth written, without consuming anything, or None if there is none
+        or it is being overwritten. Lets a watcher notice new input between drains.
+        """
+        written = COUNT.unpack_from(self.buffer, COUNT_OFFSET)[0]
+        if not written:
+            return None
+        index = written - 1
+        offset = HEADER_SIZE + (index % self.capacity) * SLOT_SIZE
+        raw = SAMPLE.unpack_from(self.buffer, offset + SEQUENCE.size)[1]
+        return raw if SEQUENCE.unpack_from(self.buffer, offset)[0] == 2 * index + 2 else None
+
+    def close(self):
+        """Detach; the owner also removes the segment"""
+        self.buffer = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+def _produce(sink, rate, count):
+    period = 1.0 / rate if rate else 0.0
+    next_time = time.monotonic()
+    for index in range(count):
+        if period:
+            next_time += period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        sink(float(index % MAX_DEPTH), time.monotonic())
+
+def _shared_memory_producer(name, rate, count):
+    ring = SharedDepthRing.attach(name, timeout=2.0, shared_tracker=True)
+    _produce(ring.write, rate, count)
+    ring.close()
+
+def _tcp_producer(listener, rate, count):
+    connection, _ = listener.accept()
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # The timestamp rides along so latency can be measured; otherwise the same framing as the simulator
+    _produce(lambda raw, timestamp: connection.sendall(f"{timestamp!r} {raw:.0f}\n".encode()), rate, count)
+    connection.close()
+
+def _consume_shared_memory(rate, count, poll_interval):
+    ring = SharedDepthRing.create(capacity=DEFAULT_CAPACITY)
+    producer = multiprocessing.Process(target=_shared_memory_producer, args=(ring.name, rate, count))
+    latencies = []
+    producer.start()
+    cpu_started, started = time.process_time(), time.monotonic()
+    while True:
+        alive = producer.is_alive()
+        samples = ring.read_new()
+        now = time.monotonic()
+        latencies.extend(now - timestamp for timestamp, _ in samples)
+        if not samples and not alive:
+            break
+        time.sleep(poll_interval)
+    elapsed, cpu = time.monotonic() - started, time.process_time() - cpu_started
+    producer.join()
+    dropped = ring.dropped
+    ring.close()
+    return latencies, dropped, elapsed, cpu
+
+def _consume_tcp(rate, count, poll_interval):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    producer = multiprocessing.Process(target=_tcp_producer, args=(listener, rate, count))
+    producer.start()
+    client = socket.create_connection(listener.getsockname())
+    client.setblocking(False)
+    latencies = []
+
+    def reader():
+        # Mirrors Orifice.connect_to_server: non-blocking recv on a thread, sleeping when nothing is there
+        buffer = b''
+        while True:
+            try:
+                data = client.recv(65536)
+            except BlockingIOError:
+                time.sleep(poll_interval)
+                continue
+            if not data:
+                break
+            now = time.monotonic()
+            buffer += data
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                timestamp, _, raw = line.partition(b' ')
+                int(raw)
+                latencies.append(now - float(timestamp))
+
+    cpu_started, started = time.process_time(), time.monotonic()
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join()
+    elapsed, cpu = time.monotonic() - started, time.process_time() - cpu_started
+    producer.join()
+    client.close()
+    listener.close()
+    return latencies, 0, elapsed, cpu
+
+def run_benchmark(rate, count, poll_interval):
+    """
+    Compare the shared-memory ring with the TCP path
+
+    Two phases per transport, each with the producer in its own process:
+    - latency: `count` samples paced at `rate` Hz, reporting sample-to-reader latency
+    - throughput: `count` samples as fast as the producer can write them
+
+    The consumer polls every poll_interval seconds either way, like the socket reader thread.
+    """
+    print(f"{'Transport':<16}{'Phase':<12}{'Samples/s':>12}{'Dropped':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'CPU us/sample':>15}")
+    for transport, consume in (('shared_memory', _consume_shared_memory), ('tcp', _consume_tcp)):
+        for phase, phase_rate in (('latency', rate), ('throughput', 0)):
+            latencies, dropped, elapsed, cpu = consume(phase_rate, count, poll_interval)
+            latencies.sort()
+            delivered = len(latencies)
+            if not delivered:
+                print(f"{transport:<16}{phase:<12}{'nothing received':>12}")
+                continue
+            def percentile(p):
+                return latencies[min(delivered - 1, int(p / 100.0 * delivered))] * 1000.0
+            print(f"{transport:<16}{phase:<12}{delivered / elapsed:>12,.0f}{dropped:>9}{percentile(50):>9.3f}"
+                  f"{percentile(99):>9.3f}{latencies[-1] * 1000.0:>9.3f}{cpu / delivered * 1e6:>15.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-memory depth transport")
+    parser.add_argument('--benchmark', action='store_true', help="Measure latency and throughput against the TCP path")
+    parser.add_argument('--rate', type=float, default=1000.0, help="Samples per second in the latency phase")
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--poll-interval', type=float, default=0.001, help="Seconds the consumer sleeps when nothing is new")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.benchmark:
+        run_benchmark(args.rate, args.samples, args.poll_interval)
+    else:
+        parser.print_help()
@@ -1,152 +1,250 @@
-import tkinter as tk
+import argparse
+import asyncio
 import socket
 import threading
 import time
 import logging
 
-# Configure logging
-logger = logging.getLogger('orifice.slider')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+logger = logging.getLogger('orifice.slider')  # Handlers are configured under __main__, not on import
+
+SLOW_CLIENT_TIMEOUT = 2.0  # Seconds a client may leave a send undrained before it is dropped
+WRITE_BUFFER_LIMIT = 4096  # Bytes queued for a client before further updates to it are coalesced
+
+def free_port(host='127.0.0.1'):
+    """A port nothing is listening on right now, for an in-process SliderServer (benchmarks, latency runs)."""
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
 
 class SliderServer:
+    """
+    Depth server for the slider simulator, built on asyncio
+
+    Every client gets its own send task that sleeps on a shared asyncio event and
+    wakes only when the depth changes. Each task tracks what it last sent to its own
+    client, so all clients receive every change they can keep up with. A slow client
+    only ever gets the newest value (intermediate ones are coalesced away), and one
+    that stops reading altogether is disconnected instead of stalling the others.
+
+    The event loop runs in a background thread; update_depth() may be called from
+    any thread (the Tk slider calls it from the UI thread).
+    """
+
     def __init__(self, host='127.0.0.1', port=12345):
         logger.info(f"Initializing SliderServer on {host}:{port}")
         self.host = host
         self.port = port
         self.depth_value = 0  # Starting at 0 instead of 512
-        self.last_sent_value = None
+        self.version = 0  # Incremented on every change; clients compare it with what they last sent
+        self.running = True
+        self.clients = {}  # writer -> send task; only touched from the event loop thread
+        self.loop = asyncio.new_event_loop()
+        self._changed = None
+        self._server = None
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
+
         try:
             self.server_socket.bind((self.host, self.port))
             logger.info(f"Socket bound to {host}:{port}")
-            self.server_socket.listen(1)
+            self.server_socket.listen(128)
             logger.debug("Socket listening for connections")
         except Exception as e:
             logger.error(f"Failed to bind socket: {e}")
             raise
-            
-        self.running = True
-        self.clients = []
-        
+
     def start(self):
-        logger.info("Starting server connection thread")
-        self.thread = threading.Thread(target=self.accept_connections)
+        logger.info("Starting server event loop thread")
+        self.thread = threading.Thread(target=self._run_loop)
         self.thread.daemon = True
         self.thread.start()
-        
-    def accept_connections(self):
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._changed = asyncio.Event()
+        self.loop.run_until_complete(self._start_server())
+        self.loop.run_forever()
+
+    async def _start_server(self):
+        self._server = await asyncio.start_server(self.handle_client, sock=self.server_socket)
         logger.info("Waiting for client connections")
-        while self.running:
-            try:
-                client_socket, client_addr = self.server_socket.accept()
-                logger.info(f"Client connected from {client_addr}")
-                client_socket.setblocking(0)  # Non-blocking socket
-                client_handler = threading.Thread(target=self.handle_client, args=(client_socket, client_addr))
-                client_handler.daemon = True
-                client_handler.start()
-                self.clients.append(client_socket)
-            except Exception as e:
-                if self.running:  # Only log if we're supposed to be running
-                    logger.error(f"Error accepting connection: {e}")
-                time.sleep(0.1)
-                
-    def handle_client(self, client_socket, client_addr):
-        logger.info(f"Handling client from {client_addr}")
+
+    async def handle_client(self, reader, writer):
+        client_addr = writer.get_extra_info('peername')
+        logger.info(f"Client connected from {client_addr}")
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Small frames, latency matters more than packing
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)  # So drain() really waits once the limit is passed
+        self.clients[writer] = asyncio.current_task()
+        last_sent_version = None
         try:
             while self.running:
-                # Only send if value has changed or not sent before
-                if self.depth_value != self.last_sent_value:
-                    try:
-                        message = str(self.depth_value).encode()
-                        client_socket.sendall(message)
-                        logger.debug(f"Sent depth {self.depth_value} to {client_addr}")
-                        self.last_sent_value = self.depth_value
-                    except BlockingIOError:
-                        # Socket would block, just continue
-                        pass
-                    except Exception as e:
-                        logger.error(f"Error sending to client {client_addr}: {e}")
-                        break
-                time.sleep(0.01)  # Faster update rate (100Hz)
-        except Exception as e:
-            logger.error(f"Client handler error: {e}")
+                if self.version == last_sent_version:
+                    await self._changed.wait()
+                    continue
+                if writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                    # Client is behind: don't queue more, just wait for it to drain and send the newest value then
+                    await asyncio.wait_for(writer.drain(), SLOW_CLIENT_TIMEOUT)
+                    continue
+                last_sent_version = self.version
+                writer.write(f"{self.depth_value}\n".encode())
+                logger.debug("Sent depth %d to %s", self.depth_value, client_addr)
+                await asyncio.wait_for(writer.drain(), SLOW_CLIENT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Client {client_addr} stopped reading; disconnecting")
+        except (ConnectionError, OSError) as e:
+            logger.info(f"Client {client_addr} connection lost: {e}")
         finally:
             logger.info(f"Client {client_addr} disconnected")
-            if client_socket in self.clients:
-                self.clients.remove(client_socket)
+            self.clients.pop(writer, None)
             try:
-                client_socket.close()
+                writer.close()
             except Exception as e:
                 logger.error(f"Error closing client socket: {e}")
-            
+
+    def _publish(self, value):
+        if value == self.depth_value:
+            return
+        self.depth_value = value
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()  # Wake everyone waiting on the old event; later waiters get the new one
+        changed.set()
+
     def update_depth(self, value):
         value = int(value)
         if value != self.depth_value:
-            logger.debug(f"Depth value updated to {value}")
-            self.depth_value = value
-        
+            logger.debug("Depth value updated to %d", value)
+            self.loop.call_soon_threadsafe(self._publish, value)
+
     def stop(self):
         logger.info("Stopping server")
         self.running = False
-        
-        # Close all client connections
-        for client in self.clients[:]:
-            try:
-                client.close()
-                logger.debug("Closed client connection")
-            except:
-                pass
-            self.clients.remove(client)
-            
-        # Close server socket
+
+        async def shutdown():
+            tasks = list(self.clients.values())
+            self._changed.set()  # Wake idle send tasks so they see running == False and close their sockets
+            for writer in list(self.clients):  # Unblock any task stuck draining to a slow client
+                writer.transport.abort()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.debug(f"Closed {len(tasks)} client connection(s)")
+            if self._server:
+                self._server.close()
+                await self._server.wait_closed()
+            self.loop.stop()
+
         try:
-            self.server_socket.close()
+            self.loop.call_soon_threadsafe(lambda: asyncio.ensure_future(shutdown()))
+            self.thread.join(timeout=2.0)
             logger.debug("Server socket closed")
         except Exception as e:
             logger.error(f"Error closing server socket: {e}")
 
-def main():
+def run_load_test(host, port, client_count, rate, duration):
+    """
+    Connect many clients to a local server and measure fan-out latency
+
+    The publisher steps the depth at `rate` Hz. Each client timestamps every value it
+    receives against the moment that value was published.
+    """
+    server = SliderServer(host, port)
+    server.start()
+    publish_times = {}
+    latencies = []
+
+    async def client(ready):
+        reader, writer = await asyncio.open_connection(host, port)
+        ready.set()
+        buffer = b''
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                now = time.perf_counter()
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    published = publish_times.get(int(line))
+                    if published is not None:
+                        latencies.append(now - published)
+        finally:
+            writer.close()
+
+    async def main():
+        readies = [asyncio.Event() for _ in range(client_count)]
+        tasks = [asyncio.create_task(client(ready)) for ready in readies]
+        await asyncio.gather(*(ready.wait() for ready in readies))
+        await asyncio.sleep(0.2)
+        logger.info(f"{client_count} clients connected; publishing at {rate} Hz for {duration}s")
+        value = 0
+        started = time.perf_counter()
+        next_publish = started
+        while time.perf_counter() - started < duration:
+            value = value % 1024 + 1  # Never repeats within 1024 updates, so each value identifies its publish time
+            publish_times[value] = time.perf_counter()
+            server.update_depth(value)
+            next_publish += 1.0 / rate
+            await asyncio.sleep(max(0.0, next_publish - time.perf_counter()))
+        await asyncio.sleep(0.5)
+        server.stop()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    logging.getLogger('orifice.slider').setLevel(logging.WARNING)  # Hundreds of connect/disconnect lines would drown the report
+    asyncio.run(main())
+    latencies.sort()
+    published = int(duration * rate)
+    if not latencies:
+        print("No values received")
+        return
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] * 1000.0
+    print(f"Clients: {client_count}, updates published: {published}, deliveries: {len(latencies)} "
+          f"({len(latencies) / (client_count * published) * 100:.1f}% of updates reached each client on average)")
+    print(f"Fan-out latency ms: p50 {percentile(50):.3f}  p99 {percentile(99):.3f}  max {latencies[-1] * 1000:.3f}")
+
+def main(shared_memory_name=None):
+    import tkinter as tk
+    from tkinter import messagebox
+
     logger.info("Starting Orifice Slider Simulator")
     root = tk.Tk()
     root.title("Orifice Depth Simulator")
-    
+
     # Wider window
     root.geometry("200x420")
     logger.debug("Window configured")
-    
+
     # Configure a custom style for the slider
     root.option_add("*Slider.Width", 40)  # Wider slider
-    
+
     # Create frame for the slider to give it some padding
     slider_frame = tk.Frame(root, padx=20, pady=20)
     slider_frame.pack(fill=tk.BOTH, expand=True)
-    
+
     try:
-        server = SliderServer()
-        server.start()
+        if shared_memory_name:
+            from shared_depth import SharedDepthRing  # Run as a script, so api/ is on the path
+            server = SharedDepthRing.attach(shared_memory_name, timeout=2.0)
+        else:
+            server = SliderServer()
+            server.start()
         logger.info("Server started successfully")
     except Exception as e:
         logger.critical(f"Failed to start server: {e}")
-        tk.messagebox.showerror("Error", f"Failed to start server: {e}")
+        messagebox.showerror("Error", f"Failed to start server: {e}")
         root.destroy()
         return
-    
+
     # Create a wider slider with a custom style
     slider = tk.Scale(
-        slider_frame, 
-        from_=1024, 
-        to=0, 
-        orient=tk.VERTICAL, 
+        slider_frame,
+        from_=1024,
+        to=0,
+        orient=tk.VERTICAL,
         length=380,
         width=40,  # Wider slider
         sliderlength=40,  # Bigger handle
-        command=server.update_depth,
         font=("Arial", 12, "bold"),
         troughcolor="#d0d0d0",
         activebackground="#4080ff"
@@ -154,33 +252,51 @@ def main():
     slider.set(0)  # Start at 0 (fully retracted)
     slider.pack(fill=tk.BOTH, expand=True)
     logger.debug("Slider UI configured")
-    
+
     # Add a label to show the current value
     value_label = tk.Label(
-        root, 
-        text="Depth: 0", 
+        root,
+        text="Depth: 0",
         font=("Arial", 14, "bold"),
         pady=10
     )
     value_label.pack()
-    
+
     # Update label when slider changes
     def update_label(value):
         value_label.config(text=f"Depth: {value}")
-        server.update_depth(value)
-    
+        if shared_memory_name:
+            server.write(float(value))
+        else:
+            server.update_depth(value)
+
     # Connect the update function
     slider.config(command=update_label)
-    
+
     def on_closing():
         logger.info("Application closing")
-        server.stop()
+        if shared_memory_name:
+            server.close()
+        else:
+            server.stop()
         root.destroy()
-        
+
     root.protocol("WM_DELETE_WINDOW", on_closing)
     logger.info("Entering main loop")
     root.mainloop()
     logger.info("Application terminated")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Orifice depth slider simulator")
+    parser.add_argument('--load-test', action='store_true', help="Run headless and measure fan-out latency to many clients")
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=100.0, help="Depth updates per second during the load test")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--port', type=int, default=12345)
+    parser.add_argument('--shared-memory', metavar='NAME', help="Write depth into this shared-memory ring instead of serving TCP")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.load_test:
+        run_load_test('127.0.0.1', args.port, args.clients, args.rate, args.duration)
+    else:
+        main(args.shared_memory)
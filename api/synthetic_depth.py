@@ -0,0 +1,217 @@
+"""
+Synthetic depth generator for the Orifice API
+
+Produces scripted depth waveforms in-process, with no simulator window, socket or
+hardware, so input handling and game logic can be stress tested headless and
+reproducibly.
+
+The same spec always yields the same sequence, however the background thread
+happens to be scheduled: the periodic waveforms and playback are functions of the
+sample index, while random_walk and noise draw from a generator seeded by `seed`,
+one draw per sample, in order.
+
+Samples are timestamped on the time.monotonic() clock, the same one the Orifice API
+stamps other backends' samples with, whether they come from start() or advance().
+
+Usage:
+    device = orifice.Orifice(backend='synthetic', synthetic=SyntheticDepthGenerator('sine', hz=1.5, rate=2000))
+    # or from the environment:
+    #   ORIFICE_BACKEND=synthetic ORIFICE_SYNTHETIC="square:hz=4,rate=5000,noise=6" python main.py
+"""
+
+import csv
+import logging
+import math
+import random
+import threading
+import time
+
+logger = logging.getLogger('orifice.synthetic')
+
+WAVEFORMS = ('sine', 'square', 'triangle', 'random_walk', 'playback')
+MAX_DEPTH = 1024
+
+class SyntheticDepthGenerator:
+    """
+    Scripted depth source
+
+    Waveforms:
+    - sine: smooth strokes from 0 to 1024 and back, hz strokes per second
+    - square: alternates between low and high, duty = fraction of each period spent high
+    - triangle: constant-speed strokes
+    - random_walk: gaussian steps of `step` depth units per sample, reflected at the ends;
+      its position carries over from sample to sample
+    - playback: replays a recorded curve (see load_curve), looping
+    """
+
+    def __init__(self, waveform='sine', rate=1000, hz=1.0, low=0, high=MAX_DEPTH, duty=0.5,
+                 step=4.0, noise=0.0, seed=0, curve=None, curve_rate=None):
+        """
+        Args:
+            waveform (str): One of WAVEFORMS
+            rate (float): Samples per second
+            hz (float): Strokes per second (sine, square, triangle)
+            low (float), high (float): Range of the stroke
+            duty (float): High fraction of a square wave period
+            step (float): Random walk standard deviation per sample
+            noise (float): Standard deviation of gaussian noise added to every sample
+            seed (int): Seed for random_walk and noise
+            curve (list[float]): Depth values for playback
+            curve_rate (float): Sample rate the curve was recorded at (defaults to rate)
+        """
+        if waveform not in WAVEFORMS:
+            raise ValueError(f"Unknown waveform '{waveform}'. Expected one of {WAVEFORMS}")
+        if waveform == 'playback' and not curve:
+            raise ValueError("Playback needs a curve")
+        self.waveform = waveform
+        self.rate = float(rate)
+        self.hz = float(hz)
+        self.low = float(low)
+        self.high = float(high)
+        self.duty = float(duty)
+        self.step = float(step)
+        self.noise = float(noise)
+        self.seed = seed
+        self.curve = [float(value) for value in curve] if curve else None
+        self.curve_rate = float(curve_rate or rate)
+        self.sample_index = 0
+        self.origin = None  # time.monotonic() of sample 0, set by the first start() or advance()
+        self._rng = random.Random(seed)
+        self._walk = self.low
+        self._thread = None
+        self._running = False
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Build a generator from a string such as "sine:hz=2,rate=4000,noise=3"
+
+        For playback, pass the recording as file=path/to/curve.csv.
+        """
+        waveform, _, options = spec.partition(':')
+        kwargs = {}
+        for option in filter(None, options.split(',')):
+            key, _, value = option.partition('=')
+            kwargs[key.strip()] = value.strip()
+        if 'file' in kwargs:
+            curve, curve_rate = cls.load_curve(kwargs.pop('file'))
+            kwargs['curve'] = curve
+            kwargs.setdefault('curve_rate', curve_rate)
+        for key in ('rate', 'hz', 'low', 'high', 'duty', 'step', 'noise', 'curve_rate'):
+            if key in kwargs:
+                kwargs[key] = float(kwargs[key])
+        if 'seed' in kwargs:
+            kwargs['seed'] = int(kwargs['seed'])
+        return cls(waveform.strip() or 'sine', **kwargs)
+
+    @staticmethod
+    def load_curve(path):
+        """
+        Load a recorded curve from CSV
+
+        Either one depth per row, or "time,depth" rows with time in seconds
+        (the first two timestamps set the recording rate).
+
+        Returns:
+            tuple: (list of depths, sample rate or None)
+        """
+        depths, times = [], []
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                try:
+                    values = [float(cell) for cell in row]
+                except ValueError:
+                    continue  # Header row
+                if len(values) >= 2:
+                    times.append(values[0])
+                    depths.append(values[1])
+                else:
+                    depths.append(values[0])
+        curve_rate = 1.0 / (times[1] - times[0]) if len(times) >= 2 and times[1] > times[0] else None
+        logger.info(f"Loaded {len(depths)}-sample curve from {path}")
+        return depths, curve_rate
+
+    def _wave(self, t):
+        span = self.high - self.low
+        phase = (t * self.hz) % 1.0
+        if self.waveform == 'sine':
+            return self.low + span * 0.5 * (1.0 - math.cos(2.0 * math.pi * phase))
+        if self.waveform == 'square':
+            return self.high if phase < self.duty else self.low
+        if self.waveform == 'triangle':
+            return self.low + span * (2.0 * phase if phase < 0.5 else 2.0 - 2.0 * phase)
+        if self.waveform == 'random_walk':
+            self._walk += self._rng.gauss(0.0, self.step)
+            if self._walk < self.low:
+                self._walk = 2 * self.low - self._walk
+            elif self._walk > self.high:
+                self._walk = 2 * self.high - self._walk
+            return self._walk
+        position = t * self.curve_rate  # playback, linear interpolation, looping
+        index = int(position)
+        fraction = position - index
+        a = self.curve[index % len(self.curve)]
+        b = self.curve[(index + 1) % len(self.curve)]
+        return a + (b - a) * fraction
+
+    def next_sample(self):
+        """
+        Returns:
+            tuple: (time in seconds since the start of the waveform, raw depth)
+        """
+        t = self.sample_index / self.rate
+        value = self._wave(t)
+        if self.noise:
+            value += self._rng.gauss(0.0, self.noise)
+        self.sample_index += 1
+        return t, max(0.0, min(float(MAX_DEPTH), value))
+
+    def _anchor(self):
+        """Place the next sample at the current time.monotonic()"""
+        self.origin = time.monotonic() - self.sample_index / self.rate
+
+    def advance(self, seconds, sink):
+        """
+        Emit every sample due in the next `seconds` to sink(raw, timestamp) without a thread
+
+        For deterministic harnesses that step time themselves. Timestamps are spaced
+        exactly 1 / rate apart from an origin taken on the first call.
+        """
+        if self.origin is None:
+            self._anchor()
+        target = self.sample_index + int(round(seconds * self.rate))
+        while self.sample_index < target:
+            t, raw = self.next_sample()
+            sink(raw, self.origin + t)
+
+    def start(self, sink):
+        """
+        Emit samples in real time from a background thread
+
+        Samples due since the last wake-up are emitted together, so rates of several
+        kHz hold up even though the thread only sleeps with ~0.1-1 ms granularity.
+
+        Args:
+            sink (callable): Called as sink(raw, timestamp) for every sample, timestamp on time.monotonic()
+        """
+        self._anchor()  # Resume from now, not from when an earlier run started
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(sink,), daemon=True)
+        self._thread.start()
+        logger.info(f"Synthetic {self.waveform} depth at {self.rate:.0f} Hz started")
+
+    def _run(self, sink):
+        while self._running:
+            due = int((time.monotonic() - self.origin) * self.rate)
+            while self.sample_index < due:
+                t, raw = self.next_sample()
+                sink(raw, self.origin + t)
+            time.sleep(0.0005)
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
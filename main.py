@@ -2,45 +2,65 @@
 import pygame
 import json
 import logging
+import os
 import sys
+import time
 import api.orifice as orifice
 
 from pathlib import Path
 
 from src.components.asset_manager import AssetManager
 from src.components.game_data import GameData
-from src.components.title_screen import TitleScreen
+from src.components.profile_store import ProfileStore
+from src.components.render_backend import create_canvas
+from src.components.screens import SCREEN_CLASSES
 from src.components.slot_game_screen import SlotGameScreen
-from src.components.sperm_bank_screen import SpermBankScreen
+from src.utils.frame_pacer import FramePacer
+from src.utils.log_setup import configure_logging, stop_logging
+from src.utils import metrics
+from src.utils.input_latency import TRACER as latency_tracer
 
 PROJECT_ROOT = Path(__file__).parent 
 FADE_DURATION = .4
+ACTIVE_FPS = 60 # 120 for high refresh panels
+IDLE_FPS = 15 # Frame rate when nothing on screen is animating
+RENDER_BACKEND = os.environ.get('RENDER_BACKEND', 'surface') # 'texture' draws through SDL textures; falls back to 'surface'
+RENDER_DEBUG = os.environ.get('RENDER_DEBUG') == '1' # Log blits that take a slow path
+DISPLAY_SCALE = os.environ.get('DISPLAY_SCALE', 'none') # 'scaled', 'integer', 'nearest' or 'smooth' scales the 800x480 frame up to the panel
+DISPLAY_SIZE = os.environ.get('DISPLAY_SIZE') # Panel size to scale to, e.g. 1920x1080; default the desktop size
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+MEMORY_DEBUG = os.environ.get('MEMORY_DEBUG') == '1' # Log memory and tracemalloc growth at every screen transition
+METRICS_PORT = os.environ.get('METRICS_PORT') # Serve Prometheus metrics on localhost at this port, e.g. 9108
+METRICS_FILE = os.environ.get('METRICS_FILE') # Append a metrics snapshot to this rotating file
+METRICS_INTERVAL = float(os.environ.get('METRICS_INTERVAL', '10')) # Seconds between file snapshots
+PROFILE = os.environ.get('PROFILE') # Play as this profile in profiles.db instead of the single gamedata.sav
+
+FRAMES = metrics.counter('bangslots_frames_total', "Frames presented; its rate is the FPS")
+FRAME_SECONDS = metrics.histogram('bangslots_frame_seconds', "Main loop work per frame: events, update, render and present, without the pacing wait")
+FRAME_INTERVAL_SECONDS = metrics.histogram('bangslots_frame_interval_seconds', "Time between the starts of consecutive frames")
 
 # --- Global Variables ---
-screen_surface = None
+canvas = None
 device = None
 asset_manager = AssetManager(PROJECT_ROOT)
-game_data = GameData.load_or_create(PROJECT_ROOT)
+profile_store = ProfileStore(PROJECT_ROOT / ProfileStore.FILENAME) if PROFILE else None
+if profile_store: game_data = profile_store.load_or_create(PROFILE, import_from=PROJECT_ROOT / GameData.SAVE_FILENAME) # The first profile carries over an existing save
+else: game_data = GameData.load_or_create(PROJECT_ROOT)
 current_screen = None
+memory_tracker = None
+metrics_exporter = None
 show_fps = False
 
-SCREEN_CLASSES = {# Screen class mapping
-    "TitleScreen": TitleScreen,
-	"SlotGameScreen": SlotGameScreen,
-	"SpermBankScreen": SpermBankScreen
-    # "GameScreen": GameScreen, # Add other screen classes here
-    # "ShopScreen": ShopScreen,
-}
-
 def new_screen(next_screen_name):
 	global current_screen
 	try:
 		logger.info(f"Instantiating screen: {next_screen_name}")
 		NewScreenClass = SCREEN_CLASSES.get(next_screen_name)
 		if NewScreenClass:
-			current_screen = NewScreenClass(screen_surface, device, asset_manager, game_data)
+			current_screen = NewScreenClass(canvas, device, asset_manager, game_data)
 			current_screen.on_enter()
 			current_screen.fade_from_black(FADE_DURATION, current_screen.on_ready)
+			if memory_tracker: memory_tracker.transition(current_screen, asset_manager, canvas)
 		else:
 			raise ValueError(f"Unknown screen class key: '{next_screen_name}'.")
 	except Exception as e:
@@ -53,12 +73,7 @@ def end_screen():
 	current_screen.on_exit()
 	new_screen(current_screen.next_screen_name)
 
-logging.basicConfig( # Initialize logging
-	level=logging.INFO,
-	format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-	handlers=[logging.StreamHandler(stream=sys.stdout)],
-	force=True
-)
+configure_logging(LOG_LEVEL, sys.stdout) # Console output is written by a listener thread, not the main loop
 logger = logging.getLogger(__name__)
 logger.info("Application starting")
 
@@ -88,8 +103,8 @@ try: # Initialize Pygame Display
 	logger.info("Initializing Pygame")
 	SCREEN_WIDTH, SCREEN_HEIGHT = 800, 480
 	pygame.init()
-	screen_surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.HWSURFACE | pygame.DOUBLEBUF)
-	pygame.display.set_caption(game_info["title"])
+	output_size = tuple(int(value) for value in DISPLAY_SIZE.lower().split('x')) if DISPLAY_SIZE else None
+	canvas = create_canvas(RENDER_BACKEND, (SCREEN_WIDTH, SCREEN_HEIGHT), game_info["title"], RENDER_DEBUG, DISPLAY_SCALE, output_size)
 	logger.debug("Pygame display initialized")
 except Exception as e:
 	logger.critical(f"Failed to initialize display: {e}")
@@ -104,8 +119,27 @@ try: # Initialize fonts
 except Exception as e:
 	logger.error(f"Error loading fonts: {e}")
 
+if MEMORY_DEBUG:
+	from src.utils.memory_report import TransitionTracker
+	memory_tracker = TransitionTracker()
+
+metrics.callback('bangslots_depth_samples_total', "Raw depth readings received from the device", lambda: device.samples_received, 'counter')
+metrics.callback('bangslots_depth_sample_age_seconds', "Seconds since the device last delivered a depth reading", device.sample_age)
+if METRICS_PORT or METRICS_FILE:
+	try:
+		metrics_exporter = metrics.MetricsExporter(port=int(METRICS_PORT) if METRICS_PORT else None, filename=METRICS_FILE, interval=METRICS_INTERVAL).start()
+	except Exception as e:
+		logger.error(f"Failed to start metrics exporter: {e}")
+
+try: # A line count the paytable isn't tuned for would pay out more than is bet
+	SlotGameScreen.check_lines()
+except ValueError as e:
+	logger.critical(f"Invalid slot configuration: {e}")
+	device.close()
+	sys.exit(1)
+
 new_screen('TitleScreen')
-clock = pygame.time.Clock() # Clock
+frame_pacer = FramePacer(ACTIVE_FPS, IDLE_FPS)
 running = True
 fps_update_time = 0
 frame_count = 0
@@ -114,18 +148,24 @@ fps_display = "FPS: --"
 try: # Main Loop
 	logger.info("Entering main loop")
 	while running:
-		time_delta = clock.tick(60) / 1000.0
-		for event in pygame.event.get(): # Event handling
+		time_delta = frame_pacer.wait(current_screen is None or current_screen.is_animating())
+		frame_started = time.perf_counter()
+		FRAME_INTERVAL_SECONDS.observe(time_delta)
+		for event in frame_pacer.events(): # Event handling, starting with any event that ended an idle wait
+			event = canvas.map_event(event) # Pointer positions in the screens' 800x480 coordinates
+			if event is None: continue # A tap on the letterbox bars
 			if event.type == pygame.QUIT:
 				logger.info("Quit event received")
 				running = False
+			device.handle_event(event) # Joystick depth arrives as JOYAXISMOTION events
 			if current_screen:
 				current_screen.handle_event(event)
-		if current_screen: # Update and Render
-			current_screen.update(time_delta)
+		device.latch() # One consistent depth reading for this frame's updates
+		if current_screen: # Fixed-step update, interpolated render
+			current_screen.advance(time_delta)
 			current_screen.render() # Screen draws itself, then BaseScreen draws fade
 		else: # This case should ideally not be reached if running is true
-			screen_surface.fill((50, 0, 50)) # Dark purple error/fallback if no active screen
+			canvas.fill((50, 0, 50)) # Dark purple error/fallback if no active screen
 		if current_screen and current_screen.end_screen_requested and not current_screen.is_transitioning:
 			current_screen.fade_to_black(FADE_DURATION, end_screen)
 		if show_fps: # Calculate FPS every second
@@ -134,18 +174,23 @@ try: # Main Loop
 			if current_time - fps_update_time > 1000:
 				fps = frame_count
 				fps_display = f"FPS: {fps}"
-				logger.debug(f"FPS: {fps}")
+				logger.debug("FPS: %d", fps)
 				frame_count = 0
 				fps_update_time = current_time
 			fps_text = small_font.render(fps_display, True, (0, 255, 0))
-			screen_surface.blit(fps_text, (10, 10)) # Blit at (10, 10)
+			canvas.blit(fps_text, (10, 10)) # Blit at (10, 10)
 
-		pygame.display.flip()
+		canvas.present()
+		if current_screen: latency_tracer.presented(current_screen, device.backend) # Depth change to first frame showing it
+		FRAMES.inc()
+		FRAME_SECONDS.observe(time.perf_counter() - frame_started)
 except Exception as e:
 	logger.critical(f"Unhandled exception in main loop: {e}", exc_info=True)
 	
 finally: # Clean up
 	logger.info("Shutting down application")
+	if metrics_exporter: metrics_exporter.stop()
+	if profile_store: profile_store.close() # Commits the last saves
 	try:
 		device.close()
 		logger.debug("Device closed")
@@ -157,4 +202,5 @@ finally: # Clean up
 	except Exception as e:
 		logger.error(f"Error quitting pygame: {e}")
 		
-	logger.info("Application terminated")
\ No newline at end of file
+	logger.info("Application terminated")
+	stop_logging()
\ No newline at end of file
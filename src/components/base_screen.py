@@ -1,21 +1,28 @@
 # base_screen.py
-import pygame
 import logging
+import time
+
+from src.components.widget_tree import WidgetTree
+from src.utils import metrics
 
 logger = logging.getLogger(__name__)
 
 class BaseScreen:
+	FIXED_TIME_STEP = 1.0 / 120.0 # seconds of simulation advanced by each update() call
+	MAX_CATCH_UP_STEPS = 8 # Cap on updates per frame so one long frame can't snowball into a spiral of death
 
-	def __init__(self, screen_surface, device, asset_manager, game_data):
-		self.screen_surface = screen_surface
+	def __init__(self, canvas, device, asset_manager, game_data):
+		self.canvas = canvas
 		self.device = device
 		self.asset_manager = asset_manager
 		self.game_data = game_data
-		self.screen_rect = screen_surface.get_rect()
+		self.screen_rect = canvas.get_rect()
 
 		self.device_initial = 0
 		self.device_delta = 0
 		self.device_threshold = 512
+		self.input_change_time = None # When the depth this frame's steps read started changing; see advance()
+		self.shown_input_time = None # Earliest such time the next presented frame reacts to; see input_shown()
 
 		self.next_screen_name = None
 		self.end_screen_requested = False
@@ -25,10 +32,17 @@ class BaseScreen:
 		self.fade_alpha = 0
 		self.fade_duration = None  # seconds
 		self.fade_timer = 0
-		self.fade_surface = pygame.Surface(self.screen_rect.size)
-		self.fade_surface.fill((0, 0, 0))
 		self.on_fade_complete = None
 
+		self.time_accumulator = 0.0
+		self.render_alpha = 1.0 # How far (0-1) the rendered frame sits between the previous and current simulation step
+
+		self.widgets = WidgetTree() # Buttons added here get their touches routed to them and are drawn over _render_content
+
+		screen_name = self.__class__.__name__
+		self.render_seconds = metrics.histogram('bangslots_render_seconds', "Time a screen takes to draw a frame, before present", screen=screen_name)
+		self.entries = metrics.counter('bangslots_screen_entries_total', "Times each screen was entered", screen=screen_name)
+
 	def set_next_screen(self, screen_name):
 		self.next_screen_name = screen_name
 
@@ -76,17 +90,53 @@ class BaseScreen:
 			callback()
 
 	def _render_transition_overlay(self):
-		if self.fade_alpha > 0: # Only blit if there's some opacity
-			self.fade_surface.set_alpha(self.fade_alpha)
-			self.screen_surface.blit(self.fade_surface, (0, 0))
+		if self.fade_alpha > 0: # Only draw if there's some opacity
+			self.canvas.fade(self.fade_alpha)
 
 	def reset_device_initial(self):
 		self.device_initial = self.device.depth
 
+	def advance(self, frame_delta):
+		"""
+		Runs as many fixed-size update steps as the elapsed frame time allows, then records how far
+		into the next step the frame is so _render_content can interpolate between steps.
+		A depth change latched on a frame too short for any step is kept for the next frame's steps.
+		"""
+		if self.input_change_time is None: self.input_change_time = self.device.latched_change_time
+		self.time_accumulator += frame_delta
+		steps = 0
+		while self.time_accumulator >= self.FIXED_TIME_STEP:
+			if steps == self.MAX_CATCH_UP_STEPS: # Drop the backlog instead of jumping the simulation forward
+				logger.debug("%s dropped %.4fs of simulation time.", self.__class__.__name__, self.time_accumulator)
+				self.time_accumulator = 0.0
+				break
+			self._save_previous_state()
+			self.update(self.FIXED_TIME_STEP)
+			self.time_accumulator -= self.FIXED_TIME_STEP
+			steps += 1
+		if steps: self.input_change_time = None
+		self.render_alpha = self.time_accumulator / self.FIXED_TIME_STEP
+		return steps
+
+	def lerp(self, previous, current):
+		return previous + (current - previous) * self.render_alpha
+
+	def lerp_wrapped(self, previous, current, period):
+		delta = current - previous
+		if delta > period / 2.0: delta -= period # Shortest way round for values that wrap, such as reel positions
+		elif delta < -period / 2.0: delta += period
+		value = previous + delta * self.render_alpha
+		if value < 0: value += period
+		elif value >= period: value -= period
+		return value
+
 	# --- Methods to be overridden by subclasses ---
 	def handle_event(self, event):
-		if self.is_transitioning or self.end_screen_requested: return None
-		else: return event
+		if self.is_transitioning or self.end_screen_requested:
+			self.widgets.release_capture() # A press can't finish into a screen that is leaving
+			return None
+		self.widgets.handle_event(event)
+		return event
 
 	def update(self, time_delta):
 		self._update_fade(time_delta)
@@ -95,23 +145,40 @@ class BaseScreen:
 			return
 		self._update_interactive()
 
+	def is_animating(self):
+		"""Whether the screen changes on its own. When False the main loop idles until an event or depth change arrives."""
+		return self.is_transitioning or self.end_screen_requested
+
+	def _save_previous_state(self): pass # Called before every fixed step. Store whatever _render_content interpolates from.
+
 	def _update_always(self, time_delta): pass
 
 	def _update_interactive(self):
 		self.device_delta = abs(self.device.depth - self.device_initial)
 
+	def input_shown(self):
+		"""Call when what is drawn changes in response to the depth read in this step; the latency tracer times it to the next present."""
+		if self.input_change_time is not None and (self.shown_input_time is None or self.input_change_time < self.shown_input_time):
+			self.shown_input_time = self.input_change_time
+
 	def _render_content(self): pass
 
 	def render(self):
+		started = time.perf_counter()
 		self._render_content()
+		self.widgets.render(self.canvas)
 		self._render_transition_overlay()
+		self.render_seconds.observe(time.perf_counter() - started)
 
 	def on_enter(self):
 		logger.info(f"{self.__class__.__name__} entered.")
+		self.entries.inc()
 		self.next_screen_name = None
 		self.end_screen_requested = False
 		self.is_transitioning = False
 		self.fade_alpha = 0
+		self.time_accumulator = 0.0
+		self.render_alpha = 1.0
 
 	def on_ready(self):
 		logger.info(f"{self.__class__.__name__} ready.")
@@ -7,8 +7,11 @@ class ButtonBase:
 	- Storing position and size in a Rect.
 	- Managing the 'up' and 'down' states.
 	- Processing touch events to change state and trigger actions.
+	- enabled and visible flags. A disabled button is drawn but ignores touches; a hidden one is neither drawn nor touched.
 
 	It does NOT know how to render itself. Subclasses MUST implement the _render_up_state and _render_down_state methods.
+	On a screen, add buttons to its WidgetTree (self.widgets), which hit-tests and routes the events to press() and release().
+	handle_event() does the same for a button used on its own.
 	"""
 	UP = "up"
 	DOWN = "down"
@@ -19,16 +22,25 @@ class ButtonBase:
 		self.on_click = on_click
 		self.on_click_args = on_click_args if on_click_args is not None else []
 		self.enabled = True
+		self.visible = True
+		self.tree = None # The WidgetTree this button is in, if any
+
+	def press(self): self.state = ButtonBase.DOWN
+
+	def release(self, inside):
+		"""The press ends. The action only triggers if the finger was lifted inside the button."""
+		was_down = self.state == ButtonBase.DOWN
+		self.state = ButtonBase.UP # The button always returns to the 'up' state on release, regardless of where the finger was lifted.
+		if was_down and inside and self.on_click: self.on_click(*self.on_click_args)
+
+	def cancel(self): self.state = ButtonBase.UP
 
 	def handle_event(self, event):
-		if not self.enable: return
+		if not self.enabled or not self.visible: return
 		if event.type == pygame.MOUSEBUTTONDOWN:
-			if event.button == 1 and self.rect.collidepoint(event.pos): self.state = ButtonBase.DOWN # Check if the press is within the button's area
+			if event.button == 1 and self.rect.collidepoint(event.pos): self.press() # Check if the press is within the button's area
 		elif event.type == pygame.MOUSEBUTTONUP:
-			if event.button == 1 and self.state == ButtonBase.DOWN: # Check if the button was in a 'down' state
-				if self.rect.collidepoint(event.pos): # Check if the release is still within the button's area to trigger the action
-					if self.on_click: self.on_click(*self.on_click_args) # Trigger the action
-				self.state = ButtonBase.UP # The button always returns to the 'up' state on release, regardless of where the finger was lifted.
+			if event.button == 1: self.release(self.rect.collidepoint(event.pos))
 
 	def render(self, screen):
 		if self.state == ButtonBase.UP: self._render_up_state(screen)
@@ -37,6 +49,15 @@ class ButtonBase:
 	def _render_up_state(self, screen): pass
 
 	def _render_down_state(self, screen): pass
-	
-	def enable(self): self.enable = True
-	def disable(self): self.enable = False
\ No newline at end of file
+
+	def _set_flags(self, enabled, visible):
+		self.enabled = enabled
+		self.visible = visible
+		if not (enabled and visible):
+			if self.tree is not None and self.tree.captured is self: self.tree.release_capture() # A press in progress can't click any more
+			else: self.cancel()
+
+	def enable(self): self._set_flags(True, self.visible)
+	def disable(self): self._set_flags(False, self.visible)
+	def show(self): self._set_flags(self.enabled, True)
+	def hide(self): self._set_flags(self.enabled, False)
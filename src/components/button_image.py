@@ -1,6 +1,7 @@
 #button_image.py
 import pygame
 
+from src.components.asset_manager import PREMULTIPLIED
 from src.components.button_base import ButtonBase
 
 class ButtonImage(ButtonBase):
@@ -10,7 +11,9 @@ class ButtonImage(ButtonBase):
 		image_height = bg_image.get_height()
 		self.width = width or image_width
 		self.height = height or image_height
-		if self.width != image_width or self.height != image_height: self.bg_image = pygame.transform.scale(bg_image, (self.width, self.height))
+		if self.width != image_width or self.height != image_height:
+			self.bg_image = pygame.transform.scale(bg_image, (self.width, self.height))
+			if bg_image in PREMULTIPLIED: PREMULTIPLIED.add(self.bg_image) # Scaling keeps the colour premultiplied
 		super().__init__(x, y, self.width, self.height, on_click, on_click_args)
 
 	def _render_up_state(self, screen):
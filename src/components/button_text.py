@@ -1,6 +1,4 @@
 #button_text.py
-import pygame
-
 from src.components.button_base import ButtonBase
 
 class ButtonText(ButtonBase):
@@ -42,6 +40,6 @@ class ButtonText(ButtonBase):
 			screen.blit(surface, rect)
 
 	def _render_down_state(self, screen):
-		pygame.draw.rect(screen, self.down_bg_color, self.rect) # The background fills the entire fixed self.rect
+		screen.fill(self.down_bg_color, self.rect) # The background fills the entire fixed self.rect
 		for surface, rect in zip(self.text_surfaces, self.text_rects):
 			screen.blit(surface, rect)
\ No newline at end of file
@@ -1,36 +1,74 @@
 # src/components/game_data.py
 import logging
 import pickle
+import time
 from pathlib import Path
 
+from src.utils import metrics
+
 logger = logging.getLogger(__name__)
+SAVE_SECONDS = metrics.histogram('bangslots_save_seconds', "Time GameData.save() blocks the caller: the pickle write, or queueing for a ProfileStore", metrics.SAVE_BUCKETS)
+SPINS = metrics.counter('bangslots_spins_total', "Bets placed, one per spin")
+WAGERED = metrics.counter('bangslots_wagered_dollars_total', "Money bet on spins")
+WON = metrics.counter('bangslots_won_dollars_total', "Money paid out by spins")
+
+MAX_UPGRADE_LEVEL = 200
+
+def cost_table(base, growth, starting_cost, levels=MAX_UPGRADE_LEVEL):
+	"""Upgrade prices indexed by level: the starting price at level 1, then base * growth ** level."""
+	return (0, starting_cost) + tuple(int(base * growth ** level) for level in range(2, levels + 1))
 
 class GameData:
 	SAVE_FILENAME = "gamedata.sav"
+	SECONDS_PER_HOUR = 3600
+	# name -> (base, growth, starting cost). Prices are looked up in COST_TABLES rather than recomputed on every purchase.
+	COST_CURVES = {'advertising': (20, 1.6, 20), 'tank': (10, 1.5, 10), 'xl': (25, 2, 25)}
+	COST_TABLES = {name: cost_table(*curve) for name, curve in COST_CURVES.items()}
+	STORAGE_ATTRIBUTES = ('_save_path', '_store', '_profile') # Where the data is saved, not part of it
+	OBSOLETE_ATTRIBUTES = ('xl_base', 'xl_growth') # In older saves; prices come from COST_CURVES now
 
 	def __init__(self):
 		"""Initializes a new GameData object with default values."""
 		self._save_path = None # The save_path will be set later by the factory or a save call.
+		self._store = None # A ProfileStore and the profile name in it, for data loaded through ProfileStore.load_or_create()
+		self._profile = None
 		self.money = 50
 		self.bet = 1
 		self.advertising_level = 1
 		self.advertising_hourly = 1
-		self.advertising_cost = 20
+		self.advertising_cost = self.COST_TABLES['advertising'][1]
 		self.tank_level = 1
 		self.tank_max = 50
-		self.tank_cost = 10
+		self.tank_cost = self.COST_TABLES['tank'][1]
+		self.tank_stored = 0.0 # Passive income materialized as of accrual_timestamp
+		self.accrual_timestamp = time.time() # Wall clock, so time away from the game counts too
 		self.xl_level = 1
 		self.xl_earn = 1
-		self.xl_base = 25
-		self.xl_growth = 2
-		self.xl_cost = 25
+		self.xl_cost = self.COST_TABLES['xl'][1]
+
+	def __getstate__(self):
+		return {key: value for key, value in self.__dict__.items() if key not in self.STORAGE_ATTRIBUTES}
+
+	def __setstate__(self, state):
+		"""Fills in attributes added since an older save was written."""
+		self.__dict__.update(GameData().__dict__)
+		self.__dict__.update(state)
+		for key in self.OBSOLETE_ATTRIBUTES: self.__dict__.pop(key, None)
 
 	def save(self):
-		"""Saves the current game data to the file."""
-		if self._save_path is None: # In case save() is called on an object that wasn't created through the proper load_or_create method.
+		"""Saves the current game data to the file, or hands it to its ProfileStore, which writes it in the background."""
+		if self._save_path is None and self._store is None: # In case save() is called on an object that wasn't created through the proper load_or_create method.
 			raise ValueError("Save path has not been set. Use GameData.load_or_create().")
+		started = time.perf_counter()
+		self._materialize_tank()
+		if self._store is not None:
+			self._store.save(self)
+			SAVE_SECONDS.observe(time.perf_counter() - started)
+			logger.debug("Profile '%s' queued for saving", self._profile)
+			return
 		with open(self._save_path, "wb") as f:
 			pickle.dump(self, f)
+		SAVE_SECONDS.observe(time.perf_counter() - started)
 		logger.info(f"Game data saved to {self._save_path}")
 
 	def increment_bet(self, max_bet):
@@ -51,10 +89,14 @@ class GameData:
 			return True
 		else: return False
 
-	def place_bet(self):
-		if self.money >= self.bet:
-			self.money -= self.bet
-			logger.info(f"Bet ${self.bet}.")
+	def place_bet(self, lines=1):
+		"""Takes the bet on each of lines paylines. Returns the bet per line, which wins are multiplied by, or None if money is short."""
+		stake = self.bet * lines
+		if self.money >= stake:
+			self.money -= stake
+			SPINS.inc()
+			WAGERED.inc(stake)
+			logger.info(f"Bet ${self.bet}." if lines == 1 else f"Bet ${self.bet} on each of {lines} lines (${stake}).")
 			return self.bet
 		else:
 			logger.info("Attempted to bet without enough money. Should not get this far!")
@@ -62,6 +104,7 @@ class GameData:
 
 	def win(self, amount):
 		self.money += amount
+		WON.inc(amount)
 		logger.info(f"Won ${amount}.")
 
 	def manual_earn(self):
@@ -73,11 +116,66 @@ class GameData:
 			return True
 		else: return False
 
+	def _upgrade_cost(self, name, level):
+		table = self.COST_TABLES[name]
+		if level < len(table): return table[level]
+		base, growth, _ = self.COST_CURVES[name]
+		return int(base * growth ** level) # Past the precomputed range
+
+	def tank_contents(self, now=None):
+		"""
+		Passive income waiting in the storage tank, in closed form: nothing is accrued per frame.
+		Advertising fills the tank at advertising_hourly until it holds tank_max.
+		"""
+		now = time.time() if now is None else now
+		elapsed = max(0.0, now - self.accrual_timestamp) # Clock moved backwards: accrue nothing rather than go negative
+		return min(float(self.tank_max), self.tank_stored + self.advertising_hourly * elapsed / self.SECONDS_PER_HOUR)
+
+	def tank_next_dollar_time(self):
+		"""Wall-clock time when tank_contents() next reaches a whole dollar, or None if the tank is full or not filling."""
+		next_dollar = int(self.tank_contents()) + 1
+		if next_dollar > self.tank_max or self.advertising_hourly <= 0: return None
+		return self.accrual_timestamp + (next_dollar - self.tank_stored) * self.SECONDS_PER_HOUR / self.advertising_hourly
+
+	def _materialize_tank(self, now=None):
+		"""Folds accrual so far into tank_stored. Needed before the rate or capacity changes."""
+		now = time.time() if now is None else now
+		self.tank_stored = self.tank_contents(now)
+		self.accrual_timestamp = now
+
+	def collect_tank(self, now=None):
+		"""Moves the whole dollars in the tank into money. Returns the amount collected."""
+		self._materialize_tank(now)
+		amount = int(self.tank_stored)
+		if amount:
+			self.tank_stored -= amount
+			self.money += amount
+			logger.info(f"Collected ${amount} of passive income.")
+		return amount
+
+	def upgrade_advertising(self):
+		if self.purchase(self.advertising_cost):
+			self._materialize_tank()
+			self.advertising_level += 1
+			self.advertising_hourly += 1
+			self.advertising_cost = self._upgrade_cost('advertising', self.advertising_level)
+			return True
+		else: return False
+
+	def upgrade_tank(self):
+		if self.purchase(self.tank_cost):
+			self._materialize_tank()
+			self.tank_level += 1
+			self.tank_max += 50
+			self.tank_cost = self._upgrade_cost('tank', self.tank_level)
+			return True
+		else: return False
+
 	def upgrade_xl(self):
 		if self.purchase(self.xl_cost):
 			self.xl_level += 1
 			self.xl_earn += 1
-			self.xl_cost = int(self.xl_base * (self.xl_growth ** self.xl_level))
+			self.xl_cost = self._upgrade_cost('xl', self.xl_level)
 			return True
 		else: return False
 
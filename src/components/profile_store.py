@@ -0,0 +1,147 @@
+# profile_store.py
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.components.game_data import GameData
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+FLUSH_SECONDS = metrics.histogram('bangslots_profile_flush_seconds', "Time one write-back transaction takes to commit", metrics.SAVE_BUCKETS)
+FLUSHED_ROWS = metrics.counter('bangslots_profile_rows_written_total', "Profile rows committed by write-back transactions")
+
+class ProfileStore:
+	"""
+	Many player profiles in one SQLite database, for kiosks shared by several players.
+	- WAL journal: readers (an operator dashboard, `python -m src.utils.profiles list`) and the writer don't block each other.
+	- Write-back cache: profiles loaded through load_or_create() stay in memory, and their GameData.save() only snapshots
+	  the state into pending. A writer thread commits everything pending every flush_interval seconds in one transaction,
+	  so the frame loop never waits on the disk, and a spin-heavy session costs one commit per interval, not per spin.
+	  flush() commits right away; close() flushes and stops the writer. A crash loses at most flush_interval of play.
+	- The statements are fixed and parameterized, so each connection prepares them once and reuses them.
+	State is stored as JSON of the GameData attributes, plus money and update time as columns for dashboards.
+	"""
+	FILENAME = "profiles.db"
+	SCHEMA = "CREATE TABLE IF NOT EXISTS profiles (name TEXT PRIMARY KEY, state TEXT NOT NULL, money INTEGER NOT NULL, updated REAL NOT NULL)"
+	UPSERT = "INSERT OR REPLACE INTO profiles (name, state, money, updated) VALUES (?, ?, ?, ?)"
+	SELECT_STATE = "SELECT state FROM profiles WHERE name = ?"
+	SELECT_SUMMARY = "SELECT name, money, updated FROM profiles ORDER BY name"
+
+	def __init__(self, path, flush_interval=1.0, synchronous='NORMAL'):
+		"""synchronous: SQLite's setting for the writer. NORMAL in WAL mode survives a crash of the game, but not necessarily a power cut."""
+		self.path = Path(path)
+		self.flush_interval = flush_interval
+		self.profiles = {} # name -> GameData
+		self.pending = {} # name -> (state, time saved) not committed yet
+		self.transactions = 0 # Committed so far, and the rows they wrote
+		self.rows_written = 0
+		self._pending_lock = threading.Lock() # Held only to swap or add to pending, never during disk I/O
+		self._write_lock = threading.Lock() # One transaction at a time, in the order their batches were taken
+		self._read_lock = threading.Lock()
+		self._writer = self._connect(synchronous)
+		self._writer.execute(self.SCHEMA)
+		self._reader = self._connect(synchronous)
+		self._wake = threading.Event()
+		self._closed = False
+		self._thread = threading.Thread(target=self._run, name='profile-writer', daemon=True)
+		self._thread.start()
+
+	def _connect(self, synchronous):
+		connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False) # Transactions are begun explicitly
+		connection.execute("PRAGMA journal_mode=WAL")
+		connection.execute(f"PRAGMA synchronous={synchronous}")
+		return connection
+
+	def load_or_create(self, name, import_from=None):
+		"""
+		The profile called name, from the cache, the pending writes or the database, in that order. A new profile starts
+		from the pickled save at import_from if one exists and this is the store's first profile, else from defaults.
+		"""
+		profile = self.profiles.get(name)
+		if profile is not None: return profile
+		with self._pending_lock: pending = self.pending.get(name)
+		state = pending[0] if pending else self._read_state(name)
+		if state is not None:
+			profile = GameData.__new__(GameData)
+			profile.__setstate__(state)
+		elif import_from is not None and Path(import_from).exists() and not self.summaries():
+			profile = self._load_pickle(import_from)
+			logger.info(f"Imported {import_from} as profile '{name}'.")
+		else:
+			profile = GameData()
+			logger.info(f"Created profile '{name}'.")
+		profile._store, profile._profile = self, name
+		self.profiles[name] = profile
+		if state is None: profile.save()
+		return profile
+
+	def _read_state(self, name):
+		with self._read_lock: row = self._reader.execute(self.SELECT_STATE, (name,)).fetchone()
+		return json.loads(row[0]) if row else None
+
+	@staticmethod
+	def _load_pickle(path):
+		with open(path, "rb") as f: return pickle.load(f)
+
+	def import_pickle(self, path, name, replace=False):
+		"""Adds a gamedata.sav as profile name and commits it. Raises ValueError if the profile exists and replace is False."""
+		if not replace and (name in self.profiles or self._read_state(name) is not None): raise ValueError(f"Profile '{name}' already exists.")
+		imported = self._load_pickle(path)
+		imported._materialize_tank()
+		self.profiles.pop(name, None)
+		self.save(imported, name)
+		self.flush()
+		logger.info(f"Imported {path} as profile '{name}'.")
+
+	def save(self, game_data, name=None):
+		"""Queues a snapshot of game_data's state for the writer. Called by GameData.save() for stored profiles."""
+		if self._closed: raise ValueError("The profile store is closed.")
+		snapshot = (game_data.__getstate__(), time.time())
+		with self._pending_lock: self.pending[game_data._profile if name is None else name] = snapshot
+
+	def flush(self):
+		"""Commits every pending snapshot in one transaction. Returns the number of profiles written."""
+		with self._write_lock:
+			with self._pending_lock: batch, self.pending = self.pending, {}
+			if not batch: return 0
+			rows = [(name, json.dumps(state), state['money'], updated) for name, (state, updated) in batch.items()]
+			started = time.perf_counter()
+			try:
+				self._writer.execute("BEGIN IMMEDIATE")
+				self._writer.executemany(self.UPSERT, rows)
+				self._writer.execute("COMMIT")
+			except sqlite3.Error as e:
+				if self._writer.in_transaction: self._writer.execute("ROLLBACK")
+				with self._pending_lock: # Put the batch back under anything saved since, and retry on the next flush
+					batch.update(self.pending)
+					self.pending = batch
+				logger.error(f"Failed to write {len(rows)} profile(s): {e}")
+				return 0
+			FLUSH_SECONDS.observe(time.perf_counter() - started)
+			FLUSHED_ROWS.inc(len(rows))
+			self.transactions += 1
+			self.rows_written += len(rows)
+			return len(rows)
+
+	def _run(self):
+		while not self._closed:
+			self._wake.wait(self.flush_interval)
+			self.flush()
+
+	def summaries(self):
+		"""(name, money, updated) for every committed profile, sorted by name."""
+		with self._read_lock: return self._reader.execute(self.SELECT_SUMMARY).fetchall()
+
+	def close(self):
+		"""Stops the writer and commits whatever is pending. Safe to call more than once."""
+		if self._closed: return
+		self._closed = True
+		self._wake.set()
+		self._thread.join()
+		self.flush()
+		self._reader.close()
+		self._writer.close() # SQLite checkpoints the WAL into the database when its last connection closes
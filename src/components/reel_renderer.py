@@ -0,0 +1,79 @@
+# reel_renderer.py
+"""
+Ways to draw one reel's viewport, given its visual strip and the scroll position y (pixels into the strip, 0 <= y < cycle_height).
+
+- StripReel: the original approach. The whole strip is pre-rendered once into one tall surface, with the symbols that
+  follow the end copied above it and the ones from the start copied below it, so any viewport is one blit. Its pixel
+  memory is (cycle height + two viewports) x reel width per reel, which grows with every stop added to the strip.
+- TileReel: keeps only the prefix sums of the symbol heights and blits the visible symbol images straight to the canvas,
+  clipped to the viewport: a bisect finds the symbol at y, then tiles follow until the viewport is full, going back to
+  the first symbol past the end. It holds no pixels of its own (the symbol images are the shared cached ones), so
+  memory doesn't depend on strip length or reel count, at the cost of a few small blits per reel instead of one.
+
+Both produce the same pixels. SlotGameScreen picks one with REEL_RENDERER (default 'strip');
+`python -m src.utils.reel_benchmark` compares them on long strips.
+"""
+import os
+from bisect import bisect_right
+import pygame
+
+RENDERERS = ('strip', 'tiles')
+
+class TileReel:
+	def __init__(self, strip, symbol_images, viewport_size, prepare_surface=None):
+		self.viewport_width, self.viewport_height = viewport_size
+		self.tiles = [symbol_images[symbol_key] for symbol_key in strip]
+		self.heights = [tile.get_height() for tile in self.tiles]
+		self.starts = [0] # starts[i] is where symbol i begins; the last entry is the cycle height
+		for height in self.heights: self.starts.append(self.starts[-1] + height)
+		self.cycle_height = self.starts.pop()
+
+	def draw(self, canvas, dest, y):
+		top = int(y) # Whole pixels, as a Rect would truncate it
+		index = bisect_right(self.starts, top) - 1
+		skip = top - self.starts[index] # Rows of the first tile above the viewport
+		x, dest_y = dest
+		remaining = self.viewport_height
+		while remaining > 0:
+			height = min(self.heights[index] - skip, remaining)
+			canvas.blit(self.tiles[index], (x, dest_y), (0, skip, self.viewport_width, height))
+			dest_y += height
+			remaining -= height
+			skip = 0
+			index += 1
+			if index == len(self.tiles): index = 0 # Wrap around to the start of the strip
+
+class StripReel:
+	def __init__(self, strip, symbol_images, viewport_size, prepare_surface=None):
+		self.viewport_width, self.viewport_height = viewport_size
+		heights = [symbol_images[symbol_key].get_height() for symbol_key in strip]
+		self.cycle_height = sum(heights)
+		top_overlap = self._overlap(range(len(strip) - 1, -1, -1), heights)[::-1] # End of the strip, drawn above it
+		bottom_overlap = self._overlap(range(len(strip)), heights) # Start of the strip, drawn below it
+		self.cycle_start_y = sum(heights[index] for index in top_overlap) # Where the main cycle starts on the surface
+		surface_height = self.cycle_start_y + self.cycle_height + sum(heights[index] for index in bottom_overlap)
+		self.surface = pygame.Surface((self.viewport_width, surface_height))
+		if prepare_surface: self.surface = prepare_surface(self.surface)
+		current_y = 0
+		for index in top_overlap + list(range(len(strip))) + bottom_overlap:
+			self.surface.blit(symbol_images[strip[index]], (0, current_y))
+			current_y += heights[index]
+
+	def _overlap(self, indices, heights):
+		"""Symbol indices, in the order given, until they cover the viewport."""
+		overlap, covered = [], 0
+		for index in indices:
+			overlap.append(index)
+			covered += heights[index]
+			if covered >= self.viewport_height: break
+		return overlap
+
+	def draw(self, canvas, dest, y):
+		canvas.blit(self.surface, dest, (0, int(self.cycle_start_y + y), self.viewport_width, self.viewport_height))
+
+def create_reel(kind, strip, symbol_images, viewport_size, prepare_surface=None):
+	"""kind is 'strip' or 'tiles'; None reads REEL_RENDERER from the environment."""
+	kind = kind or os.environ.get('REEL_RENDERER', 'strip')
+	if kind not in RENDERERS: raise ValueError(f"Unknown reel renderer '{kind}'. Expected one of {RENDERERS}")
+	reel_class = TileReel if kind == 'tiles' else StripReel
+	return reel_class(strip, symbol_images, viewport_size, prepare_surface)
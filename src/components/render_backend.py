@@ -0,0 +1,245 @@
+# render_backend.py
+"""
+Render backends the screens and buttons draw through.
+
+Both canvases offer the part of the pygame.Surface drawing API the game uses (blit, fill, get_rect,
+get_size, get_width, get_height) plus fade(), invalidate() and present(), so drawing code doesn't
+care which one it has:
+- SurfaceCanvas: the original path. CPU blits onto the display surface, flipped once per frame.
+- TextureCanvas: pygame._sdl2.video. A surface is uploaded as a Texture the first time it is drawn
+  and reused for as long as the surface lives. Surface alpha (set_alpha) becomes texture alpha
+  modulation, and the fade is one blended fill_rect instead of a full-screen alpha blit. SDL's
+  software renderer is used when there is no GPU.
+
+A surface that is redrawn in place, rather than replaced by a new one, must be passed to
+invalidate() after it changes so the texture backend re-uploads it.
+
+With debug on (RENDER_DEBUG=1), the surface canvas logs each place that blits a large surface down a
+slow path: a pixel format that has to be converted on every blit, or per-pixel alpha that went
+through neither RLE nor premultiplication (see AssetManager.prepare_surface).
+
+Screens always draw at the canvas size (800x480); scale picks how that frame reaches a larger panel:
+- 'none': a window of the canvas size, drawn into directly.
+- 'scaled': pygame.SCALED, fullscreen with vsync. SDL stretches the frame on the GPU with the aspect
+  ratio kept (nearest neighbour unless SDL_RENDER_SCALE_QUALITY=linear) and maps the mouse back itself.
+- 'integer', 'nearest', 'smooth': the screens draw into an offscreen surface, which present() scales
+  into a window of output_size (default: the desktop), centred with black bars. 'integer' uses the
+  largest whole multiple that fits (scaling down on a panel smaller than the canvas), 'nearest' fills
+  the panel with nearest neighbour, 'smooth' fills it with pygame.transform.smoothscale. map_event()
+  moves pointer positions back to canvas pixels and drops taps on the bars.
+The texture canvas sets the renderer's logical size instead, so SDL scales and maps the mouse; it
+filters linearly for 'smooth', with nearest neighbour otherwise, and always fits the panel.
+"""
+import logging
+import os
+import sys
+import weakref
+import pygame
+from src.components.asset_manager import PREMULTIPLIED
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('surface', 'texture')
+BLENDMODE_NONE = 0
+BLENDMODE_BLEND = 1
+SLOW_BLIT_MIN_AREA = 4096 # Pixels; smaller blits are too cheap to be worth flagging
+SCALE_MODES = ('none', 'scaled', 'integer', 'nearest', 'smooth')
+POINTER_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION) # Touches arrive as these too
+OFF_CANVAS = (-1, -1) # Where a release on the letterbox bars is reported; no widget contains it
+
+def desktop_size():
+	return pygame.display.get_desktop_sizes()[0]
+
+def fit_rect(size, output_size, integer=False):
+	"""
+	Where a frame of size lands in output_size when scaled with its aspect ratio kept, centred. integer rounds
+	the scale down to a whole multiple, unless the output is too small for 1x; then the frame is scaled down to fit.
+	"""
+	scale = min(output_size[0] / size[0], output_size[1] / size[1])
+	if integer and scale >= 1: scale = int(scale)
+	width, height = int(size[0] * scale), int(size[1] * scale)
+	return pygame.Rect((output_size[0] - width) // 2, (output_size[1] - height) // 2, width, height)
+
+class SurfaceCanvas:
+	name = 'surface'
+
+	def __init__(self, size, title, debug=False, scale='none', output_size=None):
+		self.scale = scale
+		self.display = None # The window's surface when present() scales the frame into it, else the frame is drawn there directly
+		if scale == 'none': self.surface = pygame.display.set_mode(size)
+		elif scale == 'scaled':
+			try: self.surface = pygame.display.set_mode(size, pygame.SCALED | pygame.FULLSCREEN, vsync=1)
+			except pygame.error as e:
+				logger.warning(f"No vsync ({e}). Scaling without it.")
+				self.surface = pygame.display.set_mode(size, pygame.SCALED | pygame.FULLSCREEN)
+		else:
+			self.display = pygame.display.set_mode(output_size or desktop_size())
+			self.display.fill((0, 0, 0)) # The bars; only output_rect is drawn on after this
+			self.output_rect = fit_rect(size, self.display.get_size(), scale == 'integer')
+			if scale == 'integer' and self.output_rect.width < size[0]: logger.warning("The window is smaller than the canvas. Scaling down with nearest neighbour instead of by whole multiples.")
+			self.output = self.display.subsurface(self.output_rect)
+			self.surface = pygame.Surface(size).convert()
+			logger.info(f"Scaling {size[0]}x{size[1]} to {self.output_rect.width}x{self.output_rect.height} ({scale}) in a {self.display.get_width()}x{self.display.get_height()} window")
+		pygame.display.set_caption(title)
+		self.fade_surface = pygame.Surface(size).convert() # One shared overlay instead of one per screen
+		self.fade_surface.fill((0, 0, 0))
+		self.debug = debug
+		self.flagged = set() # (file, line, problem) already logged
+
+	def _check_blit(self, source):
+		width, height = source.get_size()
+		if width * height < SLOW_BLIT_MIN_AREA: return
+		if source.get_bitsize() != self.surface.get_bitsize() or source.get_masks()[:3] != self.surface.get_masks()[:3]:
+			problem = f"pixel format {source.get_bitsize()}-bit {source.get_masks()[:3]} is converted on every blit"
+		elif source.get_flags() & pygame.SRCALPHA and not source.get_flags() & pygame.RLEACCELOK and source not in PREMULTIPLIED:
+			problem = "per-pixel alpha without RLE or premultiplication"
+		else: return
+		caller = sys._getframe(2).f_code # Frame 1 is blit()
+		key = (caller.co_filename, sys._getframe(2).f_lineno, problem)
+		if key in self.flagged: return
+		self.flagged.add(key)
+		logger.warning(f"Slow blit of a {width}x{height} surface at {key[0]}:{key[1]} ({caller.co_name}): {problem}")
+
+	def blit(self, source, dest, area=None):
+		if self.debug: self._check_blit(source)
+		if source in PREMULTIPLIED: return self.surface.blit(source, dest, area, pygame.BLEND_PREMULTIPLIED)
+		return self.surface.blit(source, dest, area)
+
+	def fill(self, color, rect=None):
+		return self.surface.fill(color, rect)
+
+	def fade(self, alpha):
+		"""Darkens the whole frame by alpha (0-255)."""
+		self.fade_surface.set_alpha(alpha)
+		self.surface.blit(self.fade_surface, (0, 0))
+
+	def invalidate(self, surface): pass
+
+	def present(self):
+		if self.display is not None:
+			if self.scale == 'smooth': pygame.transform.smoothscale(self.surface, self.output_rect.size, self.output)
+			else: pygame.transform.scale(self.surface, self.output_rect.size, self.output)
+		pygame.display.flip()
+
+	def map_event(self, event):
+		"""
+		Returns event with its pointer position moved from window pixels to canvas pixels when present() scales the
+		frame. Presses and motion on the black bars return None, so they reach no widget; a release there is moved
+		off the canvas, so a button pressed before the finger slid onto the bars goes back up without clicking.
+		"""
+		if self.display is None or event.type not in POINTER_EVENTS: return event
+		if not self.output_rect.collidepoint(event.pos):
+			if event.type != pygame.MOUSEBUTTONUP: return None
+			return pygame.event.Event(event.type, dict(event.dict, pos=OFF_CANVAS))
+		width, height = self.surface.get_size()
+		attributes = dict(event.dict, pos=((event.pos[0] - self.output_rect.x) * width // self.output_rect.width, (event.pos[1] - self.output_rect.y) * height // self.output_rect.height))
+		if event.type == pygame.MOUSEMOTION: attributes['rel'] = (event.rel[0] * width // self.output_rect.width, event.rel[1] * height // self.output_rect.height)
+		return pygame.event.Event(event.type, attributes)
+
+	def snapshot(self):
+		"""Returns a copy of the current frame, at canvas size, as a Surface."""
+		return self.surface.copy()
+
+	def get_rect(self, **kwargs): return self.surface.get_rect(**kwargs)
+	def get_size(self): return self.surface.get_size()
+	def get_width(self): return self.surface.get_width()
+	def get_height(self): return self.surface.get_height()
+
+class TextureCanvas:
+	name = 'texture'
+
+	def __init__(self, size, title, accelerated=-1, vsync=False, scale='none', output_size=None):
+		from pygame._sdl2.video import Window, Renderer, Texture
+		self._texture_class = Texture
+		self.size = tuple(size)
+		if scale != 'none': # Read by SDL as each texture is created; an explicit setting in the environment wins
+			os.environ.setdefault('SDL_RENDER_SCALE_QUALITY', 'linear' if scale == 'smooth' else 'nearest')
+			if scale == 'integer': logger.warning("The texture canvas can't scale by whole multiples. Filling the panel with nearest neighbour instead.")
+		self.window = Window(title, self.size if scale == 'none' else tuple(output_size or desktop_size()))
+		if scale == 'scaled': self.window.set_fullscreen(desktop=True)
+		try:
+			try: self.renderer = Renderer(self.window, accelerated=accelerated, vsync=vsync or scale == 'scaled')
+			except pygame.error as e:
+				logger.warning(f"No hardware renderer ({e}). Using SDL's software renderer.")
+				self.renderer = Renderer(self.window, accelerated=0)
+			if scale != 'none': self.renderer.logical_size = self.size # SDL scales to the window, letterboxed, and maps the mouse back
+		except Exception:
+			self.window.destroy() # Leave no window behind for the surface fallback
+			raise
+		self.textures = weakref.WeakKeyDictionary() # Surface -> Texture; entries go away with their surfaces
+		self.stale = weakref.WeakSet() # Surfaces changed in place since their last upload
+		self.uploads = 0
+
+	def _texture(self, surface):
+		texture = self.textures.get(surface)
+		if texture is None:
+			texture = self._texture_class.from_surface(self.renderer, surface)
+			self.textures[surface] = texture
+			self.stale.discard(surface)
+			self.uploads += 1
+		elif surface in self.stale:
+			texture.update(surface)
+			self.stale.discard(surface)
+			self.uploads += 1
+		return texture
+
+	def blit(self, source, dest, area=None):
+		if not source.get_width() or not source.get_height(): return pygame.Rect(dest[0], dest[1], 0, 0) # e.g. a blank text line; SDL has no empty textures
+		texture = self._texture(source)
+		alpha = source.get_alpha()
+		if alpha is not None and alpha < 255: texture.blend_mode = BLENDMODE_BLEND
+		texture.alpha = 255 if alpha is None else alpha
+		if area is not None: area = pygame.Rect(area)
+		width, height = area.size if area is not None else source.get_size()
+		destination = pygame.Rect(dest[0], dest[1], width, height)
+		texture.draw(srcrect=area, dstrect=destination)
+		return destination
+
+	def fill(self, color, rect=None):
+		self.renderer.draw_blend_mode = BLENDMODE_NONE
+		self.renderer.draw_color = pygame.Color(color) # Takes RGB as well as RGBA, as Surface.fill does
+		if rect is None: self.renderer.clear()
+		else: self.renderer.fill_rect(pygame.Rect(rect))
+
+	def fade(self, alpha):
+		self.renderer.draw_blend_mode = BLENDMODE_BLEND
+		self.renderer.draw_color = (0, 0, 0, alpha)
+		self.renderer.fill_rect((0, 0, *self.size))
+
+	def invalidate(self, surface):
+		if surface in self.textures: self.stale.add(surface)
+
+	def map_event(self, event): return event # SDL already reports the mouse in logical coordinates, outside the canvas on the bars
+
+	def present(self):
+		self.renderer.present()
+
+	def snapshot(self):
+		return self.renderer.to_surface()
+
+	def get_rect(self, **kwargs):
+		rect = pygame.Rect((0, 0), self.size)
+		for attribute, value in kwargs.items(): setattr(rect, attribute, value) # Same keywords as Surface.get_rect
+		return rect
+	def get_size(self): return self.size
+	def get_width(self): return self.size[0]
+	def get_height(self): return self.size[1]
+
+def create_canvas(backend, size, title, debug=False, scale='none', output_size=None):
+	"""
+	Opens the game window with the requested backend ('surface' or 'texture').
+	Falls back to the surface path if pygame._sdl2 is missing or no renderer can be created.
+	debug flags slow-path blits on the surface canvas. scale is one of SCALE_MODES; output_size is
+	the panel size the frame is scaled to, default the desktop's.
+	"""
+	if backend not in BACKENDS: raise ValueError(f"Unknown render backend '{backend}'. Expected one of {BACKENDS}")
+	if scale not in SCALE_MODES: raise ValueError(f"Unknown scale mode '{scale}'. Expected one of {SCALE_MODES}")
+	if backend == 'texture':
+		try:
+			canvas = TextureCanvas(size, title, scale=scale, output_size=output_size)
+			logger.info("Rendering with SDL textures")
+			return canvas
+		except (ImportError, pygame.error) as e:
+			logger.warning(f"Texture renderer unavailable ({e}). Falling back to surface rendering.")
+	logger.info("Rendering with surfaces")
+	return SurfaceCanvas(size, title, debug, scale, output_size)
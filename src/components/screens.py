@@ -0,0 +1,12 @@
+# screens.py
+from src.components.title_screen import TitleScreen
+from src.components.slot_game_screen import SlotGameScreen
+from src.components.sperm_bank_screen import SpermBankScreen
+
+SCREEN_CLASSES = {# Screen class mapping
+	"TitleScreen": TitleScreen,
+	"SlotGameScreen": SlotGameScreen,
+	"SpermBankScreen": SpermBankScreen
+	# "GameScreen": GameScreen, # Add other screen classes here
+	# "ShopScreen": ShopScreen,
+}
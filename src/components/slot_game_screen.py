@@ -1,14 +1,14 @@
 # title_screen.py
 import pygame
 import logging
-import random
 import numpy as np
 from enum import Enum, auto
-from collections import Counter
 
 from src.components.base_screen import BaseScreen
 from src.components.button_image import ButtonImage
 from src.components.button_image import ButtonBase
+from src.components.reel_renderer import create_reel
+from src.components.slot_machine import SlotMachine
 
 logger = logging.getLogger(__name__)
 
@@ -30,75 +30,22 @@ class ReelState(Enum):
 	BOUNCING_BACK = auto()
 
 class SlotGameScreen(BaseScreen):
-	# Total Expected Payout Value (for 1 unit bet): 749005.0
-	# Total Possible Combinations: 786432
-	# Calculated Theoretical RTP: 94.9201%
-	RAW_PAYTABLE = '''
-		💋💋💋,800,Triple Wild
-		💋💋7,320,Triple Seven (2 Wilds x4)
-		💋77,160,Triple Seven (1 Wild x2)
-		777,80,Triple Seven
-		💋💋≡,160,Triple Bar3 (2 Wilds x4)
-		💋≡≡,80,Triple Bar3 (1 Wild x2)
-		≡≡≡,40,Triple Bar3
-		💋💋=,100,Triple Bar2 (2 Wilds x4)
-		💋==,50,Triple Bar2 (1 Wild x2)
-		===,25,Triple Bar2
-		💋💋-,40,Triple Bar1 (2 Wilds x4)
-		💋--,20,Triple Bar1 (1 Wild x2)
-		---,10,Triple Bar1
-		💋💋🍒,40,Triple Cherry (2 Wilds x4)
-		💋🍒🍒,20,Triple Cherry (1 Wild x2)
-		🍒🍒🍒,10,Triple Cherry
-		💋≡=,10,Any Three Bars (1 Wild x2)
-		💋≡-,10,Any Three Bars (1 Wild x2)
-		💋=-,10,Any Three Bars (1 Wild x2)
-		🍒💋7,10,Any Two Cherries (1 Wild x2)
-		🍒💋≡,10,Any Two Cherries (1 Wild x2)
-		🍒💋=,10,Any Two Cherries (1 Wild x2)
-		🍒💋-,10,Any Two Cherries (1 Wild x2)
-		🍒💋□,10,Any Two Cherries (1 Wild x2)
-		≡≡=,5,Any Three Bars
-		≡≡-,5,Any Three Bars
-		==≡,5,Any Three Bars
-		==-,5,Any Three Bars
-		--≡,5,Any Three Bars
-		--=,5,Any Three Bars
-		-=≡,5,Any Three Bars
-		🍒🍒7,5,Any Two Cherries
-		🍒🍒≡,5,Any Two Cherries
-		🍒🍒=,5,Any Two Cherries
-		🍒🍒-,5,Any Two Cherries
-		🍒🍒□,5,Any Two Cherries
-		💋7≡,4,Any One Cherry (1 Wild x2)
-		💋7=,4,Any One Cherry (1 Wild x2)
-		💋7-,4,Any One Cherry (1 Wild x2)
-		💋7□,4,Any One Cherry (1 Wild x2)
-		💋≡□,4,Any One Cherry (1 Wild x2)
-		💋=□,4,Any One Cherry (1 Wild x2)
-		💋-□,4,Any One Cherry (1 Wild x2)
-		💋□□,4,Any One Cherry (1 Wild x2)
-		🍒7≡,2,Any One Cherry
-		🍒7=,2,Any One Cherry
-		🍒7-,2,Any One Cherry
-		🍒7□,2,Any One Cherry
-		🍒≡=,2,Any One Cherry
-		🍒≡-,2,Any One Cherry
-		🍒≡□,2,Any One Cherry
-		🍒=-,2,Any One Cherry
-		🍒=□,2,Any One Cherry
-		🍒-□,2,Any One Cherry
-		🍒77,2,Any One Cherry
-		🍒≡≡,2,Any One Cherry
-		🍒==,2,Any One Cherry
-		🍒--,2,Any One Cherry
-		🍒□□,2,Any One Cherry
-	'''
-	REEL_COUNT = 3
-	MAXIMUM_BET = 3
-
-	def __init__(self, screen_surface, device, asset_manager, game_data):
-		super().__init__(screen_surface, device, asset_manager, game_data)
+	REEL_COUNT = SlotMachine.REEL_COUNT
+	MAXIMUM_BET = SlotMachine.MAXIMUM_BET
+	REEL_RENDERER = None # 'strip' or 'tiles' (see reel_renderer.py); None reads REEL_RENDERER from the environment
+	LINES = 1 # Paylines played, the first LINES of SlotMachine.PAYLINES. The current paytable returns over 100% on any more
+	MAX_RTP = 100.0 # Percent; check_lines() rejects a LINES whose exact RTP reaches this
+
+	@classmethod
+	def check_lines(cls):
+		"""Raises ValueError if LINES is out of range or its exact RTP reaches MAX_RTP. Called once at startup, not per visit."""
+		if not 1 <= cls.LINES <= len(SlotMachine.PAYLINES): raise ValueError(f"Between 1 and {len(SlotMachine.PAYLINES)} paylines can be played, not {cls.LINES}.")
+		if cls.LINES == 1: return # The paytable is tuned for the middle line
+		rtp = SlotMachine(paylines=SlotMachine.PAYLINES[:cls.LINES]).calculate_rtp()
+		if rtp >= cls.MAX_RTP: raise ValueError(f"{cls.LINES} paylines return {rtp:.2f}%, which is not below {cls.MAX_RTP}%.")
+
+	def __init__(self, canvas, device, asset_manager, game_data):
+		super().__init__(canvas, device, asset_manager, game_data)
 		self._init_static_gfx()
 		self._init_lever_shaft()
 		self._init_lever_head()
@@ -108,7 +55,7 @@ class SlotGameScreen(BaseScreen):
 		self.machine_state = MachineState.LOCKED
 		self.reel_states = [ReelState.STOPPED] * SlotGameScreen.REEL_COUNT
 		self.wager = None
-		# self.calculate_rtp() # Warning, this calculation is long and may lock up your system for a few seconds
+		# self.calculate_rtp() # Logs the theoretical RTP of the current strips
 
 	def _init_static_gfx(self):
 		self.background = self.asset_manager.load_image('slot_game_bg.webp', False, False)
@@ -124,14 +71,15 @@ class SlotGameScreen(BaseScreen):
 		self.lever_shaft_fixed_bottom_y = 381
 		self.lever_shaft_current_topleft_pos = [763, 0.0]
 		self.lever_progress = 0.0
+		self.lever_previous_progress = 0.0
 		self.lever_return_timer = 0.0
 		self.lever_withdraw_duration = .2
 		self.withdraw_return_initial_progress = 0.0
-		self.lever_shadow_original = self.asset_manager.load_image('lever_shadow.png', True, True)
+		self.lever_shadow_original = self.asset_manager.load_image('lever_shadow.png', True, True, static=False) # Rescaled and faded every frame
 		self.lever_shadow_rendered = None
 
 	def _init_lever_head(self):
-		self.lever_head_original = self.asset_manager.load_image('lever_head.webp', True, True)
+		self.lever_head_original = self.asset_manager.load_image('lever_head.webp', True, True, static=False) # Rotozoomed every frame
 		self.lever_head_rect = self.lever_head_original.get_rect()
 		self.lever_head_rendered = None
 		self.lever_head_content_offset_x_in_padded = 2 # X offset of content within padded image
@@ -161,7 +109,7 @@ class SlotGameScreen(BaseScreen):
 		self.blank_height = 29
 		self.reel_positions = [(394, 172), (503, 172), (612, 172)]
 		self.symbol_images = {}
-		self.symbol_images['□'] = pygame.Surface((89, self.blank_height))
+		self.symbol_images['□'] = self.asset_manager.prepare_surface(pygame.Surface((89, self.blank_height)))
 		self.symbol_images['□'].fill(pygame.Color("#fffcf9"))
 		self.symbol_images['🍒'] = self.asset_manager.load_image('symbol_cherry.webp', False, True)
 		self.symbol_images['-'] = self.asset_manager.load_image('symbol_bar_1.webp', False, True)
@@ -169,31 +117,10 @@ class SlotGameScreen(BaseScreen):
 		self.symbol_images['≡'] = self.asset_manager.load_image('symbol_bar_3.webp', False, True)
 		self.symbol_images['7'] = self.asset_manager.load_image('symbol_seven.webp', False, True)
 		self.symbol_images['💋'] = self.asset_manager.load_image('symbol_wild.webp', False, True)
-		self.parsed_paytable = self.parse_paytable_data(SlotGameScreen.RAW_PAYTABLE)
-		self.visual_strips_data = [
-			['-', '□', '≡', '□', '🍒', '□', '=', '□', '-', '□', '7', '□', '≡', '□', '=', '□', '-', '□', '💋', '□', '🍒', '□'],
-			['🍒', '□', '-', '□', '=', '□', '🍒', '□', '≡', '□', '=', '□', '7', '□', '-', '□', '🍒', '□', '💋', '□', '-', '□'],
-			['=', '□', '-', '□', '🍒', '□', '-', '□', '7', '□', '🍒', '□', '=', '□', '-', '□', '≡', '□', '💋', '□', '🍒', '□']
-		]
-		self.logical_strips_compositions = [
-			{'💋':1, '7':9, '≡':9, '=': 9, '-':26, '🍒': 1, '□':9}, # Reel 1 (e.g., 64 stops total) - More "action"
-			{'💋':1, '7':1, '≡':1, '=':6, '-':41, '🍒':1, '□':45}, # Reel 2 (e.g., 96 stops total) - A bit tighter
-			{'💋':1, '7':1, '≡':1, '=':3, '-':22, '🍒':10, '□':90} # Reel 3 (e.g., 128 stops total) - Controls top payouts, fewer high symbols
-		]
-		self.logical_strips_data = []
-		for r_idx, composition in enumerate(self.logical_strips_compositions):
-			current_strip = []
-			for symbol, count in composition.items():
-				current_strip.extend([symbol] * count) # Add the symbol to the strip 'count' number of times
-			self.logical_strips_data.append(current_strip)
-		self.visual_symbol_indices_map = [] # List of dicts, one per reel
-		for visual_strip in self.visual_strips_data:
-			symbol_to_indices = {} # For the current reel
-			for index, symbol_key in enumerate(visual_strip):
-				if symbol_key not in symbol_to_indices:
-					symbol_to_indices[symbol_key] = []
-				symbol_to_indices[symbol_key].append(index)
-			self.visual_symbol_indices_map.append(symbol_to_indices)
+		self.lines = self.LINES
+		self.slot_machine = SlotMachine(paylines=SlotMachine.PAYLINES[:self.lines])
+		self.visual_strips_data = self.slot_machine.visual_strips_data
+		self.visual_stops = None # Where the reels of the current spin stop, for evaluating its paylines
 
 		self.reel_cycle_heights = [] # Height of one full pass of symbols for each reel
 		self.reel_symbol_info = [] # List of lists of dicts: [{'key': key, 'y_start': y, 'height': h, 'mid_y': y + h/2}, ...]
@@ -211,58 +138,11 @@ class SlotGameScreen(BaseScreen):
 				current_y += img_height
 			self.reel_symbol_info.append(symbol_info_for_this_strip)
 			self.reel_cycle_heights.append(current_y)
-		self.reel_surfaces = []
-		self.reel_cycle_start_ys = [] # Y pos where main cycle starts on each extended reel
-		for r_idx, strip_data in enumerate(self.visual_strips_data): # Build the actual extended reel surfaces for drawing
-			cycle_height = self.reel_cycle_heights[r_idx]
-			# --- Determine symbols for top overlap (end of strip) ---
-			top_overlap_symbols = []
-			temp_h = 0
-			for symbol_key in reversed(strip_data): # Iterate backwards
-				img_h = self.symbol_images[symbol_key].get_height()
-				top_overlap_symbols.insert(0, symbol_key) # Add to front
-				temp_h += img_h
-				if temp_h >= self.reel_viewport_height:
-					break
-			top_overlap_actual_height = sum(self.symbol_images[s].get_height() for s in top_overlap_symbols)
-			# --- Determine symbols for bottom overlap (start of strip) ---
-			bottom_overlap_symbols = []
-			temp_h = 0
-			for symbol_key in strip_data:
-				img_h = self.symbol_images[symbol_key].get_height()
-				bottom_overlap_symbols.append(symbol_key)
-				temp_h += img_h
-				if temp_h >= self.reel_viewport_height:
-					break
-			bottom_overlap_actual_height = sum(self.symbol_images[s].get_height() for s in bottom_overlap_symbols)
-			extended_surface_height = top_overlap_actual_height + cycle_height + bottom_overlap_actual_height
-			reel_surf = pygame.Surface((89, extended_surface_height))
-
-			current_y_blit_pos = 0
-			# 1. Blit top overlap (end of strip)
-			for symbol_key in top_overlap_symbols:
-				symbol_image = self.symbol_images[symbol_key]
-				reel_surf.blit(symbol_image, (0, current_y_blit_pos))
-				current_y_blit_pos += symbol_image.get_height()
-			
-			# This is where the "main cycle" conceptually starts on this extended surface.
-			self.reel_cycle_start_ys.append(top_overlap_actual_height)
-
-			# 2. Blit main cycle
-			for symbol_key in strip_data: # The full original strip
-				symbol_image = self.symbol_images[symbol_key]
-				reel_surf.blit(symbol_image, (0, current_y_blit_pos))
-				current_y_blit_pos += symbol_image.get_height()
-
-			# 3. Blit bottom overlap (start of strip)
-			for symbol_key in bottom_overlap_symbols:
-				symbol_image = self.symbol_images[symbol_key]
-				reel_surf.blit(symbol_image, (0, current_y_blit_pos))
-				current_y_blit_pos += symbol_image.get_height()
-				
-			self.reel_surfaces.append(reel_surf)
+		viewport_size = (self.reel_viewport_width, self.reel_viewport_height)
+		self.reels = [create_reel(self.REEL_RENDERER, strip_data, self.symbol_images, viewport_size, self.asset_manager.prepare_surface) for strip_data in self.visual_strips_data]
 		self.reel_result = None
 		self.reel_current_ys = [0.0] * SlotGameScreen.REEL_COUNT
+		self.reel_previous_ys = [0.0] * SlotGameScreen.REEL_COUNT
 		self.reel_target_ys = [0.0] * SlotGameScreen.REEL_COUNT
 		# Animation parameters
 		self.all_spin_duration = .6  # seconds all reels spin freely
@@ -293,10 +173,11 @@ class SlotGameScreen(BaseScreen):
 		self.win_amount = 0
 		self.win_text_surface = None
 		self.win_text_rect = None
-		self.bet_plus = ButtonImage(self.asset_manager.load_image('bet_plus.webp', True, True), 319, 416, None, None, self._increment_bet)
-		self.bet_minus = ButtonImage(self.asset_manager.load_image('bet_minus.webp', True, True), 487, 416, None, None, self._decrement_bet)
-		self.bet_max = ButtonImage(self.asset_manager.load_image('bet_max.webp', True, True), 656, 416, None, None, self._maximize_bet)
-		self.sperm_bank_sign = ButtonBase(0, 0, 135, 116, self._to_sperm_bank)
+		self.ui_state = None # (money, bet, win) the text surfaces were rendered for
+		self.bet_plus = self.widgets.add(ButtonImage(self.asset_manager.load_image('bet_plus.webp', True, True), 319, 416, None, None, self._increment_bet))
+		self.bet_minus = self.widgets.add(ButtonImage(self.asset_manager.load_image('bet_minus.webp', True, True), 487, 416, None, None, self._decrement_bet))
+		self.bet_max = self.widgets.add(ButtonImage(self.asset_manager.load_image('bet_max.webp', True, True), 656, 416, None, None, self._maximize_bet))
+		self.sperm_bank_sign = self.widgets.add(ButtonBase(0, 0, 135, 116, self._to_sperm_bank))
 	def _increment_bet(self):
 		if self.game_data.increment_bet(SlotGameScreen.MAXIMUM_BET): self.test_machine_ready()
 	def _decrement_bet(self):
@@ -307,91 +188,34 @@ class SlotGameScreen(BaseScreen):
 		self.set_next_screen('SpermBankScreen')
 		self.request_end_screen()
 
-	def parse_paytable_data(self, raw_data):
-		parsed_table = []
-		lines = raw_data.strip().split('\n')
-		for line_number, raw_line_content in enumerate(lines):
-			line = raw_line_content.strip()
-			if not line: continue # Skip empty lines that might result from stripping
-			parts = line.split(',')
-			name = parts[2]
-			payout = int(parts[1])
-			combination_string = parts[0] # '💋💋7'
-			combination_tuple = tuple(combination_string) # ('💋', '💋', '7')
-			combination_canonical = self._iterable_to_canonical(combination_tuple) # (('7', 1), ('💋', 2))
-			parsed_table.append({
-				"combination_canonical": combination_canonical,
-				"payout": payout,
-				"name": name,
-				"original_combo_str": combination_string
-			})
-		return parsed_table
-	def _iterable_to_canonical(self, array_or_tuple):
-		counter = Counter(array_or_tuple) # {'💋': 2, '7': 1}
-		return tuple(sorted(counter.items()))
-
 	def calculate_rtp(self):
-		logger.info("Calculating RTP...")
-		total_payouts = 0.0
-		len_reel0 = len(self.logical_strips_data[0])
-		len_reel1 = len(self.logical_strips_data[1])
-		len_reel2 = len(self.logical_strips_data[2])
-		total_possible_combinations = len_reel0 * len_reel1 * len_reel2
-		total_combinations_processed = 0
-		for idx0 in range(len_reel0):
-			s1 = self.logical_strips_data[0][idx0]
-			for idx1 in range(len_reel1):
-				s2 = self.logical_strips_data[1][idx1]
-				for idx2 in range(len_reel2):
-					s3 = self.logical_strips_data[2][idx2]
-					tuple = (s1, s2, s3)
-					canonical = self._iterable_to_canonical(tuple)
-					payout = self._get_payout_from_canonical(canonical)
-					total_payouts += payout
-					total_combinations_processed += 1
-		if total_combinations_processed != total_possible_combinations: logger.warning(f"Mismatch in processed combinations ({total_combinations_processed}) vs. theoretical ({total_possible_combinations})")
-		rtp_decimal = total_payouts / total_possible_combinations
-		rtp_percentage = rtp_decimal * 100.0
-		logger.info(f"Total Expected Payout Value (for 1 unit bet): {total_payouts}")
-		logger.info(f"Total Possible Combinations: {total_possible_combinations}")
-		logger.info(f"Calculated Theoretical RTP: {rtp_percentage:.4f}%")
-		return rtp_percentage
+		return self.slot_machine.calculate_rtp()
 
 	def test_machine_ready(self):
-		if self.game_data.money >= self.game_data.bet:
+		if self.game_data.money >= self.game_data.bet * self.lines:
 			self.reset_device_initial()
 			self.machine_state = MachineState.READY
 		else:
-			logger.info(f"Your holdings of ${self.game_data.money} is not enough to cover the bet of ${self.game_data.bet}.")
+			logger.info(f"Your holdings of ${self.game_data.money} is not enough to cover the bet of ${self.game_data.bet * self.lines}.")
 
 	def commit_and_roll(self):
-		self.wager = self.game_data.place_bet()
+		self.wager = self.game_data.place_bet(self.lines)
 		self.game_data.save()
 		logical_indices = self.roll_logical_stops()
 		self.reel_result = self.logical_to_symbols(logical_indices)
-		visual_indices = self.symbols_to_visual(self.reel_result)
-		self.determine_target_ys(visual_indices)
+		self.visual_stops = self.symbols_to_visual(self.reel_result)
+		self.determine_target_ys(self.visual_stops)
 		self.spin_all_reels() # changes self.machine_state to MachineState.ALL_SPINNING
 
 	def roll_logical_stops(self):
-		logical_indices = []
-		for logical_strip in self.logical_strips_data: logical_indices.append(random.randrange(len(logical_strip)))
-		logger.info(f"Logical outcomes determined: {logical_indices})")
-		return logical_indices
+		return self.slot_machine.roll_logical_stops()
 
 	def logical_to_symbols(self, logical_indices):
-		chosen_symbols = []
-		for reel_index, stop_index in enumerate(logical_indices): # indices to symbols
-			chosen_symbols.append(self.logical_strips_data[reel_index][stop_index])
-		logger.info(f"Outcomes as symbols: {chosen_symbols})")
-		return chosen_symbols
+		return self.slot_machine.logical_to_symbols(logical_indices)
 
 	def symbols_to_visual(self, chosen_symbols):
-		visual_indices = []
-		for reel_index, symbol_key in enumerate(chosen_symbols):
-			matching_symbol_indices = self.visual_symbol_indices_map[reel_index].get(symbol_key)
-			visual_indices.append(random.choice(matching_symbol_indices))
-		logger.info(f"Symbols {chosen_symbols}: mapped to visual indices {visual_indices}")
+		visual_indices = self.slot_machine.choose_visual_stops(chosen_symbols)
+		logger.debug("Symbols %s: mapped to visual indices %s", chosen_symbols, visual_indices)
 		return visual_indices
 
 	def determine_target_ys(self, visual_indices):
@@ -403,6 +227,7 @@ class SlotGameScreen(BaseScreen):
 	def current_to_target_ys(self):
 		for reel_index, target_y in enumerate(self.reel_target_ys):
 			self.reel_current_ys[reel_index] = target_y
+			self.reel_previous_ys[reel_index] = target_y
 
 	def spin_all_reels(self):
 		logger.debug("Starting all reel spins.")
@@ -426,18 +251,16 @@ class SlotGameScreen(BaseScreen):
 	def on_exit(self):
 		super().on_exit()
 
-	def handle_event(self, event):
-		base_event = super().handle_event(event)
-		if base_event:
-			self.bet_plus.handle_event(base_event)
-			self.bet_minus.handle_event(base_event)
-			self.bet_max.handle_event(base_event)
-			self.sperm_bank_sign.handle_event(base_event)
+	def is_animating(self):
+		return super().is_animating() or self.machine_state not in (MachineState.LOCKED, MachineState.READY) # Spinning reels or a returning lever
+
+	def _save_previous_state(self):
+		self.reel_previous_ys[:] = self.reel_current_ys
+		self.lever_previous_progress = self.lever_progress
 
 	def _update_always(self, time_delta):
 		self.update_reel_animations(time_delta)
 		self.update_lever_return(time_delta)
-		self.calc_lever(self.lever_progress)
 		self.update_ui()
 
 	def _update_interactive(self):
@@ -446,7 +269,9 @@ class SlotGameScreen(BaseScreen):
 
 	def update_lever_by_device(self):
 		if self.machine_state == MachineState.READY:
-			self.lever_progress = max(0.0, min(1.0, self.device_delta / self.device_threshold))
+			progress = max(0.0, min(1.0, self.device_delta / self.device_threshold))
+			if progress != self.lever_progress: self.input_shown()
+			self.lever_progress = progress
 			if self.lever_progress == 1:
 				self.lever_return_timer = 0.0
 				self.commit_and_roll()
@@ -551,7 +376,7 @@ class SlotGameScreen(BaseScreen):
 					if distance_to_overshoot <= stop_threshold and distance_to_overshoot >= 0:
 						self.reel_current_ys[i] = overshoot_y
 						self.reel_states[i] = ReelState.BOUNCING_BACK
-						logger.debug(f"Reel {i}: Snapped to point {overshoot_y}. Bouncing back to {self.reel_target_ys[i]}.")
+						logger.debug("Reel %d: Snapped to point %s. Bouncing back to %s.", i, overshoot_y, self.reel_target_ys[i])
 					else:
 						self.reel_current_ys[i] -= move_amount
 						if self.reel_current_ys[i] < 0: self.reel_current_ys[i] += cycle_height
@@ -563,18 +388,20 @@ class SlotGameScreen(BaseScreen):
 					if distance_to_final <= move_amount * 1.1 and distance_to_final >=0:
 						self.reel_current_ys[i] = final_y
 						self.reel_states[i] = ReelState.STOPPED
-						logger.debug(f"Reel {i}: Bounced to final target {final_y}. STOPPED.")
+						logger.debug("Reel %d: Bounced to final target %s. STOPPED.", i, final_y)
 					else:
 						self.reel_current_ys[i] += move_amount
 						if self.reel_current_ys[i] >= cycle_height: self.reel_current_ys[i] -= cycle_height
 
 	def evaluate_result(self):
-		result_canonical = self._iterable_to_canonical(self.reel_result)
-		paytable_entry = self._get_paytable_entry(result_canonical)
-		if paytable_entry:
-			multiplier = paytable_entry["payout"]
+		multipliers, entry_indices = self.slot_machine.evaluate_lines(self.visual_stops)
+		multiplier = int(multipliers.sum())
+		if multiplier:
 			self.win_amount = self.wager * multiplier
-			logger.info(f'{paytable_entry["name"]} pays {multiplier}x.')
+			for line, entry_index in enumerate(entry_indices.tolist()):
+				if entry_index < 0: continue
+				paytable_entry = self.slot_machine.parsed_paytable[entry_index]
+				logger.info("Line %d: %s pays %sx.", line + 1, paytable_entry["name"], paytable_entry["payout"])
 			self.game_data.win(self.win_amount)
 			self.game_data.save()
 			self.update_attendant()
@@ -582,16 +409,11 @@ class SlotGameScreen(BaseScreen):
 			self.win_amount = 0
 		self.wager = None
 		self.test_machine_ready()
-	def _get_paytable_entry(self, result_canonical):
-		for winning_entry in self.parsed_paytable:
-			if winning_entry['combination_canonical'] == result_canonical: return winning_entry
-		return None
-	def _get_payout_from_canonical(self, canonical):
-		entry = self._get_paytable_entry(canonical)
-		if entry: return entry['payout']
-		else: return 0
 
 	def update_ui(self):
+		ui_state = (self.game_data.money, self.game_data.bet, self.win_amount)
+		if ui_state == self.ui_state: return # Text only changes with these, not every frame
+		self.ui_state = ui_state
 		money_string = f"${self.game_data.money}"
 		shadow_offset = 1
 		money_text = self.libre_baskerville_36.render(money_string, True, (0, 255, 0))
@@ -599,10 +421,11 @@ class SlotGameScreen(BaseScreen):
 		self.money_text_surface = pygame.Surface((money_text.get_width()+shadow_offset, money_text.get_height()+shadow_offset), pygame.SRCALPHA)
 		self.money_text_surface.blit(money_shadow, (0, 1))
 		self.money_text_surface.blit(money_text, (1, 0))
-		self.money_text_rect = self.money_text_surface.get_rect(midtop=(self.screen_surface.get_width() // 2, 0))
-		self.bet_text_surface = self.dseg7_36.render(f"{self.game_data.bet}", True, (255, 0, 0))
+		self.money_text_surface = self.asset_manager.prepare_surface(self.money_text_surface)
+		self.money_text_rect = self.money_text_surface.get_rect(midtop=(self.canvas.get_width() // 2, 0))
+		self.bet_text_surface = self.asset_manager.prepare_surface(self.dseg7_36.render(f"{self.game_data.bet * self.lines}", True, (255, 0, 0)))
 		self.bet_text_rect = self.bet_text_surface.get_rect(topright=(417, 361))
-		self.win_text_surface = self.dseg7_36.render(f"{self.win_amount}", True, (255, 0, 0))
+		self.win_text_surface = self.asset_manager.prepare_surface(self.dseg7_36.render(f"{self.win_amount}", True, (255, 0, 0)))
 		self.win_text_rect = self.win_text_surface.get_rect(topright=(781, 361))
 
 	def update_attendant(self):
@@ -614,34 +437,21 @@ class SlotGameScreen(BaseScreen):
 		elif self.arousal >= self.undress_1: self.attendant = self.asset_manager.load_image('att1.webp', True, False)
 
 	def _render_content(self):
-		self.screen_surface.blit(self.background, (0, 0))
-		for i in range(len(self.reel_surfaces)):
-			reel_to_blit = self.reel_surfaces[i]
+		self.calc_lever(self.lerp(self.lever_previous_progress, self.lever_progress)) # Lever is rebuilt once per frame, not once per step
+		self.canvas.blit(self.background, (0, 0))
+		for i, reel in enumerate(self.reels):
 			destination_on_screen = self.reel_positions[i]
-			source_rect_on_reel = pygame.Rect(
-				0,
-				self.reel_cycle_start_ys[i] + self.reel_current_ys[i],
-				self.reel_viewport_width,
-				self.reel_viewport_height
-			)
-			try:
-				self.screen_surface.blit(
-					reel_to_blit,
-					destination_on_screen,
-					area=source_rect_on_reel
-				)
+			render_y = self.lerp_wrapped(self.reel_previous_ys[i], self.reel_current_ys[i], self.reel_cycle_heights[i])
+			try: reel.draw(self.canvas, destination_on_screen, render_y)
 			except Exception as e:
-				logger.error(f"Error blitting reel {i}: {e}. Source Rect: {source_rect_on_reel}, Reel Surf Size: {reel_to_blit.get_size()}, Current_ys: {self.reel_current_ys[i]}, MainCycleStart: {self.reel_cycle_start_ys[i]}")
-			self.screen_surface.blit(self.reel_shading, destination_on_screen)
-		self.screen_surface.blit(self.reel_payline, (386, 253))
-		self.screen_surface.blit(self.lever_shaft_rendered, self.lever_shaft_current_topleft_pos)
-		self.screen_surface.blit(self.lever_shadow_rendered, self.lever_shaft_current_topleft_pos)
-		self.screen_surface.blit(self.lever_head_rendered, self.lever_head_current_topleft_pos)
-		self.screen_surface.blit(self.attendant,(-50, -41))
-		self.screen_surface.blit(self.money_text_surface, self.money_text_rect)
-		self.screen_surface.blit(self.digital_panel, (319, 348))
-		self.screen_surface.blit(self.bet_text_surface, self.bet_text_rect)
-		self.screen_surface.blit(self.win_text_surface, self.win_text_rect)
-		self.bet_plus.render(self.screen_surface)
-		self.bet_minus.render(self.screen_surface)
-		self.bet_max.render(self.screen_surface)
+				logger.error(f"Error drawing reel {i}: {e}. Render_y: {render_y}, Cycle height: {self.reel_cycle_heights[i]}")
+			self.canvas.blit(self.reel_shading, destination_on_screen)
+		self.canvas.blit(self.reel_payline, (386, 253))
+		self.canvas.blit(self.lever_shaft_rendered, self.lever_shaft_current_topleft_pos)
+		self.canvas.blit(self.lever_shadow_rendered, self.lever_shaft_current_topleft_pos)
+		self.canvas.blit(self.lever_head_rendered, self.lever_head_current_topleft_pos)
+		self.canvas.blit(self.attendant,(-50, -41))
+		self.canvas.blit(self.money_text_surface, self.money_text_rect)
+		self.canvas.blit(self.digital_panel, (319, 348))
+		self.canvas.blit(self.bet_text_surface, self.bet_text_rect)
+		self.canvas.blit(self.win_text_surface, self.win_text_rect)
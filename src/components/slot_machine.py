@@ -0,0 +1,312 @@
+# slot_machine.py
+import itertools
+import json
+import logging
+import numpy as np
+from collections import Counter
+
+from src.utils.rng import StopStream
+
+logger = logging.getLogger(__name__)
+
+class SlotMachine:
+	"""
+	The slot math core: paytable, logical reel strips, stop rolling and result evaluation.
+	It has no pygame dependency so it can back SlotGameScreen, headless tools and the spin server alike.
+	"""
+	# Total Expected Payout Value (for 1 unit bet): 746482.0
+	# Total Possible Combinations: 786432
+	# Calculated Theoretical RTP: 94.9201%
+	RAW_PAYTABLE = '''
+		💋💋💋,800,Triple Wild
+		💋💋7,320,Triple Seven (2 Wilds x4)
+		💋77,160,Triple Seven (1 Wild x2)
+		777,80,Triple Seven
+		💋💋≡,160,Triple Bar3 (2 Wilds x4)
+		💋≡≡,80,Triple Bar3 (1 Wild x2)
+		≡≡≡,40,Triple Bar3
+		💋💋=,100,Triple Bar2 (2 Wilds x4)
+		💋==,50,Triple Bar2 (1 Wild x2)
+		===,25,Triple Bar2
+		💋💋-,40,Triple Bar1 (2 Wilds x4)
+		💋--,20,Triple Bar1 (1 Wild x2)
+		---,10,Triple Bar1
+		💋💋🍒,40,Triple Cherry (2 Wilds x4)
+		💋🍒🍒,20,Triple Cherry (1 Wild x2)
+		🍒🍒🍒,10,Triple Cherry
+		💋≡=,10,Any Three Bars (1 Wild x2)
+		💋≡-,10,Any Three Bars (1 Wild x2)
+		💋=-,10,Any Three Bars (1 Wild x2)
+		🍒💋7,10,Any Two Cherries (1 Wild x2)
+		🍒💋≡,10,Any Two Cherries (1 Wild x2)
+		🍒💋=,10,Any Two Cherries (1 Wild x2)
+		🍒💋-,10,Any Two Cherries (1 Wild x2)
+		🍒💋□,10,Any Two Cherries (1 Wild x2)
+		≡≡=,5,Any Three Bars
+		≡≡-,5,Any Three Bars
+		==≡,5,Any Three Bars
+		==-,5,Any Three Bars
+		--≡,5,Any Three Bars
+		--=,5,Any Three Bars
+		-=≡,5,Any Three Bars
+		🍒🍒7,5,Any Two Cherries
+		🍒🍒≡,5,Any Two Cherries
+		🍒🍒=,5,Any Two Cherries
+		🍒🍒-,5,Any Two Cherries
+		🍒🍒□,5,Any Two Cherries
+		💋7≡,4,Any One Cherry (1 Wild x2)
+		💋7=,4,Any One Cherry (1 Wild x2)
+		💋7-,4,Any One Cherry (1 Wild x2)
+		💋7□,4,Any One Cherry (1 Wild x2)
+		💋≡□,4,Any One Cherry (1 Wild x2)
+		💋=□,4,Any One Cherry (1 Wild x2)
+		💋-□,4,Any One Cherry (1 Wild x2)
+		💋□□,4,Any One Cherry (1 Wild x2)
+		🍒7≡,2,Any One Cherry
+		🍒7=,2,Any One Cherry
+		🍒7-,2,Any One Cherry
+		🍒7□,2,Any One Cherry
+		🍒≡=,2,Any One Cherry
+		🍒≡-,2,Any One Cherry
+		🍒≡□,2,Any One Cherry
+		🍒=-,2,Any One Cherry
+		🍒=□,2,Any One Cherry
+		🍒-□,2,Any One Cherry
+		🍒77,2,Any One Cherry
+		🍒≡≡,2,Any One Cherry
+		🍒==,2,Any One Cherry
+		🍒--,2,Any One Cherry
+		🍒□□,2,Any One Cherry
+	'''
+	REEL_COUNT = 3
+	MAXIMUM_BET = 3
+	ROWS = 3 # Rows visible in the reel window; the stop a spin lands on is in the middle one
+	VISUAL_STRIPS = [ # What the reels show. A spin shows its logical symbol at a random visual stop carrying it, between that stop's neighbours
+		['-', '□', '≡', '□', '🍒', '□', '=', '□', '-', '□', '7', '□', '≡', '□', '=', '□', '-', '□', '💋', '□', '🍒', '□'],
+		['🍒', '□', '-', '□', '=', '□', '🍒', '□', '≡', '□', '=', '□', '7', '□', '-', '□', '🍒', '□', '💋', '□', '-', '□'],
+		['=', '□', '-', '□', '🍒', '□', '-', '□', '7', '□', '🍒', '□', '=', '□', '-', '□', '≡', '□', '💋', '□', '🍒', '□']
+	]
+	# The row (0 top, 1 middle, 2 bottom) each payline crosses on each reel. Playing n lines plays the first n:
+	# the middle, top and bottom rows, both diagonals, the four bent lines, then every other path through the window.
+	_NAMED_PAYLINES = [(1, 1, 1), (0, 0, 0), (2, 2, 2), (0, 1, 2), (2, 1, 0), (1, 0, 1), (1, 2, 1), (0, 1, 0), (2, 1, 2)]
+	PAYLINES = _NAMED_PAYLINES + sorted(set(itertools.product(range(ROWS), repeat=REEL_COUNT)) - set(_NAMED_PAYLINES))
+
+	LOGICAL_STRIPS_COMPOSITIONS = [
+		{'💋':1, '7':9, '≡':9, '=': 9, '-':26, '🍒': 1, '□':9}, # Reel 1 (e.g., 64 stops total) - More "action"
+		{'💋':1, '7':1, '≡':1, '=':6, '-':41, '🍒':1, '□':45}, # Reel 2 (e.g., 96 stops total) - A bit tighter
+		{'💋':1, '7':1, '≡':1, '=':3, '-':22, '🍒':10, '□':90} # Reel 3 (e.g., 128 stops total) - Controls top payouts, fewer high symbols
+	]
+
+	def __init__(self, logical_strips_compositions=None, raw_paytable=None, stop_stream=None, visual_strips=None, paylines=None):
+		"""paylines: the row patterns played (see PAYLINES); default the middle row only, as a single-line machine."""
+		self.parsed_paytable = self.parse_paytable_data(raw_paytable or SlotMachine.RAW_PAYTABLE)
+		self.paytable_lookup = {}
+		for entry in self.parsed_paytable: self.paytable_lookup.setdefault(entry['combination_canonical'], entry) # First match wins, as in a linear scan
+		self.logical_strips_compositions = logical_strips_compositions or SlotMachine.LOGICAL_STRIPS_COMPOSITIONS
+		self.logical_strips_data = []
+		for r_idx, composition in enumerate(self.logical_strips_compositions):
+			current_strip = []
+			for symbol, count in composition.items():
+				current_strip.extend([symbol] * count) # Add the symbol to the strip 'count' number of times
+			self.logical_strips_data.append(current_strip)
+		self.reel_lengths = [len(strip) for strip in self.logical_strips_data]
+		self.stop_stream = stop_stream or StopStream(self.reel_lengths) # Pass a seeded stream to make a session replayable
+		self._init_dense_tables()
+		self._init_window_tables(visual_strips or SlotMachine.VISUAL_STRIPS, paylines or SlotMachine.PAYLINES[:1])
+
+	def _init_dense_tables(self):
+		"""
+		Builds integer versions of the strips and a dense payout table indexed by symbol ID on every reel,
+		so a batch of stops can be scored with array lookups instead of Counter/tuple work per spin.
+		"""
+		self.symbols = []
+		for composition in self.logical_strips_compositions:
+			for symbol in composition:
+				if symbol not in self.symbols: self.symbols.append(symbol)
+		for entry in self.parsed_paytable:
+			for symbol, count in entry['combination_canonical']:
+				if symbol not in self.symbols: self.symbols.append(symbol)
+		self.symbol_ids = {symbol: index for index, symbol in enumerate(self.symbols)}
+		self.logical_strip_ids = [np.array([self.symbol_ids[s] for s in strip], dtype=np.intp) for strip in self.logical_strips_data]
+		self.symbol_counts = self.compositions_to_counts(self.logical_strips_compositions) # (reels, symbols)
+		symbol_count = len(self.symbols)
+		self.dense_payouts = np.zeros((symbol_count,) * len(self.logical_strips_data), dtype=np.int64)
+		self.dense_entry_indices = np.full(self.dense_payouts.shape, -1, dtype=np.intp) # Index into parsed_paytable, -1 for a loss
+		entry_indices = {id(entry): index for index, entry in enumerate(self.parsed_paytable)}
+		for ids in np.ndindex(self.dense_payouts.shape):
+			entry = self._get_paytable_entry(self._iterable_to_canonical(self.symbols[i] for i in ids))
+			if entry:
+				self.dense_payouts[ids] = entry['payout']
+				self.dense_entry_indices[ids] = entry_indices[id(entry)]
+
+	def _init_window_tables(self, visual_strips, paylines):
+		"""
+		Precomputes, per reel, the symbol IDs in every row of the window around each visual stop, so evaluating a spin
+		on any number of paylines is one fancy-index into dense_payouts.
+		The rows are the visual stops just above and below, not what the player sees there: on the current strips every
+		symbol is followed by a blank separator (□, 29 px), so a symbol stop has blanks in its top and bottom rows while
+		the symbols partly visible beyond them don't count. That is why off-centre lines pay so differently from the middle.
+		"""
+		self.visual_strips_data = visual_strips
+		self.visual_symbol_indices_map = [] # Per reel: symbol -> visual stops showing it
+		for reel, visual_strip in enumerate(visual_strips):
+			symbol_to_indices = {}
+			for index, symbol in enumerate(visual_strip): symbol_to_indices.setdefault(symbol, []).append(index)
+			missing = [symbol for symbol in self.logical_strips_compositions[reel] if symbol not in symbol_to_indices]
+			if missing: raise ValueError(f"Visual strip {reel} never shows {missing}, which its logical strip can land on.")
+			self.visual_symbol_indices_map.append(symbol_to_indices)
+		offsets = np.arange(self.ROWS) - self.ROWS // 2
+		self.visual_windows = [] # Per reel: (visual stops, ROWS) symbol IDs, top row first
+		for visual_strip in visual_strips:
+			ids = np.array([self.symbol_ids[symbol] for symbol in visual_strip], dtype=np.intp)
+			self.visual_windows.append(ids[(np.arange(len(ids))[:, None] + offsets) % len(ids)])
+		self.paylines = np.array(paylines, dtype=np.intp) # (lines, reels)
+		if self.paylines.ndim != 2 or self.paylines.shape[1] != len(visual_strips) or self.paylines.min() < 0 or self.paylines.max() >= self.ROWS:
+			raise ValueError(f"Paylines must each give a row from 0 to {self.ROWS - 1} for each of the {len(visual_strips)} reels.")
+		self._reel_indices = np.arange(len(visual_strips))
+
+	def compositions_to_counts(self, compositions):
+		counts = np.zeros((len(compositions), len(self.symbols)), dtype=np.int64)
+		for reel, composition in enumerate(compositions):
+			for symbol, count in composition.items(): counts[reel, self.symbol_ids[symbol]] = count
+		return counts
+
+	def counts_to_compositions(self, counts):
+		return [{symbol: int(row[index]) for index, symbol in enumerate(self.symbols) if row[index]} for row in counts]
+
+	def combination_weights(self):
+		"""Number of logical stop combinations that land on each dense_payouts cell (outer product of the per-reel symbol counts)."""
+		weights = self.symbol_counts[0]
+		for counts in self.symbol_counts[1:]: weights = np.multiply.outer(weights, counts)
+		return weights
+
+	@classmethod
+	def from_definition(cls, path, stop_stream=None):
+		"""Loads a machine definition JSON, such as the ones written by src.utils.reel_optimizer."""
+		with open(path, 'r', encoding='utf-8') as f:
+			definition = json.load(f)
+		logger.info(f"Loaded machine definition from {path}")
+		return cls(definition['logical_strips_compositions'], definition.get('raw_paytable'), stop_stream, definition.get('visual_strips'), definition.get('paylines'))
+
+	def parse_paytable_data(self, raw_data):
+		parsed_table = []
+		lines = raw_data.strip().split('\n')
+		for line_number, raw_line_content in enumerate(lines):
+			line = raw_line_content.strip()
+			if not line: continue # Skip empty lines that might result from stripping
+			parts = line.split(',')
+			name = parts[2]
+			payout = int(parts[1])
+			combination_string = parts[0] # '💋💋7'
+			combination_tuple = tuple(combination_string) # ('💋', '💋', '7')
+			combination_canonical = self._iterable_to_canonical(combination_tuple) # (('7', 1), ('💋', 2))
+			parsed_table.append({
+				"combination_canonical": combination_canonical,
+				"payout": payout,
+				"name": name,
+				"original_combo_str": combination_string
+			})
+		return parsed_table
+	def _iterable_to_canonical(self, array_or_tuple):
+		counter = Counter(array_or_tuple) # {'💋': 2, '7': 1}
+		return tuple(sorted(counter.items()))
+
+	def calculate_rtp(self):
+		"""RTP in percent of the paylines played, per unit bet on each line. Exact: no spins are simulated."""
+		logger.info("Calculating RTP...")
+		weights = self.combination_weights() # Closed form from symbol counts instead of visiting every stop combination
+		total_payouts = float((weights * self.dense_payouts).sum())
+		total_possible_combinations = int(np.prod(self.reel_lengths))
+		total_combinations_processed = int(weights.sum())
+		if total_combinations_processed != total_possible_combinations: logger.warning(f"Mismatch in processed combinations ({total_combinations_processed}) vs. theoretical ({total_possible_combinations})")
+		rtp_decimal = total_payouts / total_possible_combinations
+		rtp_percentage = rtp_decimal * 100.0
+		logger.info(f"Total Expected Payout Value (for 1 unit bet): {total_payouts}")
+		logger.info(f"Total Possible Combinations: {total_possible_combinations}")
+		logger.info(f"Calculated Theoretical RTP: {rtp_percentage:.4f}%")
+		if self.paylines.tolist() == [[self.ROWS // 2] * len(self.reel_lengths)]: return rtp_percentage
+		line_returns = self.payline_returns()
+		logger.info(f"Expected payout per line: {', '.join(f'{value:.4f}' for value in line_returns)}")
+		logger.info(f"Calculated Theoretical RTP over {len(line_returns)} lines: {line_returns.mean() * 100.0:.4f}% (middle line alone: {rtp_percentage:.4f}%)")
+		return float(line_returns.mean() * 100.0)
+
+	def row_symbol_probabilities(self):
+		"""
+		Per reel, a (ROWS, symbols) array: the probability of each symbol showing in each row of the window.
+		A visual stop is shown with the probability of its symbol on the logical strip, shared evenly between the
+		visual stops carrying that symbol, and rows come from its neighbours. The middle row is the logical distribution.
+		"""
+		probabilities = []
+		for reel, window in enumerate(self.visual_windows):
+			symbol_probabilities = self.symbol_counts[reel] / self.reel_lengths[reel]
+			visual_counts = np.bincount(window[:, self.ROWS // 2], minlength=len(self.symbols))
+			stop_probabilities = symbol_probabilities[window[:, self.ROWS // 2]] / visual_counts[window[:, self.ROWS // 2]]
+			probabilities.append(np.stack([np.bincount(window[:, row], weights=stop_probabilities, minlength=len(self.symbols)) for row in range(self.ROWS)]))
+		return probabilities
+
+	def payline_returns(self, paylines=None):
+		"""
+		Expected payout multiplier of each payline (default: the ones played). The reels stop independently, so a
+		line's expectation only depends on the row distributions it crosses.
+		"""
+		paylines = self.paylines if paylines is None else np.array(paylines, dtype=np.intp)
+		probabilities = self.row_symbol_probabilities()
+		returns = np.tensordot(probabilities[0][paylines[:, 0]], self.dense_payouts.astype(np.float64), axes=([1], [0])) # (lines, symbols, ...)
+		for reel in range(1, len(probabilities)):
+			returns = np.einsum('ls...,ls->l...', returns, probabilities[reel][paylines[:, reel]])
+		return returns
+
+	def roll_logical_stops(self):
+		logical_indices = self.stop_stream.next_stops()
+		logger.debug("Logical outcomes determined: %s", logical_indices) # Per spin; the spin server rolls thousands a second
+		return logical_indices
+
+	def logical_to_symbols(self, logical_indices):
+		chosen_symbols = []
+		for reel_index, stop_index in enumerate(logical_indices): # indices to symbols
+			chosen_symbols.append(self.logical_strips_data[reel_index][stop_index])
+		logger.debug("Outcomes as symbols: %s", chosen_symbols)
+		return chosen_symbols
+
+	def evaluate_symbols(self, chosen_symbols):
+		"""Returns the paytable entry won by chosen_symbols, or None."""
+		return self._get_paytable_entry(self._iterable_to_canonical(chosen_symbols))
+
+	def choose_visual_stops(self, chosen_symbols):
+		"""A visual stop showing each reel's chosen symbol, picked at random from the stops that carry it."""
+		return [self.stop_stream.choice(self.visual_symbol_indices_map[reel][symbol]) for reel, symbol in enumerate(chosen_symbols)]
+
+	def window_symbols(self, visual_stops):
+		"""The visible grid around visual_stops as rows of symbols, top row first."""
+		return [[self.symbols[self.visual_windows[reel][stop, row]] for reel, stop in enumerate(visual_stops)] for row in range(self.ROWS)]
+
+	def evaluate_lines(self, visual_stops):
+		"""
+		Scores every played payline through the window around visual_stops with one lookup, whatever the line count.
+
+		Returns:
+			tuple[np.ndarray, np.ndarray]: payout multiplier and parsed_paytable index (-1 for a loss) of each payline
+		"""
+		window = np.array([self.visual_windows[reel][stop] for reel, stop in enumerate(visual_stops)]) # (reels, ROWS)
+		ids = tuple(window[self._reel_indices, self.paylines].T) # One symbol ID array per reel, one entry per line
+		return self.dense_payouts[ids], self.dense_entry_indices[ids]
+
+	def evaluate_stops_batch(self, stops):
+		"""
+		Scores many spins at once.
+
+		Args:
+			stops (np.ndarray): (spins, reels) array of logical stop indices
+
+		Returns:
+			np.ndarray: payout multiplier for each spin
+		"""
+		ids = tuple(self.logical_strip_ids[reel][stops[:, reel]] for reel in range(len(self.logical_strip_ids)))
+		return self.dense_payouts[ids]
+
+	def _get_paytable_entry(self, result_canonical):
+		return self.paytable_lookup.get(result_canonical)
+	def _get_payout_from_canonical(self, canonical):
+		entry = self._get_paytable_entry(canonical)
+		if entry: return entry['payout']
+		else: return 0
@@ -8,9 +8,10 @@ from src.components.base_screen import BaseScreen
 logger = logging.getLogger(__name__)
 
 class TitleScreen(BaseScreen):
-	def __init__(self, screen_surface, device, asset_manager, game_data):
-		super().__init__(screen_surface, device, asset_manager, game_data)
+	def __init__(self, canvas, device, asset_manager, game_data):
+		super().__init__(canvas, device, asset_manager, game_data)
 		self.time_offset = 0.0
+		self.previous_time_offset = 0.0
 		# --- Wave Effect Parameters ---
 		self.max_amplitude_at_bottom = 1.0  # Amplitude: Scales linearly from 0 at the top of water to max_amplitude_at_bottom at the bottom in pixels.
 		self.horizon_frequency = 0.36  # Wave frequency at the top of water region. Higher value means waves are 'denser' or 'smaller' at horizon.
@@ -46,7 +47,7 @@ class TitleScreen(BaseScreen):
 				else:
 					logger.warning("Water region has zero width, cannot create meshgrid.")
 				
-				self.rippling_water_surface = pygame.Surface((self.water_region_width, self.water_region_height), pygame.SRCALPHA)
+				self.rippling_water_surface = self.asset_manager.prepare_surface(pygame.Surface((self.water_region_width, self.water_region_height))) # Opaque, so no per-pixel alpha blend each frame
 			else:
 				logger.warning("Water region has zero height. No water effect will be applied.")
 				self.original_water_np = None # Ensure it's None if no water region
@@ -61,6 +62,7 @@ class TitleScreen(BaseScreen):
 	def on_enter(self):
 		super().on_enter()
 		self.time_offset = 0.0
+		self.previous_time_offset = 0.0
 
 	def on_ready(self):
 		super().on_ready()
@@ -77,10 +79,15 @@ class TitleScreen(BaseScreen):
 			elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
 				self.request_end_screen()
 
+	def _save_previous_state(self):
+		self.previous_time_offset = self.time_offset
+
 	def _update_always(self, time_delta):
+		self.time_offset += time_delta
+
+	def _update_water(self, time_offset):
 		if self.original_water_np is None or self.xx_water is None or self.yy_water is None:
 			return # Skip water effect if not initialized
-		self.time_offset += time_delta
 		# --- Wave Calculation for the Water Region (Linear Scaling) ---
 		if self.water_region_height > 1: # 1. Calculate y_normalized (0 at top of water/horizon, 1 at bottom of water/near)
 			y_normalized = self.yy_water / (self.water_region_height - 1.0)
@@ -95,7 +102,7 @@ class TitleScreen(BaseScreen):
 		# and self.near_frequency at near (y_normalized=1)
 		current_frequency_y = self.horizon_frequency * (1.0 - y_normalized) + self.near_frequency * y_normalized
 		# 4. Calculate Horizontal Displacement
-		displacement_x = current_amplitude_x * np.sin(current_frequency_y * self.yy_water + self.time_offset * self.speed_x)
+		displacement_x = current_amplitude_x * np.sin(current_frequency_y * self.yy_water + time_offset * self.speed_x)
 		# 5. Calculate Source Coordinates
 		source_x = (self.xx_water + displacement_x).astype(int)
 		source_y = self.yy_water.astype(int)
@@ -107,6 +114,7 @@ class TitleScreen(BaseScreen):
 		# 8. Blit to Surface
 		if self.rippling_water_surface is not None:
 			pygame.surfarray.blit_array(self.rippling_water_surface, np.transpose(rippling_array_data, (1, 0, 2)))
+			self.canvas.invalidate(self.rippling_water_surface) # Redrawn in place, so a texture backend must re-upload it
 
 	def _update_interactive(self):
 		super()._update_interactive()
@@ -114,13 +122,14 @@ class TitleScreen(BaseScreen):
 
 	def _render_content(self):
 		if self.static_background_part:
-			self.screen_surface.blit(self.static_background_part, (0, 0))
+			self.canvas.blit(self.static_background_part, (0, 0))
 		else:
-			self.screen_surface.fill((30,30,30))
+			self.canvas.fill((30,30,30))
 			return
 
 		if self.rippling_water_surface and self.original_water_np is not None:
-			self.screen_surface.blit(self.rippling_water_surface, (0, self.water_region_start_y))
+			self._update_water(self.lerp(self.previous_time_offset, self.time_offset)) # Ripple once per rendered frame
+			self.canvas.blit(self.rippling_water_surface, (0, self.water_region_start_y))
 
 	def on_exit(self):
 		super().on_exit()
@@ -0,0 +1,91 @@
+# widget_tree.py
+import pygame
+
+class WidgetTree:
+	"""
+	The retained set of widgets (buttons) on a screen. BaseScreen owns one; screens add() their widgets and
+	the tree routes pointer events to them and draws them.
+	- Hit-testing goes through a uniform grid of CELL_SIZE cells, so an event only looks at the widgets whose
+	  rects overlap the cell under the pointer. Where widgets overlap, the one added last is on top.
+	- Pointer capture: the widget pressed with the left button gets the release too, wherever the pointer is
+	  lifted. It only clicks if the release is inside it.
+	- Hidden widgets are neither drawn nor hit. Disabled widgets are drawn but not hit.
+	A widget is anything with a rect, enabled and visible attributes, press(), release(inside), cancel() and render(canvas),
+	as ButtonBase provides. Call refresh() after moving or resizing a widget's rect.
+	"""
+	CELL_SIZE = 64
+
+	def __init__(self):
+		self.widgets = [] # Draw order; later widgets are drawn over and hit before earlier ones
+		self.grid = {} # (column, row) -> widgets whose rects overlap that cell
+		self.captured = None
+		self.next_order = 0
+
+	def add(self, widget):
+		widget.tree = self
+		widget.order = self.next_order
+		self.next_order += 1
+		self.widgets.append(widget)
+		self._index(widget)
+		return widget
+
+	def remove(self, widget):
+		if widget is self.captured: self.release_capture()
+		self.widgets.remove(widget)
+		self._unindex(widget)
+		widget.tree = None
+
+	def refresh(self, widget):
+		"""Re-indexes a widget whose rect changed."""
+		self._unindex(widget)
+		self._index(widget)
+
+	def _cells(self, rect):
+		if rect.width <= 0 or rect.height <= 0: return
+		for column in range(rect.left // self.CELL_SIZE, (rect.right - 1) // self.CELL_SIZE + 1):
+			for row in range(rect.top // self.CELL_SIZE, (rect.bottom - 1) // self.CELL_SIZE + 1):
+				yield column, row
+
+	def _index(self, widget):
+		widget.indexed_rect = pygame.Rect(widget.rect)
+		for cell in self._cells(widget.indexed_rect): self.grid.setdefault(cell, []).append(widget)
+
+	def _unindex(self, widget):
+		for cell in self._cells(widget.indexed_rect):
+			bucket = self.grid[cell]
+			bucket.remove(widget)
+			if not bucket: del self.grid[cell]
+
+	def hit_test(self, pos):
+		"""The topmost visible, enabled widget at pos, or None."""
+		bucket = self.grid.get((pos[0] // self.CELL_SIZE, pos[1] // self.CELL_SIZE))
+		if not bucket: return None
+		hit = None
+		for widget in bucket:
+			if widget.visible and widget.enabled and widget.rect.collidepoint(pos) and (hit is None or widget.order > hit.order): hit = widget
+		return hit
+
+	def release_capture(self):
+		"""Drops the captured widget back to its up state without clicking it."""
+		if self.captured is not None:
+			captured, self.captured = self.captured, None
+			captured.cancel()
+
+	def handle_event(self, event):
+		"""Routes a pointer event to the widget it concerns. Returns that widget, or None."""
+		if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+			self.release_capture()
+			widget = self.hit_test(event.pos)
+			if widget is not None:
+				self.captured = widget
+				widget.press()
+			return widget
+		if event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.captured is not None:
+			widget, self.captured = self.captured, None
+			widget.release(widget.rect.collidepoint(event.pos))
+			return widget
+		return None
+
+	def render(self, canvas):
+		for widget in self.widgets:
+			if widget.visible: widget.render(canvas)
@@ -0,0 +1,101 @@
+# spin_load_test.py
+"""
+Load generator for the spin server.
+
+Opens a number of connections, each carrying many simulated sessions, keeps a fixed number of
+SPIN requests in flight per connection and reports spins per second and latency percentiles.
+
+Usage:
+	python -m src.server.spin_load_test --sessions 5000 --connections 50 --duration 10
+	python -m src.server.spin_load_test --unix /tmp/bang_slots.sock
+	python -m src.server.spin_load_test --embedded   # start a server in-process first
+"""
+import argparse
+import asyncio
+import collections
+import logging
+import time
+import numpy as np
+
+from src.server.spin_server import REQUEST, RESPONSE, OP_OPEN, OP_SET_BET, OP_SPIN, STATUS_OK, SpinServer
+
+logger = logging.getLogger(__name__)
+
+STARTING_MONEY = 60000
+
+async def _connect(args):
+	if args.unix: return await asyncio.open_unix_connection(args.unix)
+	return await asyncio.open_connection(args.host, args.port)
+
+async def _round_trip(reader, writer, frames):
+	writer.write(b''.join(REQUEST.pack(op, arg, session) for op, arg, session in frames))
+	data = await reader.readexactly(RESPONSE.size * len(frames))
+	return list(RESPONSE.iter_unpack(data))
+
+async def run_connection(args, session_count, deadline, latencies, totals):
+	reader, writer = await _connect(args)
+	opened = await _round_trip(reader, writer, [(OP_OPEN, STARTING_MONEY, 0)] * session_count)
+	sessions = [response[3] for response in opened]
+	await _round_trip(reader, writer, [(OP_SET_BET, 1 + i % 3, session) for i, session in enumerate(sessions)])
+	in_flight = collections.deque()
+	next_session = 0
+
+	async def send_spins(count):
+		nonlocal next_session
+		frames = []
+		now = time.perf_counter()
+		for _ in range(count):
+			frames.append(REQUEST.pack(OP_SPIN, 0, sessions[next_session]))
+			next_session = (next_session + 1) % len(sessions)
+			in_flight.append(now)
+		writer.write(b''.join(frames))
+		await writer.drain()
+
+	await send_spins(args.pipeline)
+	while in_flight:
+		data = await reader.readexactly(RESPONSE.size)
+		received = time.perf_counter()
+		latencies.append(received - in_flight.popleft())
+		op, status, bet, session, money, win, *stops = RESPONSE.unpack(data)
+		totals['spins'] += 1
+		totals['failed'] += status != STATUS_OK
+		totals['won'] += win
+		if received < deadline: await send_spins(1) # Keep the pipeline full until time is up
+	writer.close()
+
+async def run_load_test(args):
+	server_task = None
+	if args.embedded:
+		server = SpinServer(seed=0)
+		server_task = asyncio.create_task(server.serve(args.host, args.port, args.unix))
+		await asyncio.sleep(0.2)
+	latencies = []
+	totals = collections.Counter()
+	per_connection = max(1, args.sessions // args.connections)
+	start = time.perf_counter()
+	deadline = start + args.duration
+	await asyncio.gather(*(run_connection(args, per_connection, deadline, latencies, totals) for _ in range(args.connections)))
+	elapsed = time.perf_counter() - start
+	if server_task: server_task.cancel()
+	latencies_ms = np.array(latencies) * 1000.0
+	p50, p99, p999 = np.percentile(latencies_ms, [50, 99, 99.9])
+	print(f"Sessions: {per_connection * args.connections} over {args.connections} connections, pipeline depth {args.pipeline}")
+	print(f"Spins: {totals['spins']} ({totals['failed']} rejected) in {elapsed:.2f}s = {totals['spins'] / elapsed:,.0f} spins/s")
+	print(f"Latency ms: p50 {p50:.3f}  p99 {p99:.3f}  p99.9 {p999:.3f}  max {latencies_ms.max():.3f}")
+
+def main():
+	parser = argparse.ArgumentParser(description="Spin server load test")
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=12400)
+	parser.add_argument('--unix', help="Connect over a Unix socket path instead of TCP")
+	parser.add_argument('--sessions', type=int, default=2000)
+	parser.add_argument('--connections', type=int, default=20)
+	parser.add_argument('--pipeline', type=int, default=32, help="SPIN requests kept in flight per connection")
+	parser.add_argument('--duration', type=float, default=5.0, help="seconds")
+	parser.add_argument('--embedded', action='store_true', help="Run the server inside this process")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+	asyncio.run(run_load_test(args))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,164 @@
+# spin_server.py
+"""
+Spin Server - headless multi-session service for the slot math core
+
+Runs SlotMachine and per-session GameData bet/win accounting behind an asyncio
+TCP or Unix socket so many kiosks can share one spin engine.
+
+Protocol (little-endian, fixed-size frames, responses in request order so clients can pipeline):
+	Request  (8 bytes):  op u8, pad u8, arg u16, session u32
+	Response (26 bytes): op u8, status u8, bet u16, session u32, money i64, win u32, stops REEL_COUNT x u16
+
+Ops:
+	OPEN    - create a session. arg is the starting money (0 keeps the GameData default). session is ignored; the new id is returned.
+	CLOSE   - drop a session
+	SET_BET - set the session's bet to arg (1..MAXIMUM_BET)
+	SPIN    - place the bet, roll and pay out. win is the amount credited, stops are the logical stops.
+	          Stops for a rejected spin are still consumed, so a seeded server replays identically for the same request stream.
+	BALANCE - report money and bet
+
+Usage:
+	python -m src.server.spin_server --port 12400
+	python -m src.server.spin_server --unix /tmp/bang_slots.sock
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import struct
+
+from src.components.game_data import GameData
+from src.components.slot_machine import SlotMachine
+from src.utils.rng import StopStream
+
+logger = logging.getLogger(__name__)
+
+OP_OPEN = 1
+OP_CLOSE = 2
+OP_SET_BET = 3
+OP_SPIN = 4
+OP_BALANCE = 5
+
+STATUS_OK = 0
+STATUS_UNKNOWN_SESSION = 1
+STATUS_INSUFFICIENT_FUNDS = 2
+STATUS_INVALID_BET = 3
+STATUS_BAD_OP = 4
+
+REQUEST = struct.Struct('<BxHI')
+RESPONSE = struct.Struct(f'<BBHIqI{SlotMachine.REEL_COUNT}H')
+NO_STOPS = (0,) * SlotMachine.REEL_COUNT
+
+class SpinServer:
+	"""
+	Owns one SlotMachine and a table of sessions shared by every connection.
+
+	Each read from a client is parsed into as many whole request frames as it holds; the stops for
+	every SPIN in that batch come out of the block-buffered StopStream as one slice and are scored
+	in one dense-table lookup before the responses go back in a single write.
+	"""
+	def __init__(self, slot_machine=None, seed=None):
+		self.slot_machine = slot_machine or SlotMachine()
+		self.stop_stream = StopStream(self.slot_machine.reel_lengths, seed)
+		self.sessions = {} # session id -> GameData
+		self._session_ids = itertools.count(1)
+		self.spins_served = 0
+
+	def open_session(self, starting_money=0):
+		session_id = next(self._session_ids)
+		game_data = GameData() # In-memory only; never given a save path
+		if starting_money: game_data.money = starting_money
+		self.sessions[session_id] = game_data
+		return session_id, game_data
+
+	def process_batch(self, requests):
+		"""Handles a list of (op, arg, session) tuples and returns the packed responses."""
+		spin_count = sum(1 for op, arg, session in requests if op == OP_SPIN)
+		if spin_count:
+			stops = self.stop_stream.draw(spin_count)
+			multipliers = self.slot_machine.evaluate_stops_batch(stops)
+		spin_index = 0
+		responses = []
+		for op, arg, session in requests:
+			if op == OP_OPEN:
+				session, game_data = self.open_session(arg)
+				responses.append(RESPONSE.pack(op, STATUS_OK, game_data.bet, session, game_data.money, 0, *NO_STOPS))
+				continue
+			game_data = self.sessions.get(session)
+			if game_data is None:
+				if op == OP_SPIN: spin_index += 1 # Keep the pre-drawn stops aligned with the remaining spins
+				responses.append(RESPONSE.pack(op, STATUS_UNKNOWN_SESSION, 0, session, 0, 0, *NO_STOPS))
+				continue
+			status, win, reel_stops = STATUS_OK, 0, NO_STOPS
+			if op == OP_SPIN:
+				reel_stops = tuple(int(stop) for stop in stops[spin_index])
+				multiplier = int(multipliers[spin_index])
+				spin_index += 1
+				wager = game_data.place_bet()
+				if wager is None:
+					status, reel_stops = STATUS_INSUFFICIENT_FUNDS, NO_STOPS
+				else:
+					self.spins_served += 1
+					if multiplier:
+						win = wager * multiplier
+						game_data.win(win)
+			elif op == OP_SET_BET:
+				if arg != game_data.bet and not game_data.set_bet(arg, SlotMachine.MAXIMUM_BET): status = STATUS_INVALID_BET
+			elif op == OP_CLOSE:
+				del self.sessions[session]
+			elif op != OP_BALANCE:
+				status = STATUS_BAD_OP
+			responses.append(RESPONSE.pack(op, status, game_data.bet, session, game_data.money, win, *reel_stops))
+		return b''.join(responses)
+
+	async def handle_connection(self, reader, writer):
+		peer = writer.get_extra_info('peername') or 'unix socket'
+		logger.info(f"Client connected: {peer}")
+		buffer = b''
+		try:
+			while True:
+				data = await reader.read(65536)
+				if not data: break
+				buffer += data
+				frame_count = len(buffer) // REQUEST.size
+				if frame_count == 0: continue
+				frames_end = frame_count * REQUEST.size
+				requests = list(REQUEST.iter_unpack(buffer[:frames_end]))
+				buffer = buffer[frames_end:]
+				writer.write(self.process_batch(requests))
+				await writer.drain() # Backpressure: stop reading from a client that isn't reading its responses
+		except (ConnectionResetError, BrokenPipeError) as e:
+			logger.warning(f"Client {peer} dropped: {e}")
+		finally:
+			logger.info(f"Client disconnected: {peer}")
+			writer.close()
+
+	async def serve(self, host='127.0.0.1', port=12400, unix_path=None):
+		if unix_path:
+			if os.path.exists(unix_path): os.unlink(unix_path)
+			server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+			logger.info(f"Spin server listening on {unix_path}")
+		else:
+			server = await asyncio.start_server(self.handle_connection, host, port)
+			logger.info(f"Spin server listening on {host}:{port}")
+		async with server:
+			await server.serve_forever()
+
+def main():
+	parser = argparse.ArgumentParser(description="Multi-session slot spin server")
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=12400)
+	parser.add_argument('--unix', help="Listen on a Unix socket path instead of TCP")
+	parser.add_argument('--seed', type=int, help="Seed the server RNG for reproducible runs")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+	logging.getLogger('src.components.game_data').setLevel(logging.WARNING) # Per-bet INFO logs would dominate the spin cost
+	server = SpinServer(seed=args.seed)
+	try:
+		asyncio.run(server.serve(args.host, args.port, args.unix))
+	except KeyboardInterrupt:
+		logger.info(f"Spin server stopped after {server.spins_served} spins")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,227 @@
+# economy_simulator.py
+"""
+Player-economy simulator.
+
+Models many synthetic players at once, one NumPy array per piece of player state, stepping them
+through a play session: thrusting at the sperm bank (xl_earn per thrust), collecting passive income
+from the storage tank, buying upgrades by a purchasing policy, and spinning the slot machine at a
+fixed bet. Spin results are drawn from the machine's exact payout distribution, derived from the real
+paytable and strips the same way as paytable_report (a spin is one uniform draw through the payout CDF).
+
+Each step, a player who can cover the bet spends it at the slots with probability spin_share, and
+otherwise at the sperm bank, which is also where tank income is collected and upgrades are bought
+(as in the game). A player "goes broke" when spinning leaves them unable to cover the next bet.
+
+Usage:
+	python -m src.utils.economy_simulator                                  # 100k players, defaults from GameData
+	python -m src.utils.economy_simulator --set bet=3 spin_share=0.8 -o reports/economy.json
+	python -m src.utils.economy_simulator --sweep xl_growth=1.5,2,2.5 --sweep bet=1,3 --players 20000
+"""
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import time
+import numpy as np
+
+from src.components.game_data import GameData, cost_table
+from src.components.slot_machine import SlotMachine
+
+logger = logging.getLogger(__name__)
+
+UPGRADES = ('xl', 'advertising', 'tank')
+POLICIES = ('none', 'xl', 'greedy') # greedy: the cheapest affordable upgrade, repeatedly
+MAX_PURCHASES_PER_STEP = 8
+
+_defaults = GameData()
+DEFAULT_PARAMETERS = {
+	'players': 100000,
+	'hours': 4.0,
+	'step_seconds': 60.0,
+	'thrusts_per_second': 1.0,
+	'spins_per_second': 0.25, # One spin plus its reel animation takes about four seconds
+	'spin_share': 0.5,
+	'bet': _defaults.bet,
+	'policy': 'greedy',
+	'starting_money': _defaults.money,
+	'xl_earn': _defaults.xl_earn, 'xl_earn_step': 1,
+	'advertising_hourly': _defaults.advertising_hourly, 'advertising_step': 1,
+	'tank_max': _defaults.tank_max, 'tank_step': 50,
+	'milestones': [2, 3, 5, 8, 10], # XL levels whose arrival times are reported
+	'curve_points': 48,
+	'definition': None # machine definition JSON; None for the built-in strips
+}
+for _name, (_base, _growth, _start) in GameData.COST_CURVES.items():
+	DEFAULT_PARAMETERS.update({f'{_name}_base': _base, f'{_name}_growth': _growth, f'{_name}_start': _start})
+
+def payout_distribution(slot_machine):
+	"""Returns the distinct payout multipliers and their cumulative probabilities, exact from the strip counts."""
+	weights = slot_machine.combination_weights().ravel()
+	multipliers, inverse = np.unique(slot_machine.dense_payouts.ravel(), return_inverse=True)
+	probabilities = np.bincount(inverse, weights=weights) / weights.sum()
+	cdf = np.cumsum(probabilities)
+	cdf[-1] = 1.0
+	return multipliers.astype(np.float64), cdf
+
+def simulate(parameters=None, seed=None):
+	"""
+	Runs one population through the session described by parameters (see DEFAULT_PARAMETERS).
+
+	Returns:
+		dict: milestone arrival times, bankruptcy rate, income breakdown, realized RTP and a progression curve
+	"""
+	p = {**DEFAULT_PARAMETERS, **(parameters or {})}
+	if p['policy'] not in POLICIES: raise ValueError(f"Unknown policy '{p['policy']}'. Expected one of {POLICIES}")
+	slot_machine = SlotMachine.from_definition(p['definition']) if p['definition'] else SlotMachine()
+	multipliers, cdf = payout_distribution(slot_machine)
+	rng = np.random.default_rng(seed)
+	players, dt, bet = int(p['players']), float(p['step_seconds']), float(p['bet'])
+	steps = max(1, int(round(p['hours'] * 3600 / dt)))
+	spins_per_step = max(1, int(round(p['spins_per_second'] * dt)))
+	thrusts_per_step = p['thrusts_per_second'] * dt
+
+	costs = np.array([cost_table(p[f'{name}_base'], p[f'{name}_growth'], p[f'{name}_start']) for name in UPGRADES], dtype=np.float64)
+	if p['policy'] == 'none': costs[:] = np.inf
+	elif p['policy'] == 'xl': costs[1:] = np.inf
+	last_level = costs.shape[1] - 1
+	rows = np.arange(len(UPGRADES))[:, None]
+
+	money = np.full(players, float(p['starting_money']))
+	levels = np.ones((len(UPGRADES), players), dtype=np.int64)
+	tank = np.zeros(players)
+	broke_at = np.full(players, np.nan)
+	milestones = list(p['milestones'])
+	reached_at = np.full((len(milestones), players), np.nan)
+	totals = {'thrust': 0.0, 'passive': 0.0, 'wagered': 0.0, 'won': 0.0, 'upgrades': 0.0, 'spins': 0}
+	curve = []
+	curve_every = max(1, steps // max(1, p['curve_points']))
+
+	for step in range(steps):
+		hours = (step + 1) * dt / 3600.0
+		tank_max = p['tank_max'] + (levels[2] - 1) * p['tank_step']
+		hourly = p['advertising_hourly'] + (levels[1] - 1) * p['advertising_step']
+		tank = np.minimum(tank_max, tank + hourly * dt / 3600.0)
+		spinning = (money >= bet) & (rng.random(players) < p['spin_share'])
+
+		spinners = np.flatnonzero(spinning)
+		if spinners.size:
+			drawn = multipliers[np.searchsorted(cdf, rng.random((spinners.size, spins_per_step)), side='right')]
+			net = bet * (drawn - 1.0)
+			balance_before = money[spinners, None] + np.cumsum(net, axis=1) - net # Money in hand before each spin
+			played = np.logical_and.accumulate(balance_before >= bet, axis=1) # Stop at the first bet that can't be covered
+			money[spinners] += (net * played).sum(axis=1)
+			spins = int(played.sum())
+			totals['spins'] += spins
+			totals['wagered'] += bet * spins
+			totals['won'] += float((bet * drawn * played).sum())
+			broke = spinners[money[spinners] < bet]
+			broke = broke[np.isnan(broke_at[broke])]
+			broke_at[broke] = hours
+
+		bankers = np.flatnonzero(~spinning)
+		if bankers.size:
+			earned = thrusts_per_step * (p['xl_earn'] + (levels[0, bankers] - 1) * p['xl_earn_step'])
+			collected = np.floor(tank[bankers])
+			tank[bankers] -= collected
+			money[bankers] += earned + collected
+			totals['thrust'] += float(earned.sum())
+			totals['passive'] += float(collected.sum())
+			for _ in range(MAX_PURCHASES_PER_STEP):
+				prices = costs[rows, np.minimum(levels[:, bankers], last_level)]
+				choice = prices.argmin(axis=0)
+				price = prices[choice, np.arange(bankers.size)]
+				affordable = money[bankers] >= price
+				if not affordable.any(): break
+				buyers = bankers[affordable]
+				money[buyers] -= price[affordable]
+				levels[choice[affordable], buyers] += 1
+				totals['upgrades'] += float(price[affordable].sum())
+				bankers = buyers # Only someone who just bought can still afford another
+			for index, level in enumerate(milestones):
+				newly = (levels[0] >= level) & np.isnan(reached_at[index])
+				reached_at[index, newly] = hours
+
+		if (step + 1) % curve_every == 0 or step == steps - 1:
+			curve.append({'hours': hours, 'mean_money': float(money.mean()), 'median_money': float(np.median(money)),
+				'mean_xl_level': float(levels[0].mean()), 'mean_advertising_level': float(levels[1].mean()),
+				'mean_tank_level': float(levels[2].mean()), 'broke': float(np.mean(~np.isnan(broke_at)))})
+
+	time_to_level = {}
+	for index, level in enumerate(milestones):
+		reached = reached_at[index][~np.isnan(reached_at[index])]
+		time_to_level[level] = {'reached': reached.size / players,
+			'median_hours': float(np.median(reached)) if reached.size else None,
+			'p90_hours': float(np.percentile(reached, 90)) if reached.size else None}
+	went_broke = broke_at[~np.isnan(broke_at)]
+	return {
+		'parameters': {key: value for key, value in p.items() if key != 'definition'},
+		'exact_rtp': float((multipliers * np.diff(cdf, prepend=0.0)).sum() * 100.0),
+		'realized_rtp': totals['won'] / totals['wagered'] * 100.0 if totals['wagered'] else None,
+		'bankruptcy_rate': went_broke.size / players,
+		'median_hours_to_broke': float(np.median(went_broke)) if went_broke.size else None,
+		'time_to_xl_level': time_to_level,
+		'final_money': {q: float(np.percentile(money, q)) for q in (10, 50, 90)},
+		'final_levels': {name: float(levels[index].mean()) for index, name in enumerate(UPGRADES)},
+		'totals': totals,
+		'curve': curve
+	}
+
+def _parse_value(text):
+	for cast in (int, float):
+		try: return cast(text)
+		except ValueError: pass
+	return text
+
+def _parse_assignment(text):
+	key, _, value = text.partition('=')
+	if key not in DEFAULT_PARAMETERS: raise argparse.ArgumentTypeError(f"unknown parameter '{key}'")
+	return key, value
+
+def _summary_row(result, swept):
+	milestone = result['time_to_xl_level'][max(result['time_to_xl_level'])]
+	median = milestone['median_hours']
+	label = " ".join(f"{key}={result['parameters'][key]}" for key in swept) or "defaults"
+	return (f"{label:<32}{result['realized_rtp'] or 0:>9.2f}{result['bankruptcy_rate'] * 100:>9.2f}"
+		f"{milestone['reached'] * 100:>10.1f}{median if median is not None else float('nan'):>10.2f}"
+		f"{result['final_money'][50]:>12,.0f}{result['final_levels']['xl']:>8.2f}")
+
+def main():
+	parser = argparse.ArgumentParser(description="Simulate player progression through upgrades and slot play")
+	parser.add_argument('--players', type=int, default=DEFAULT_PARAMETERS['players'])
+	parser.add_argument('--hours', type=float, default=DEFAULT_PARAMETERS['hours'])
+	parser.add_argument('--policy', choices=POLICIES, default=DEFAULT_PARAMETERS['policy'])
+	parser.add_argument('--definition', help="machine definition JSON (default: the built-in strips)")
+	parser.add_argument('--set', type=_parse_assignment, nargs='+', default=[], metavar='KEY=VALUE', help="override any DEFAULT_PARAMETERS entry")
+	parser.add_argument('--sweep', type=_parse_assignment, action='append', default=[], metavar='KEY=V1,V2,...', help="run every combination of these values")
+	parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+	parser.add_argument('--seed', type=int)
+	parser.add_argument('-o', '--output', help="write all results as JSON")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+	base = {'players': args.players, 'hours': args.hours, 'policy': args.policy, 'definition': args.definition}
+	base.update({key: _parse_value(value) for key, value in args.set})
+	swept = [key for key, _ in args.sweep]
+	combinations = [dict(zip(swept, values)) for values in itertools.product(*([_parse_value(v) for v in values.split(',')] for _, values in args.sweep))]
+	runs = [{**base, **combination} for combination in combinations]
+	seeds = np.random.SeedSequence(args.seed).spawn(len(runs))
+	logger.info(f"Simulating {len(runs)} configuration(s) of {args.players:,} players for {args.hours}h")
+	started = time.perf_counter()
+	if len(runs) > 1 and args.workers > 1:
+		with multiprocessing.Pool(min(args.workers, len(runs))) as pool:
+			results = pool.starmap(simulate, zip(runs, seeds))
+	else:
+		results = [simulate(run, seed) for run, seed in zip(runs, seeds)]
+	logger.info(f"Finished in {time.perf_counter() - started:.1f}s")
+
+	last = max(results[0]['time_to_xl_level'])
+	print(f"{'Configuration':<32}{'RTP %':>9}{'Broke %':>9}{f'XL{last} %':>10}{f'XL{last} h':>10}{'Money p50':>12}{'XL avg':>8}")
+	for result in results: print(_summary_row(result, swept))
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(results if len(results) > 1 else results[0], f, indent=2)
+		logger.info(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+	main()
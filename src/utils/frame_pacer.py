@@ -0,0 +1,60 @@
+# frame_pacer.py
+import time
+import pygame
+
+class FramePacer:
+	"""
+	Replaces clock.tick() in the main loop with two modes:
+	- Active: frames are paced to active_fps with a coarse sleep followed by a short busy-wait, which lands
+	  much closer to the deadline than sleep alone.
+	- Idle: the loop blocks in pygame.event.wait() for up to one idle_fps period, so it wakes immediately on
+	  input (including the Orifice DEPTHCHANGED event) but otherwise barely touches the CPU.
+	The event that ends an idle wait comes off the queue, so the main loop reads its events through events(),
+	which hands that one over first and then the rest of the queue, in order.
+	"""
+	def __init__(self, active_fps=60, idle_fps=15, spin_margin=0.002):
+		self.active_period = 1.0 / active_fps
+		self.idle_period = 1.0 / idle_fps
+		self.spin_margin = spin_margin # seconds before a deadline where sleeping stops and busy-waiting starts
+		self.last_frame_time = time.perf_counter()
+		self.next_deadline = self.last_frame_time + self.active_period
+		self.is_idle = False
+		self.woken_by = None # The event an idle wait took off the queue, until events() hands it over
+
+	def _wait_until(self, deadline):
+		remaining = deadline - time.perf_counter()
+		if remaining > self.spin_margin: time.sleep(remaining - self.spin_margin)
+		while time.perf_counter() < deadline: pass
+
+	def _wait_for_event(self, timeout):
+		# wait() returns at once when something is already queued, so there's no peek() first: without a type, pygame
+		# 2.6's peek() frees a queued user event's attributes while the queue still holds them
+		if self.woken_by is not None: return
+		event = pygame.event.wait(max(1, int(timeout * 1000)))
+		if event.type != pygame.NOEVENT: self.woken_by = event
+
+	def events(self):
+		"""Returns this frame's events: the one that ended an idle wait, if any, then the rest of the queue."""
+		events = pygame.event.get()
+		if self.woken_by is not None:
+			events.insert(0, self.woken_by)
+			self.woken_by = None
+		return events
+
+	def wait(self, animating):
+		"""Blocks until the next frame is due and returns the elapsed time since the previous frame in seconds."""
+		if animating:
+			if self.is_idle: self.next_deadline = self.last_frame_time + self.active_period
+			self.is_idle = False
+			self._wait_until(self.next_deadline)
+			now = time.perf_counter()
+			self.next_deadline += self.active_period
+			if now > self.next_deadline: self.next_deadline = now + self.active_period # Fell behind; don't try to catch up with back-to-back frames
+		else:
+			self.is_idle = True
+			self._wait_for_event(self.idle_period - (time.perf_counter() - self.last_frame_time))
+			self._wait_until(self.last_frame_time + self.active_period) # A burst of events still can't push past active_fps
+			now = time.perf_counter()
+		time_delta = now - self.last_frame_time
+		self.last_frame_time = now
+		return time_delta
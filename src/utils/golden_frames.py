@@ -0,0 +1,192 @@
+# golden_frames.py
+"""
+Golden-frame regression harness.
+
+Drives every screen in SCREEN_CLASSES headless with a fixed time step and a scripted depth trace, captures
+the frames at chosen indices and either records them as references or checks them against the references.
+Reel stops and visual choices come from a seeded StopStream, so two runs of the same tree draw the same frames.
+
+Record on the commit you trust, then check the change:
+	python -m src.utils.golden_frames --record                  # writes golden_frames/manifest.json and one PNG per captured frame
+	python -m src.utils.golden_frames                           # compares, exits 1 on any mismatch
+	RENDER_BACKEND=texture python -m src.utils.golden_frames    # e.g. the texture backend against surface references
+
+A frame passes if its hash matches, or else if no channel of any pixel differs by more than --tolerance (rounding
+in another blitter or backend), except on up to --max-pixels pixels. A failing frame gets a *_diff.png next to
+its reference. Frame times (render plus present) are reported next to the recorded ones. Check mode reuses the
+recorded step, frame count, capture indices, seed and trace, so only the code differs between the two runs.
+
+The default trace is a slow full-range sweep, which pulls the slot lever once and thrusts at the sperm bank.
+--trace takes a text file with one depth (0-1024) per line instead, looped if the run is longer.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SIZE = (800, 480)
+DEFAULT_DIRECTORY = PROJECT_ROOT / 'golden_frames'
+DEFAULT_CAPTURE = [0, 15, 45, 75, 105, 135, 180, 240, 299]
+
+class ScriptedDevice:
+	"""Stands in for Orifice: depth is a function of the frame index, from a trace or a sweep."""
+	def __init__(self, trace=None):
+		self.trace = trace
+		self.depth = 0
+		self.latched_change_time = None # No sample timestamps, so the latency tracer records nothing
+	def step(self, frame):
+		if self.trace: self.depth = self.trace[frame % len(self.trace)]
+		else: self.depth = int(512 - 512 * math.cos(frame / 40.0))
+	def close(self): pass
+
+def load_trace(path):
+	with open(path, encoding='utf-8') as f:
+		return [max(0, min(1024, int(float(line)))) for line in f if line.strip()]
+
+def frame_hash(surface):
+	import pygame
+	return hashlib.sha256(pygame.image.tobytes(surface, 'RGB')).hexdigest()
+
+def run_screens(settings, backend):
+	"""Plays every screen under settings. Returns {screen: {'frames': {index: Surface}, 'times': [seconds]}}."""
+	import pygame
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.screens import SCREEN_CLASSES
+	from src.utils.rng import StopStream
+
+	pygame.init()
+	canvas = create_canvas(backend, SIZE, "Golden frames")
+	asset_manager = AssetManager(PROJECT_ROOT)
+	trace = load_trace(settings['trace']) if settings['trace'] else None
+	capture = set(settings['capture'])
+	results = {}
+	for name, screen_class in SCREEN_CLASSES.items():
+		game_data = GameData.load_or_create(Path(tempfile.mkdtemp())) # Fresh and identical for every run; never the real save
+		device = ScriptedDevice(trace)
+		screen = screen_class(canvas, device, asset_manager, game_data)
+		slot_machine = getattr(screen, 'slot_machine', None)
+		if slot_machine is not None: slot_machine.stop_stream = StopStream(slot_machine.reel_lengths, settings['seed'])
+		screen.on_enter()
+		screen.fade_from_black(settings['fade'], screen.on_ready)
+		frames, times = {}, []
+		for frame in range(settings['frames']):
+			device.step(frame)
+			pygame.event.pump()
+			screen.advance(settings['delta'])
+			started = time.perf_counter()
+			screen.render()
+			canvas.present()
+			times.append(time.perf_counter() - started)
+			if frame in capture: frames[frame] = canvas.snapshot()
+		results[name] = {'frames': frames, 'times': times}
+	return results
+
+def timing(times):
+	ordered = sorted(times)
+	return {'mean_ms': sum(ordered) / len(ordered) * 1000.0, 'p95_ms': ordered[int(len(ordered) * 0.95)] * 1000.0}
+
+def compare(reference_path, surface, tolerance, max_pixels):
+	"""Returns (passed, worst channel difference, number of pixels beyond tolerance, diff Surface or None)."""
+	import numpy as np
+	import pygame
+	reference = pygame.surfarray.array3d(pygame.image.load(str(reference_path))).astype(np.int16)
+	current = pygame.surfarray.array3d(surface).astype(np.int16)
+	if reference.shape != current.shape: return False, 255, current.shape[0] * current.shape[1], None
+	difference = np.abs(reference - current).max(axis=2)
+	beyond = int((difference > tolerance).sum())
+	passed = beyond <= max_pixels
+	diff_surface = None
+	if not passed:
+		highlighted = np.zeros(current.shape, dtype=np.uint8)
+		highlighted[..., 0] = np.clip(difference * 4, 0, 255) # Red where pixels differ, brighter for larger differences
+		highlighted[..., 1] = (current.mean(axis=2) // 3).astype(np.uint8) # The frame faintly underneath for orientation
+		diff_surface = pygame.surfarray.make_surface(highlighted)
+	return passed, int(difference.max()), beyond, diff_surface
+
+def record(directory, settings, backend):
+	import pygame
+	directory.mkdir(parents=True, exist_ok=True)
+	results = run_screens(settings, backend)
+	manifest = {**settings, 'backend': backend, 'screens': {}}
+	for name, result in results.items():
+		hashes = {}
+		for frame, surface in result['frames'].items():
+			pygame.image.save(surface, str(directory / f"{name}_{frame:04d}.png"))
+			hashes[str(frame)] = frame_hash(surface)
+		manifest['screens'][name] = {'frames': hashes, **timing(result['times'])}
+		print(f"{name:<18}{len(hashes):>3} frames recorded  {manifest['screens'][name]['mean_ms']:.3f} ms/frame")
+	with open(directory / 'manifest.json', 'w', encoding='utf-8') as f:
+		json.dump(manifest, f, indent=2)
+	pygame.quit()
+
+def check(directory, backend, tolerance, max_pixels):
+	import pygame
+	with open(directory / 'manifest.json', encoding='utf-8') as f:
+		manifest = json.load(f)
+	settings = {key: manifest[key] for key in ('delta', 'frames', 'capture', 'seed', 'fade', 'trace')}
+	for stale in directory.glob('*_diff.png'): stale.unlink()
+	results = run_screens(settings, backend)
+	failures = 0
+	print(f"{'Screen':<18}{'Frame':>6}  {'Result':<10}{'max diff':>9}{'pixels':>10}")
+	for name, result in results.items():
+		expected = manifest['screens'].get(name)
+		if expected is None:
+			print(f"{name:<18}{'':>6}  no reference; record again to include it")
+			continue
+		for frame, surface in sorted(result['frames'].items()):
+			if frame_hash(surface) == expected['frames'].get(str(frame)):
+				print(f"{name:<18}{frame:>6}  {'identical':<10}")
+				continue
+			reference_path = directory / f"{name}_{frame:04d}.png"
+			if not reference_path.exists():
+				print(f"{name:<18}{frame:>6}  {'missing':<10}")
+				failures += 1
+				continue
+			passed, worst, beyond, diff_surface = compare(reference_path, surface, tolerance, max_pixels)
+			print(f"{name:<18}{frame:>6}  {'close' if passed else 'DIFFERENT':<10}{worst:>9}{beyond:>10}")
+			if not passed:
+				failures += 1
+				if diff_surface is not None: pygame.image.save(diff_surface, str(directory / f"{name}_{frame:04d}_diff.png"))
+	print(f"\n{'Screen':<18}{'ref ms':>9}{'now ms':>9}{'ref p95':>9}{'now p95':>9}{'speedup':>9}")
+	for name, result in results.items():
+		if name not in manifest['screens']: continue
+		now, then = timing(result['times']), manifest['screens'][name]
+		print(f"{name:<18}{then['mean_ms']:>9.3f}{now['mean_ms']:>9.3f}{then['p95_ms']:>9.3f}{now['p95_ms']:>9.3f}{then['mean_ms'] / now['mean_ms']:>8.2f}x")
+	pygame.quit()
+	if manifest['backend'] != backend: print(f"\nReferences were recorded with the {manifest['backend']} backend, checked with {backend}.")
+	print(f"\n{failures} frame(s) differ" if failures else "\nAll frames match")
+	return failures
+
+def main():
+	parser = argparse.ArgumentParser(description="Record or check golden frames for every screen")
+	parser.add_argument('--record', action='store_true', help="write new references instead of checking")
+	parser.add_argument('--directory', type=Path, default=DEFAULT_DIRECTORY)
+	parser.add_argument('--backend', default=os.environ.get('RENDER_BACKEND', 'surface'), choices=['surface', 'texture'])
+	parser.add_argument('--tolerance', type=int, default=2, help="largest per-channel difference that still counts as equal")
+	parser.add_argument('--max-pixels', type=int, default=0, help="pixels allowed beyond the tolerance")
+	group = parser.add_argument_group("recording (check mode reuses what was recorded)")
+	group.add_argument('--delta', type=float, default=1.0 / 60.0, help="seconds advanced per frame")
+	group.add_argument('--frames', type=int, default=300, help="frames played per screen")
+	group.add_argument('--capture', type=int, nargs='+', default=DEFAULT_CAPTURE, help="frame indices to capture")
+	group.add_argument('--seed', type=int, default=1234, help="seed for reel stops and visual choices")
+	group.add_argument('--fade', type=float, default=0.4, help="fade-in seconds at the start of each screen")
+	group.add_argument('--trace', help="depth trace file, one value per line (default: a sweep)")
+	args = parser.parse_args()
+	if args.record:
+		settings = {'delta': args.delta, 'frames': args.frames, 'capture': sorted(set(args.capture)), 'seed': args.seed,
+			'fade': args.fade, 'trace': str(Path(args.trace).resolve()) if args.trace else None}
+		record(args.directory, settings, args.backend)
+	else:
+		if not (args.directory / 'manifest.json').exists(): parser.error(f"no references in {args.directory}; run with --record first")
+		sys.exit(1 if check(args.directory, args.backend, args.tolerance, args.max_pixels) else 0)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,166 @@
+# input_latency.py
+"""
+Input-to-display latency: from a depth change to the present() of the first frame that reacts to it.
+
+The path of one measurement:
+- Orifice timestamps every sample (time.monotonic()) and latch() sets latched_change_time to when the latched
+  depth started to differ from the previous frame's.
+- BaseScreen.advance copies it to input_change_time for the frame's update steps, or the next frame's if this one
+  runs none. When a screen changes what it draws in response (SlotGameScreen.update_lever_by_device moving the
+  lever, SpermBankScreen counting a thrust) it calls input_shown(), which keeps the earliest such time in
+  shown_input_time.
+- After present(), LatencyTracer.presented() records now - shown_input_time and clears it, so only the first frame
+  showing a change counts.
+While the input keeps moving, the first change after a latch comes right after the previous one, so a steady stroke
+measures about one frame period plus the frame's own work. The timestamp is of the conditioned depth changing, so the One-Euro filter's smoothing lag (reported by Orifice.close()
+and below) is not included. Joystick and socket samples are stamped on arrival, which leaves out the transport.
+
+main records into the bangslots_input_latency_seconds histogram, per screen and input backend (see metrics.py).
+Run headless against synthetic input, or a recording, to get the distributions; exits 1 if a p95 is over --max-p95:
+	python -m src.utils.input_latency                                         # synthetic input over every transport
+	python -m src.utils.input_latency --input "playback:file=stroke.csv,rate=1000" --backends shared_memory
+The producers run in this process: the synthetic generator directly, an in-process SliderServer for the socket, a
+writer thread for the shared-memory ring.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SIZE = (800, 480)
+LATENCY_BUCKETS = (0.002, 0.004, 0.006, 0.008, 0.010, 0.0125, 0.015, 0.0175, 0.020, 0.025, 0.030, 0.040, 0.050, 0.075, 0.100, 0.150, 0.250)
+SCREENS = ('SlotGameScreen', 'SpermBankScreen') # The screens that react to depth on screen; the title only transitions
+BACKENDS = ('synthetic', 'socket', 'shared_memory')
+
+class LatencyTracer:
+	"""Records input-to-present latency per (screen, backend) into the metrics registry, and optionally keeps every sample."""
+	def __init__(self, registry=metrics.REGISTRY, keep_samples=False):
+		self.registry = registry
+		self.histograms = {} # (screen, backend) -> Histogram
+		self.samples = {} if keep_samples else None # (screen, backend) -> [seconds]
+
+	def presented(self, screen, backend, now=None):
+		"""Call right after present(). Returns the latency recorded, or None if the frame reacted to no new input."""
+		timestamp = screen.shown_input_time
+		if timestamp is None: return None
+		screen.shown_input_time = None
+		latency = (time.monotonic() if now is None else now) - timestamp
+		key = (screen.__class__.__name__, backend)
+		histogram = self.histograms.get(key)
+		if histogram is None:
+			histogram = self.registry.histogram('bangslots_input_latency_seconds', "From a depth change to the present() of the first frame reacting to it",
+				LATENCY_BUCKETS, screen=key[0], backend=backend)
+			self.histograms[key] = histogram
+		histogram.observe(latency)
+		if self.samples is not None: self.samples.setdefault(key, []).append(latency)
+		return latency
+
+TRACER = LatencyTracer()
+
+def _open_device(backend, spec):
+	"""An Orifice on backend fed by a SyntheticDepthGenerator built from spec. Returns (device, cleanup)."""
+	from api.orifice import Orifice
+	from api.synthetic_depth import SyntheticDepthGenerator
+	generator = SyntheticDepthGenerator.from_spec(spec)
+	if backend == 'synthetic':
+		device = Orifice(backend='synthetic', synthetic=generator)
+		return device, device.close
+	if backend == 'shared_memory':
+		from api.shared_depth import SharedDepthRing
+		name = f"orifice_latency_{os.getpid()}"
+		device = Orifice(backend='shared_memory', shared_memory_name=name)
+		writer = SharedDepthRing.attach(name, timeout=1.0, shared_tracker=True)
+		generator.start(writer.write) # write(raw, timestamp)
+		def cleanup():
+			generator.stop()
+			writer.close()
+			device.close()
+		return device, cleanup
+	from api.slider_simulator import SliderServer, free_port
+	port = free_port()
+	server = SliderServer('127.0.0.1', port)
+	server.start()
+	generator.start(lambda raw, timestamp: server.update_depth(raw))
+	device = Orifice('127.0.0.1', port, backend='socket')
+	deadline = time.monotonic() + 2.0
+	while not device.socket_connected and time.monotonic() < deadline: time.sleep(0.01)
+	def cleanup():
+		generator.stop()
+		device.close()
+		server.stop()
+	return device, cleanup
+
+def run(backend, screen_name, spec, seconds, fps, tracer):
+	"""Plays one screen at fps the way main does, on a device fed over backend. Returns the conditioner's report."""
+	import pygame
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.screens import SCREEN_CLASSES
+	from src.utils.frame_pacer import FramePacer
+
+	pygame.init()
+	canvas = create_canvas(os.environ.get('RENDER_BACKEND', 'surface'), SIZE, "Input latency")
+	device, cleanup = _open_device(backend, spec)
+	try:
+		game_data = GameData.load_or_create(Path(tempfile.mkdtemp())) # Never touch the real save
+		game_data.money = 10 ** 9 # Enough to pull the lever for the whole run
+		screen = SCREEN_CLASSES[screen_name](canvas, device, AssetManager(PROJECT_ROOT), game_data)
+		screen.on_enter()
+		screen.on_ready()
+		pacer = FramePacer(fps, fps) # Never idle: a still slider would otherwise measure the idle wake-up instead
+		deadline = time.monotonic() + seconds
+		while time.monotonic() < deadline:
+			time_delta = pacer.wait(True)
+			for event in pacer.events(): device.handle_event(event)
+			device.latch()
+			screen.advance(time_delta)
+			screen.render()
+			canvas.present()
+			tracer.presented(screen, device.backend)
+		screen.on_exit()
+		return device.conditioner.report()
+	finally:
+		cleanup()
+		pygame.quit()
+
+def percentile(ordered, q): return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def main():
+	parser = argparse.ArgumentParser(description="Measure input-to-display latency per screen and input backend")
+	parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+	parser.add_argument('--screens', nargs='+', default=list(SCREENS), choices=SCREENS)
+	parser.add_argument('--input', default='sine:hz=0.7,rate=1000', help="SyntheticDepthGenerator spec, e.g. a playback:file=... recording")
+	parser.add_argument('--seconds', type=float, default=10.0, help="per screen and backend")
+	parser.add_argument('--fps', type=int, default=60)
+	parser.add_argument('--max-p95', type=float, default=50.0, help="ms; exit 1 if any p95 is higher")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+	tracer = LatencyTracer(metrics.Registry(), keep_samples=True)
+	failures = 0
+	print(f"{'Backend':<15}{'Screen':<17}{'events':>7}{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'max ms':>8}{'filter lag ms':>15}")
+	for backend in args.backends:
+		for screen_name in args.screens:
+			conditioning = run(backend, screen_name, args.input, args.seconds, args.fps, tracer)
+			ordered = sorted(tracer.samples.pop((screen_name, backend), []))
+			if not ordered:
+				print(f"{backend:<15}{screen_name:<17}{0:>7}  no reactions; is the input moving?")
+				failures += 1
+				continue
+			p95 = percentile(ordered, 0.95) * 1000.0
+			if p95 > args.max_p95: failures += 1
+			print(f"{backend:<15}{screen_name:<17}{len(ordered):>7}{sum(ordered) / len(ordered) * 1000.0:>9.2f}{percentile(ordered, 0.5) * 1000.0:>8.2f}"
+				f"{p95:>8.2f}{percentile(ordered, 0.99) * 1000.0:>8.2f}{ordered[-1] * 1000.0:>8.2f}{conditioning['filter_lag_ms']:>15.1f}")
+	print(f"\n{failures} run(s) failed (p95 over {args.max_p95:.0f} ms or no reactions)" if failures else "\nAll runs within the p95 limit")
+	sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+	main()
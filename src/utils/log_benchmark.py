@@ -0,0 +1,143 @@
+# log_benchmark.py
+"""
+Logging overhead benchmark.
+
+Plays SlotGameScreen headless on a real Orifice whose reader thread receives a depth sweep over TCP from
+an in-process SliderServer (--rate samples per second), so both the per-sample path and the per-spin
+path log as they do in the game. Reports the main loop's per-frame cost (latch, advance, render,
+present) at 60 fps for each log level and handler mode:
+- queued: configure_logging(), a QueueHandler with console I/O on a listener thread
+- direct: basicConfig, writing on whichever thread logs
+
+Log output goes to a file (--sink). --write-latency adds a delay to every write to stand in for a slow
+console (a remote terminal, a Pi's serial console), which is where writing on the render thread hurts.
+CPU ms/s is the whole process's CPU time per second of wall time, reader thread included. Each run is
+its own process.
+
+Usage:
+	python -m src.utils.log_benchmark
+	python -m src.utils.log_benchmark --modes direct --levels DEBUG --seconds 20
+	python -m src.utils.log_benchmark --write-latency 0.002
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+FRAME_TIME = 1.0 / 60.0
+SWEEP_HZ = 0.5 # Full strokes per second; each one pulls the lever
+
+class SlowStream:
+	"""A file that takes latency seconds per write, like a slow console."""
+	def __init__(self, path, latency):
+		self.file = open(path, 'a', encoding='utf-8')
+		self.latency = latency
+	def write(self, text):
+		if self.latency: time.sleep(self.latency)
+		return self.file.write(text)
+	def flush(self): self.file.flush()
+	def close(self): self.file.close()
+
+def run_once(mode, level, seconds, rate, sink, write_latency):
+	stream = SlowStream(sink, write_latency)
+	if mode == 'queued':
+		from src.utils.log_setup import configure_logging, stop_logging
+		configure_logging(level, stream)
+	else: logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', stream=stream, force=True)
+
+	import pygame
+	from api.orifice import Orifice
+	from api.slider_simulator import SliderServer, free_port
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.slot_game_screen import SlotGameScreen
+
+	logging.getLogger('orifice.slider').setLevel(logging.WARNING) # In the game the server is another process; only the game's own logging is measured
+	port = free_port()
+	server = SliderServer('127.0.0.1', port)
+	server.start()
+	publishing = True
+	def publish():
+		started = time.monotonic()
+		while publishing:
+			t = time.monotonic() - started
+			server.update_depth(512 - 512 * math.cos(2 * math.pi * SWEEP_HZ * t))
+			time.sleep(1.0 / rate)
+	publisher = threading.Thread(target=publish, daemon=True)
+	publisher.start()
+
+	pygame.init()
+	canvas = create_canvas('surface', (800, 480), "Logging benchmark")
+	device = Orifice('127.0.0.1', port, backend='socket')
+	game_data = GameData.load_or_create(Path(tempfile.mkdtemp())) # Never touch the real save
+	game_data.money = 10 ** 9
+	screen = SlotGameScreen(canvas, device, AssetManager(PROJECT_ROOT), game_data)
+	screen.on_enter()
+	screen.on_ready()
+	times = []
+	cpu_started, wall_started = time.process_time(), time.perf_counter()
+	deadline = time.perf_counter() + seconds
+	while time.perf_counter() < deadline:
+		started = time.perf_counter()
+		pygame.event.pump()
+		device.latch()
+		screen.advance(FRAME_TIME)
+		screen.render()
+		canvas.present()
+		elapsed = time.perf_counter() - started
+		times.append(elapsed)
+		time.sleep(max(0.0, FRAME_TIME - elapsed))
+	cpu = (time.process_time() - cpu_started) / (time.perf_counter() - wall_started)
+	publishing = False
+	publisher.join()
+	device.close()
+	server.stop()
+	pygame.quit()
+	if mode == 'queued': stop_logging()
+	stream.close()
+	times.sort()
+	return {
+		'frames': len(times),
+		'mean_ms': sum(times) / len(times) * 1000.0,
+		'p50_ms': times[len(times) // 2] * 1000.0,
+		'p99_ms': times[int(len(times) * 0.99)] * 1000.0,
+		'max_ms': times[-1] * 1000.0,
+		'cpu_ms_per_s': cpu * 1000.0
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description="Measure the per-frame cost of logging")
+	parser.add_argument('--modes', nargs='+', default=['direct', 'queued'], choices=['direct', 'queued'])
+	parser.add_argument('--levels', nargs='+', default=['INFO', 'DEBUG'])
+	parser.add_argument('--seconds', type=float, default=10.0)
+	parser.add_argument('--rate', type=float, default=1000.0, help="depth samples published per second")
+	parser.add_argument('--write-latency', type=float, default=0.0, help="seconds added to every log write (a slow console)")
+	parser.add_argument('--sink', help="file the log output is appended to (default: a temporary file per run)")
+	parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS) # Internal: MODE LEVEL, prints JSON
+	args = parser.parse_args()
+	if args.child:
+		print(json.dumps(run_once(args.child[0], args.child[1], args.seconds, args.rate, args.sink, args.write_latency)))
+		return
+	print(f"{'Mode':<8}{'Level':<7}{'frames':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'CPU ms/s':>10}{'log lines':>11}")
+	for level in args.levels:
+		for mode in args.modes:
+			sink = args.sink or tempfile.mkstemp(suffix='.log')[1]
+			command = [sys.executable, '-m', 'src.utils.log_benchmark', '--child', mode, level,
+				'--seconds', str(args.seconds), '--rate', str(args.rate), '--write-latency', str(args.write_latency), '--sink', sink]
+			output = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True, env=os.environ, check=True).stdout
+			stats = json.loads(output.strip().splitlines()[-1])
+			with open(sink, encoding='utf-8') as f: lines = sum(1 for _ in f)
+			if not args.sink: os.remove(sink)
+			print(f"{mode:<8}{level:<7}{stats['frames']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}{stats['cpu_ms_per_s']:>10.1f}{lines:>11}")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,57 @@
+# log_setup.py
+"""
+Logging for the game process.
+
+configure_logging() routes every record through a QueueHandler, so the thread that logs (the render
+loop, the Orifice reader thread) only builds the record and puts it on a queue. A QueueListener thread
+formats the final line and does the console/file I/O, so a slow terminal can't stall a frame.
+stop_logging() writes out whatever is still queued; main calls it on shutdown, and it also runs at exit.
+
+Hot paths log with %-style arguments (logger.debug("Reel %d stopped", i)) instead of f-strings, so
+nothing is formatted while the level is disabled, and count per-sample events instead of logging each one.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_listener = None
+
+def configure_logging(level=logging.INFO, stream=sys.stdout, filename=None, queued=True):
+	"""
+	Replaces the root logger's handlers with a console handler, plus a file handler if filename is given.
+	queued=False attaches them directly, writing on the logging thread as basicConfig does.
+	"""
+	global _listener
+	stop_logging()
+	formatter = logging.Formatter(FORMAT)
+	handlers = [logging.StreamHandler(stream)]
+	if filename: handlers.append(logging.FileHandler(filename, encoding='utf-8'))
+	for handler in handlers: handler.setFormatter(formatter)
+	root = logging.getLogger()
+	for handler in root.handlers[:]:
+		root.removeHandler(handler)
+		handler.close()
+	root.setLevel(level)
+	if not queued:
+		for handler in handlers: root.addHandler(handler)
+		return
+	records = queue.SimpleQueue()
+	root.addHandler(logging.handlers.QueueHandler(records))
+	_listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+	_listener.start()
+
+def stop_logging():
+	"""Flushes the queue and stops the listener thread. Records logged afterwards are written directly. Safe to call more than once."""
+	global _listener
+	if _listener is None: return
+	_listener.stop()
+	root = logging.getLogger()
+	for handler in root.handlers[:]:
+		if isinstance(handler, logging.handlers.QueueHandler): root.removeHandler(handler)
+	for handler in _listener.handlers: root.addHandler(handler)
+	_listener = None
+
+atexit.register(stop_logging)
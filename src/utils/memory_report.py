@@ -0,0 +1,228 @@
+# memory_report.py
+"""
+Memory accounting and leak checks.
+
+- asset_report(), screen_report() and canvas_report() count the pixel bytes of the surfaces (and NumPy arrays)
+  held by the AssetManager cache, by each attribute of a screen, and by the texture backend's uploads. Pixel
+  memory belongs to SDL, so tracemalloc doesn't see it; these reports do.
+- TransitionTracker logs, at every screen transition, RSS, what the new screen holds, and the tracemalloc
+  allocations that grew since the previous transition. main uses it when MEMORY_DEBUG=1.
+- The leak check cycles Title -> Slot -> SpermBank headless, creating each screen anew as main does, and fails
+  if traced memory or RSS keeps growing after the warm-up cycles, or if any screen outlives its turn.
+
+Usage:
+	MEMORY_DEBUG=1 python main.py
+	python -m src.utils.memory_report                          # per-screen and cache report
+	python -m src.utils.memory_report --leak-check --cycles 30 # exits 1 on a leak
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SIZE = (800, 480)
+SHARED_ATTRIBUTES = ('canvas', 'device', 'asset_manager', 'game_data') # Owned by main and passed to every screen
+MAX_DEPTH = 3 # How far into lists, dicts and the game's own objects (widgets, the slot machine) a report looks
+
+def surface_bytes(surface):
+	if surface.get_parent() is not None: return 0 # A subsurface shares its parent's pixels
+	return surface.get_pitch() * surface.get_height()
+
+def _held_bytes(value, seen, depth=0):
+	if id(value) in seen: return 0
+	seen.add(id(value))
+	if isinstance(value, pygame.Surface): return surface_bytes(value)
+	if isinstance(value, np.ndarray): return value.nbytes if value.base is None else 0 # A view shares its base's buffer
+	if depth >= MAX_DEPTH: return 0
+	if isinstance(value, dict): return sum(_held_bytes(item, seen, depth + 1) for item in value.values())
+	if isinstance(value, (list, tuple, set, frozenset)): return sum(_held_bytes(item, seen, depth + 1) for item in value)
+	if type(value).__module__.startswith('src.') and hasattr(value, '__dict__'):
+		return sum(_held_bytes(item, seen, depth + 1) for item in vars(value).values())
+	return 0
+
+def asset_report(asset_manager):
+	"""Bytes per cached image."""
+	return {filename: surface_bytes(image) for filename, image in asset_manager.loaded_images.items() if image is not None}
+
+def screen_report(screen, asset_manager=None):
+	"""Bytes held by each attribute of a screen. Images from the asset cache are left out; asset_report counts them."""
+	seen = {id(image) for image in asset_manager.loaded_images.values()} if asset_manager else set()
+	report = {}
+	for name, value in vars(screen).items():
+		if name in SHARED_ATTRIBUTES: continue
+		size = _held_bytes(value, seen)
+		if size: report[name] = size
+	return report
+
+def canvas_report(canvas):
+	"""Texture count and approximate bytes (4 per pixel) uploaded by the texture backend; empty for the surface backend."""
+	textures = getattr(canvas, 'textures', None)
+	if textures is None: return {}
+	surfaces = list(textures.keys())
+	return {'textures': len(surfaces), 'bytes': sum(surface.get_width() * surface.get_height() * 4 for surface in surfaces)}
+
+def rss_bytes():
+	"""Resident set size of this process, or its peak where the current value isn't available."""
+	try:
+		with open('/proc/self/statm') as f: return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+	except (OSError, ValueError, AttributeError):
+		import resource
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		return peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB elsewhere
+
+def megabytes(size): return size / (1024 * 1024)
+
+class TransitionTracker:
+	"""Logs memory at every screen transition, including what grew since the previous one (tracemalloc)."""
+	def __init__(self, top=10, traceback_frames=1):
+		if not tracemalloc.is_tracing(): tracemalloc.start(traceback_frames)
+		self.top = top
+		self.previous = self._snapshot()
+		self.screens = weakref.WeakSet() # Every screen seen; old ones should disappear once replaced
+		self.last_screen = lambda: None # Weak reference to the screen being left; it is still on the stack during the transition
+
+	@staticmethod
+	def _snapshot():
+		return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)))
+
+	def transition(self, screen, asset_manager, canvas=None):
+		"""Call with the screen just entered."""
+		gc.collect()
+		leaked = sum(1 for alive in self.screens if alive is not self.last_screen())
+		self.screens.add(screen)
+		self.last_screen = weakref.ref(screen)
+		snapshot = self._snapshot()
+		growth = snapshot.compare_to(self.previous, 'lineno')
+		self.previous = snapshot
+		traced, _ = tracemalloc.get_traced_memory()
+		assets = asset_report(asset_manager)
+		held = screen_report(screen, asset_manager)
+		logger.info("Entered %s: RSS %.1f MB, traced %.1f MB, %d earlier screen(s) alive, asset cache %.1f MB in %d images, screen holds %.1f MB",
+			type(screen).__name__, megabytes(rss_bytes()), megabytes(traced), leaked,
+			megabytes(sum(assets.values())), len(assets), megabytes(sum(held.values())))
+		for name, size in sorted(held.items(), key=lambda item: -item[1])[:self.top]:
+			logger.info("  %-32s %8.1f KB", name, size / 1024)
+		textures = canvas_report(canvas) if canvas is not None else {}
+		if textures: logger.info("  %d textures, %.1f MB", textures['textures'], megabytes(textures['bytes']))
+		if leaked: logger.warning("%d screen(s) from before the previous transition are still referenced", leaked)
+		for stat in growth[:self.top]:
+			if stat.size_diff > 0: logger.info("  +%.1f KB %s", stat.size_diff / 1024, stat.traceback)
+
+def _play(screen, device, frames, canvas, before_exit=None):
+	"""One turn of a screen as main plays it, without the fades. device is a golden_frames.ScriptedDevice."""
+	screen.on_enter()
+	screen.fade_from_black(0, screen.on_ready)
+	for frame in range(frames):
+		device.step(frame)
+		pygame.event.pump()
+		screen.advance(1.0 / 60.0)
+		screen.render()
+		canvas.present()
+	if before_exit: before_exit(screen)
+	screen.on_exit()
+
+def print_screen(name, held):
+	print(f"{name}: {megabytes(sum(held.values())):.2f} MB")
+	for attribute, size in sorted(held.items(), key=lambda item: -item[1]):
+		print(f"  {attribute:<36}{size / 1024:>10.1f} KB")
+
+def report(backend, frames):
+	"""Plays each screen once and prints what it holds before on_exit, then what the caches hold."""
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.screens import SCREEN_CLASSES
+	from src.utils.golden_frames import ScriptedDevice
+	pygame.init()
+	canvas = create_canvas(backend, SIZE, "Memory report")
+	asset_manager = AssetManager(PROJECT_ROOT)
+	game_data = GameData.load_or_create(Path(tempfile.mkdtemp()))
+	for name, screen_class in SCREEN_CLASSES.items():
+		device = ScriptedDevice()
+		screen = screen_class(canvas, device, asset_manager, game_data)
+		_play(screen, device, frames, canvas, lambda screen: print_screen(name, screen_report(screen, asset_manager)))
+	assets = asset_report(asset_manager)
+	print(f"AssetManager cache: {megabytes(sum(assets.values())):.2f} MB in {len(assets)} images")
+	for filename, size in sorted(assets.items(), key=lambda item: -item[1]):
+		print(f"  {filename:<36}{size / 1024:>10.1f} KB")
+	textures = canvas_report(canvas)
+	if textures: print(f"Textures: {textures['textures']}, {megabytes(textures['bytes']):.2f} MB")
+	print(f"RSS: {megabytes(rss_bytes()):.1f} MB")
+	pygame.quit()
+
+def leak_check(backend, cycles, frames, warmup, traced_limit, rss_limit, top):
+	"""Returns True if memory stayed flat. Limits are bytes of growth per cycle, averaged after the warm-up."""
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.screens import SCREEN_CLASSES
+	from src.utils.golden_frames import ScriptedDevice
+	if cycles <= warmup: raise ValueError("cycles must exceed the warm-up cycles")
+	tracemalloc.start(8)
+	pygame.init()
+	canvas = create_canvas(backend, SIZE, "Leak check")
+	asset_manager = AssetManager(PROJECT_ROOT)
+	game_data = GameData.load_or_create(Path(tempfile.mkdtemp()))
+	screens = weakref.WeakSet()
+	baseline = None
+	samples = []
+	print(f"{'Cycle':>5}{'traced MB':>11}{'RSS MB':>9}{'alive':>7}")
+	for cycle in range(cycles):
+		for screen_class in SCREEN_CLASSES.values():
+			device = ScriptedDevice()
+			screen = screen_class(canvas, device, asset_manager, game_data)
+			screens.add(screen)
+			_play(screen, device, frames, canvas)
+			del screen # main drops its reference on the next transition
+		gc.collect()
+		traced, _ = tracemalloc.get_traced_memory()
+		samples.append((traced, rss_bytes()))
+		print(f"{cycle + 1:>5}{megabytes(traced):>11.2f}{megabytes(samples[-1][1]):>9.1f}{len(screens):>7}")
+		if cycle + 1 == warmup: baseline = TransitionTracker._snapshot()
+	measured = cycles - warmup
+	traced_growth = (samples[-1][0] - samples[warmup - 1][0]) / measured
+	rss_growth = (samples[-1][1] - samples[warmup - 1][1]) / measured
+	leaked_screens = len(screens)
+	print(f"\nAfter {warmup} warm-up cycle(s): traced {traced_growth / 1024:+.1f} KB/cycle (limit {traced_limit / 1024:.0f}), "
+		f"RSS {rss_growth / 1024:+.1f} KB/cycle (limit {rss_limit / 1024:.0f}), screens still alive {leaked_screens}")
+	growth = [stat for stat in TransitionTracker._snapshot().compare_to(baseline, 'traceback') if stat.size_diff > 0][:top]
+	if growth: print("Largest growth since the warm-up:")
+	for stat in growth:
+		print(f"  +{stat.size_diff / 1024:.1f} KB in {stat.count_diff:+d} blocks")
+		for line in stat.traceback.format(limit=3): print(f"    {line}")
+	pygame.quit()
+	tracemalloc.stop()
+	passed = traced_growth <= traced_limit and rss_growth <= rss_limit and leaked_screens == 0
+	print("\nNo leak detected" if passed else "\nLEAK: memory grows with every cycle")
+	return passed
+
+def main():
+	parser = argparse.ArgumentParser(description="Report memory per screen and cache, or check screen cycling for leaks")
+	parser.add_argument('--leak-check', action='store_true')
+	parser.add_argument('--backend', default=os.environ.get('RENDER_BACKEND', 'surface'), choices=['surface', 'texture'])
+	parser.add_argument('--cycles', type=int, default=20, help="Title -> Slot -> SpermBank rounds")
+	parser.add_argument('--frames', type=int, default=120, help="frames played on each screen per round")
+	parser.add_argument('--warmup', type=int, default=3, help="rounds before growth is measured (caches filling up)")
+	parser.add_argument('--traced-limit', type=float, default=64, help="KB of traced growth allowed per round")
+	parser.add_argument('--rss-limit', type=float, default=1024, help="KB of RSS growth allowed per round")
+	parser.add_argument('--top', type=int, default=10, help="growth sites listed")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+	if args.leak_check:
+		passed = leak_check(args.backend, args.cycles, args.frames, args.warmup, args.traced_limit * 1024, args.rss_limit * 1024, args.top)
+		sys.exit(0 if passed else 1)
+	report(args.backend, args.frames)
+
+if __name__ == "__main__":
+	main()
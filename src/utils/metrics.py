@@ -0,0 +1,247 @@
+# metrics.py
+"""
+Operational metrics: counters, gauges and fixed-bucket histograms in one registry, exported by MetricsExporter.
+
+Updating a metric is one attribute add (Counter.inc) or one bisect plus two adds (Histogram.observe), with no
+lock and no allocation, so hot paths (every frame, every depth sample) can update them. Each metric should be
+updated from one thread; the exporter reads them from its own threads and may see a histogram mid-update, which
+is harmless for monitoring. Values kept by other objects (e.g. Orifice's sample counts) are exported through
+callback(), which reads them when the metrics are collected instead of copying them on every update.
+
+Modules create their metrics once, at import or in __init__, from the shared REGISTRY:
+	SAVE_SECONDS = metrics.histogram('bangslots_save_seconds', "GameData.save() duration", metrics.SAVE_BUCKETS)
+	SAVE_SECONDS.observe(elapsed)
+Asking again for the same name and labels returns the same metric.
+
+MetricsExporter serves the registry in Prometheus text format at http://host:port/metrics and/or appends a JSON
+snapshot to a rotating file every interval (counter rates and histogram percentiles over that interval), each from
+a daemon thread. main starts it when METRICS_PORT or METRICS_FILE is set.
+"""
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+FRAME_BUCKETS = (0.001, 0.002, 0.004, 0.006, 0.008, 0.0105, 0.0167, 0.025, 0.0333, 0.05, 0.1, 0.25) # Seconds; 60 and 30 fps budgets are edges
+SAVE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _label_text(labels):
+	if not labels: return ''
+	return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+def _number(value):
+	if value == float('inf'): return '+Inf'
+	return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+	kind = 'counter'
+	__slots__ = ('name', 'labels', 'value')
+	def __init__(self, name, labels):
+		self.name, self.labels, self.value = name, labels, 0
+	def inc(self, amount=1): self.value += amount
+	def read(self): return self.value
+
+class Gauge:
+	kind = 'gauge'
+	__slots__ = ('name', 'labels', 'value')
+	def __init__(self, name, labels):
+		self.name, self.labels, self.value = name, labels, 0
+	def set(self, value): self.value = value
+	def read(self): return self.value
+
+class Callback:
+	"""A counter or gauge whose value is function() at collection time."""
+	__slots__ = ('name', 'labels', 'kind', 'function')
+	def __init__(self, name, labels, kind, function):
+		self.name, self.labels, self.kind, self.function = name, labels, kind, function
+	def read(self): return self.function()
+
+class Histogram:
+	"""Counts observations per bucket: counts[i] is observations <= buckets[i] (and above the previous edge); the last is +Inf."""
+	kind = 'histogram'
+	__slots__ = ('name', 'labels', 'buckets', 'counts', 'sum')
+	def __init__(self, name, labels, buckets):
+		self.name, self.labels = name, labels
+		self.buckets = tuple(sorted(buckets))
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.sum = 0.0
+	def observe(self, value):
+		self.counts[bisect_left(self.buckets, value)] += 1
+		self.sum += value
+	def read(self): return list(self.counts), self.sum
+
+	def quantile(self, q, counts=None):
+		"""Estimates the q quantile by interpolating inside its bucket, as Prometheus' histogram_quantile() does. None if empty."""
+		counts = self.counts if counts is None else counts
+		total = sum(counts)
+		if not total: return None
+		rank = q * total
+		seen = 0
+		for index, count in enumerate(counts):
+			if seen + count >= rank and count:
+				if index == len(self.buckets): return self.buckets[-1] # In +Inf: the highest finite edge is all that is known
+				lower = self.buckets[index - 1] if index else 0.0
+				return lower + (self.buckets[index] - lower) * (rank - seen) / count
+			seen += count
+		return self.buckets[-1]
+
+class Registry:
+	def __init__(self):
+		self.metrics = {} # (name, labels) -> metric, in creation order
+		self.help = {} # name -> help text
+		self._lock = threading.Lock() # Guards creation only; updates don't lock
+
+	def _get(self, name, help_text, labels, factory):
+		key = (name, tuple(sorted(labels.items())))
+		metric = self.metrics.get(key)
+		if metric is not None: return metric
+		with self._lock:
+			metric = self.metrics.get(key)
+			if metric is None:
+				metric = factory(name, key[1])
+				self.metrics[key] = metric
+				self.help.setdefault(name, help_text)
+		return metric
+
+	def counter(self, name, help_text, **labels):
+		return self._get(name, help_text, labels, Counter)
+
+	def gauge(self, name, help_text, **labels):
+		return self._get(name, help_text, labels, Gauge)
+
+	def histogram(self, name, help_text, buckets=FRAME_BUCKETS, **labels):
+		return self._get(name, help_text, labels, lambda name, labels: Histogram(name, labels, buckets))
+
+	def callback(self, name, help_text, function, kind='gauge', **labels):
+		"""Registers (or replaces the function of) a metric read from function() when collected."""
+		metric = self._get(name, help_text, labels, lambda name, labels: Callback(name, labels, kind, function))
+		metric.function = function
+		return metric
+
+	def render(self):
+		"""The Prometheus text exposition of every metric."""
+		by_name = {}
+		for metric in list(self.metrics.values()): by_name.setdefault(metric.name, []).append(metric)
+		lines = []
+		for name, metrics in by_name.items():
+			lines.append(f"# HELP {name} {self.help[name]}")
+			lines.append(f"# TYPE {name} {metrics[0].kind}")
+			for metric in metrics:
+				if metric.kind != 'histogram':
+					try: value = metric.read()
+					except Exception: continue # A callback whose source is gone; leave the sample out
+					if value is None: continue # Nothing to report yet
+					lines.append(f"{name}{_label_text(metric.labels)} {_number(value)}")
+					continue
+				counts, total = metric.read()
+				cumulative = 0
+				for edge, count in zip(metric.buckets + (float('inf'),), counts):
+					cumulative += count
+					lines.append(f"{name}_bucket{_label_text(metric.labels + (('le', _number(edge)),))} {cumulative}")
+				lines.append(f"{name}_sum{_label_text(metric.labels)} {_number(total)}")
+				lines.append(f"{name}_count{_label_text(metric.labels)} {cumulative}")
+		return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+callback = REGISTRY.callback
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+	registry = REGISTRY
+	def do_GET(self):
+		if self.path.split('?')[0] != '/metrics':
+			self.send_error(404)
+			return
+		body = self.registry.render().encode('utf-8')
+		self.send_response(200)
+		self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+	def log_message(self, format, *args): logger.debug("%s - " + format, self.address_string(), *args)
+
+class MetricsExporter:
+	"""
+	Serves a registry over HTTP (port) and/or appends snapshots to a rotating file (filename), each on a daemon thread.
+	Binds to localhost by default: the endpoint is for a local scraper or an SSH tunnel, not the network.
+	"""
+	def __init__(self, registry=REGISTRY, port=None, host='127.0.0.1', filename=None, interval=10.0, max_bytes=1024 * 1024, backup_count=3):
+		self.registry = registry
+		self.port, self.host = port, host
+		self.filename, self.interval = filename, interval
+		self.max_bytes, self.backup_count = max_bytes, backup_count
+		self.server = None
+		self.file_handler = None
+		self._stopping = threading.Event()
+		self._threads = []
+		self._previous = {} # key -> value at the last snapshot, for rates and per-interval percentiles
+		self._previous_time = time.monotonic()
+
+	def start(self):
+		if self.port is not None:
+			handler = type('MetricsHandler', (_MetricsHandler,), {'registry': self.registry})
+			self.server = ThreadingHTTPServer((self.host, self.port), handler)
+			self.server.daemon_threads = True
+			self.port = self.server.server_address[1] # The real port when 0 asked for any free one
+			self._threads.append(threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True))
+			logger.info("Serving metrics at http://%s:%d/metrics", self.host, self.port)
+		if self.filename:
+			self.file_handler = logging.handlers.RotatingFileHandler(self.filename, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+			self._snapshot() # Baseline for the first interval's rates
+			self._threads.append(threading.Thread(target=self._write_loop, name='metrics-file', daemon=True))
+			logger.info("Writing metrics to %s every %.0f s", self.filename, self.interval)
+		for thread in self._threads: thread.start()
+		return self
+
+	def _write_loop(self):
+		while not self._stopping.wait(self.interval): self.write_snapshot()
+
+	def _snapshot(self):
+		"""Collects every metric. Counters get a per-second rate and histograms percentiles over the time since the last call."""
+		now = time.monotonic()
+		elapsed = max(now - self._previous_time, 1e-9)
+		snapshot = {}
+		for key, metric in list(self.registry.metrics.items()):
+			name = metric.name + _label_text(metric.labels)
+			try: value = metric.read()
+			except Exception: continue
+			if metric.kind == 'counter':
+				snapshot[name] = {'total': value, 'per_second': (value - self._previous.get(key, 0)) / elapsed}
+			elif metric.kind == 'histogram':
+				counts, total = value
+				previous_counts, previous_total = self._previous.get(key, ([0] * len(counts), 0.0))
+				interval = [now_count - then_count for now_count, then_count in zip(counts, previous_counts)]
+				observed = sum(interval)
+				entry = {'count': observed, 'mean': (total - previous_total) / observed if observed else None}
+				for q in QUANTILES: entry[f'p{int(q * 100)}'] = metric.quantile(q, interval)
+				snapshot[name] = entry
+			else: snapshot[name] = value
+			self._previous[key] = value
+		self._previous_time = now
+		return snapshot
+
+	def write_snapshot(self):
+		line = json.dumps({'time': time.time(), 'metrics': self._snapshot()})
+		self.file_handler.handle(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO, 'levelname': 'INFO'}))
+
+	def stop(self):
+		"""Writes a last snapshot and stops both threads. Safe to call more than once."""
+		self._stopping.set()
+		if self.server is not None:
+			self.server.shutdown()
+			self.server.server_close()
+			self.server = None
+		for thread in self._threads: thread.join(timeout=2.0)
+		self._threads = []
+		if self.file_handler is not None:
+			self.write_snapshot()
+			self.file_handler.close()
+			self.file_handler = None
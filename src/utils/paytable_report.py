@@ -0,0 +1,155 @@
+# paytable_report.py
+"""
+Exact paytable analytics.
+
+Everything is derived from the logical strip symbol counts in one pass over the dense payout table:
+the number of stop combinations landing on each cell is the outer product of the per-reel counts,
+and bincounts over the cell's paytable entry and payout give per-line hits and the payout PMF.
+No simulation is involved. --paylines adds the exact RTP of multi-line play, per unit bet on each line, for
+the given numbers of lines (the first n of SlotMachine.PAYLINES over the visible window).
+
+Usage:
+	python -m src.utils.paytable_report                       # summary to the console
+	python -m src.utils.paytable_report -o reports/ --format csv json --histogram
+	python -m src.utils.paytable_report --definition config/machine.json
+	python -m src.utils.paytable_report --paylines 1 5 9 27
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import numpy as np
+
+from src.components.slot_machine import SlotMachine
+
+logger = logging.getLogger(__name__)
+
+def analyze(slot_machine, bets=None, payline_counts=None):
+	"""
+	Returns:
+		dict: per-line hit statistics plus, for each bet, RTP, hit rate, variance, standard deviation
+		and the payout probability mass function, and the RTP for each of payline_counts lines played.
+	"""
+	bets = bets or [1, SlotMachine.MAXIMUM_BET]
+	weights = slot_machine.combination_weights().ravel()
+	total = float(weights.sum())
+	entry_hits = np.bincount(slot_machine.dense_entry_indices.ravel() + 1, weights=weights, minlength=len(slot_machine.parsed_paytable) + 1)
+	multipliers, inverse = np.unique(slot_machine.dense_payouts.ravel(), return_inverse=True)
+	multiplier_probabilities = np.bincount(inverse, weights=weights) / total
+	reachable = multiplier_probabilities > 0 # Wins whose symbols a reel doesn't carry can't happen; keep them out of the PMF
+	multipliers, multiplier_probabilities = multipliers[reachable], multiplier_probabilities[reachable]
+	mean = float((multipliers * multiplier_probabilities).sum())
+	variance = float(((multipliers - mean) ** 2 * multiplier_probabilities).sum())
+
+	lines = []
+	for index, entry in enumerate(slot_machine.parsed_paytable):
+		hits = int(entry_hits[index + 1])
+		probability = hits / total
+		lines.append({
+			'combination': entry['original_combo_str'],
+			'name': entry['name'],
+			'payout': entry['payout'],
+			'combinations': hits,
+			'probability': probability,
+			'one_in': (1.0 / probability) if hits else None,
+			'rtp_contribution': probability * entry['payout'] * 100.0
+		})
+	hit_rate = 1.0 - entry_hits[0] / total
+	per_bet = {}
+	for bet in bets: # Wins are wager * multiplier, so the bet scales the distribution without reshaping it
+		per_bet[bet] = {
+			'rtp': mean * 100.0,
+			'hit_rate': hit_rate,
+			'mean_win': mean * bet,
+			'variance': variance * bet * bet,
+			'standard_deviation': (variance ** 0.5) * bet,
+			'pmf': [{'win': int(multiplier * bet), 'probability': float(probability)} for multiplier, probability in zip(multipliers, multiplier_probabilities)]
+		}
+	paylines = []
+	if payline_counts:
+		line_returns = slot_machine.payline_returns(SlotMachine.PAYLINES[:max(payline_counts)])
+		paylines = [{'paylines': count, 'rtp': float(line_returns[:count].mean() * 100.0)} for count in payline_counts]
+	return {'total_combinations': int(total), 'reel_lengths': list(slot_machine.reel_lengths), 'lines': lines, 'bets': per_bet, 'paylines': paylines}
+
+def write_json(report, path):
+	with open(path, 'w', encoding='utf-8') as f:
+		json.dump(report, f, ensure_ascii=False, indent=2)
+	logger.info(f"Wrote {path}")
+
+def write_csv(report, directory):
+	path = os.path.join(directory, 'paytable_lines.csv')
+	with open(path, 'w', newline='', encoding='utf-8') as f:
+		writer = csv.DictWriter(f, fieldnames=list(report['lines'][0].keys()))
+		writer.writeheader()
+		writer.writerows(report['lines'])
+	logger.info(f"Wrote {path}")
+	for bet, stats in report['bets'].items():
+		path = os.path.join(directory, f'payout_pmf_bet{bet}.csv')
+		with open(path, 'w', newline='', encoding='utf-8') as f:
+			writer = csv.DictWriter(f, fieldnames=['win', 'probability'])
+			writer.writeheader()
+			writer.writerows(stats['pmf'])
+		logger.info(f"Wrote {path}")
+
+def render_histogram(stats, bet, path, size=(800, 480)):
+	"""Draws the payout PMF as a log-scale bar chart PNG. Needs only pygame's software surfaces, no display."""
+	import pygame
+	pygame.font.init()
+	font = pygame.font.SysFont(None, 18)
+	surface = pygame.Surface(size)
+	surface.fill((255, 252, 249))
+	left, right, top, bottom = 60, size[0] - 20, 40, size[1] - 60
+	pmf = stats['pmf']
+	log_probabilities = [np.log10(point['probability']) for point in pmf]
+	floor = np.floor(min(log_probabilities))
+	bar_width = (right - left) / len(pmf)
+	for index, (point, log_p) in enumerate(zip(pmf, log_probabilities)):
+		height = (log_p - floor) / -floor * (bottom - top)
+		rect = pygame.Rect(left + index * bar_width + 1, bottom - height, max(1, bar_width - 2), height)
+		pygame.draw.rect(surface, (200, 0, 0) if point['win'] else (120, 120, 120), rect)
+		label = font.render(str(point['win']), True, (0, 0, 0))
+		surface.blit(label, label.get_rect(midtop=(rect.centerx, bottom + 4)))
+	for decade in range(int(floor), 1):
+		y = bottom - (decade - floor) / -floor * (bottom - top)
+		pygame.draw.line(surface, (210, 210, 210), (left, y), (right, y))
+		label = font.render(f"1e{decade}", True, (0, 0, 0))
+		surface.blit(label, label.get_rect(midright=(left - 4, y)))
+	title = f"Payout distribution, bet {bet}: RTP {stats['rtp']:.4f}%  hit rate {stats['hit_rate'] * 100:.2f}%  SD {stats['standard_deviation']:.3f}"
+	surface.blit(font.render(title, True, (0, 0, 0)), (left, 12))
+	surface.blit(font.render("win", True, (0, 0, 0)), ((left + right) // 2, bottom + 30))
+	pygame.image.save(surface, path)
+	logger.info(f"Wrote {path}")
+
+def print_summary(report):
+	print(f"{'Combination':<12}{'Name':<34}{'Pays':>6}{'Combos':>10}{'1 in':>12}{'RTP %':>10}")
+	for line in report['lines']:
+		one_in = f"{line['one_in']:,.1f}" if line['one_in'] else "never"
+		print(f"{line['combination']:<12}{line['name']:<34}{line['payout']:>6}{line['combinations']:>10}{one_in:>12}{line['rtp_contribution']:>10.4f}")
+	print(f"Total combinations: {report['total_combinations']}")
+	for bet, stats in report['bets'].items():
+		print(f"Bet {bet}: RTP {stats['rtp']:.4f}%  hit rate {stats['hit_rate'] * 100:.4f}%  mean win {stats['mean_win']:.4f}  variance {stats['variance']:.4f}  SD {stats['standard_deviation']:.4f}")
+	for entry in report['paylines']: print(f"{entry['paylines']} payline(s): RTP {entry['rtp']:.4f}%")
+
+def main():
+	parser = argparse.ArgumentParser(description="Exact paytable analytics from logical strip counts")
+	parser.add_argument('--definition', help="machine definition JSON (default: the built-in strips)")
+	parser.add_argument('-o', '--output-dir', help="directory for exported files")
+	parser.add_argument('--format', nargs='+', choices=['csv', 'json'], default=[])
+	parser.add_argument('--histogram', action='store_true', help="render a payout PMF PNG per bet")
+	parser.add_argument('--paylines', type=int, nargs='+', default=[], help=f"also report the RTP of playing this many paylines (1-{len(SlotMachine.PAYLINES)})")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+	slot_machine = SlotMachine.from_definition(args.definition) if args.definition else SlotMachine()
+	if any(not 1 <= count <= len(SlotMachine.PAYLINES) for count in args.paylines): parser.error(f"--paylines must be from 1 to {len(SlotMachine.PAYLINES)}")
+	report = analyze(slot_machine, payline_counts=args.paylines)
+	print_summary(report)
+	if (args.format or args.histogram) and not args.output_dir: parser.error("--format and --histogram need --output-dir")
+	if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+	if 'json' in args.format: write_json(report, os.path.join(args.output_dir, 'paytable_report.json'))
+	if 'csv' in args.format: write_csv(report, args.output_dir)
+	if args.histogram:
+		for bet, stats in report['bets'].items(): render_histogram(stats, bet, os.path.join(args.output_dir, f'payout_pmf_bet{bet}.png'))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,117 @@
+# profiles.py
+"""
+Player profile tool for the SQLite ProfileStore (PROFILE=name python main.py).
+
+	python -m src.utils.profiles list                            # every profile's money and last save; safe while the game runs
+	python -m src.utils.profiles import gamedata.sav alice       # adds a pickled save as a profile
+	python -m src.utils.profiles benchmark --saves 5000 --profiles 200 --readers 2
+
+The benchmark saves a changing GameData --saves times, round robin over --profiles profiles, in three ways:
+- pickle: GameData.save() to a gamedata.sav, as without a store (one file, so one profile)
+- commit: GameData.save() into a ProfileStore, then flush(): one SQLite transaction per save
+- write-back: GameData.save() into a ProfileStore, leaving the commits to its writer thread
+It reports saves per second (write-back includes the final flush in close()) and how long each save blocks the
+calling thread, which in the game is the frame loop. For the SQLite modes it also reports the transactions
+committed and how many profile listings --readers other connections (a dashboard) completed per second meanwhile.
+Each mode runs in a fresh temporary directory.
+"""
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MODES = ('pickle', 'commit', 'write-back')
+
+def _list_continuously(path, stop, counts, index):
+	connection = sqlite3.connect(path, timeout=5.0)
+	while not stop.is_set():
+		connection.execute("SELECT name, money, updated FROM profiles ORDER BY name").fetchall()
+		counts[index] += 1
+	connection.close()
+
+def run_mode(mode, saves, profile_count, readers, flush_interval, synchronous):
+	from src.components.game_data import GameData
+	from src.components.profile_store import ProfileStore
+	directory = Path(tempfile.mkdtemp())
+	store = None
+	if mode == 'pickle': profiles = [GameData.load_or_create(directory)]
+	else:
+		store = ProfileStore(directory / ProfileStore.FILENAME, flush_interval, synchronous)
+		profiles = [store.load_or_create(f"player{index:04d}") for index in range(profile_count)]
+		store.flush()
+	stop = threading.Event()
+	reads = [0] * readers
+	threads = [threading.Thread(target=_list_continuously, args=(store.path, stop, reads, index), daemon=True) for index in range(readers)] if store else []
+	for thread in threads: thread.start()
+	transactions_before = store.transactions if store else 0
+	blocked = []
+	started = time.perf_counter()
+	for index in range(saves):
+		profile = profiles[index % len(profiles)]
+		profile.money += 1 # Something changes with every save, as with a spin
+		save_started = time.perf_counter()
+		profile.save()
+		if mode == 'commit': store.flush()
+		blocked.append(time.perf_counter() - save_started)
+	if store: store.close()
+	elapsed = time.perf_counter() - started
+	stop.set()
+	for thread in threads: thread.join()
+	blocked.sort()
+	return {
+		'saves_per_second': saves / elapsed,
+		'mean_us': sum(blocked) / len(blocked) * 1e6,
+		'p99_us': blocked[int(len(blocked) * 0.99)] * 1e6,
+		'max_us': blocked[-1] * 1e6,
+		'transactions': store.transactions - transactions_before if store else None,
+		'reads_per_second': sum(reads) / elapsed if threads else None
+	}
+
+def benchmark(args):
+	print(f"{'Mode':<12}{'saves/s':>10}{'mean us':>10}{'p99 us':>10}{'max us':>10}{'commits':>9}{'reads/s':>10}")
+	for mode in args.modes:
+		result = run_mode(mode, args.saves, args.profiles, args.readers, args.flush_interval, args.synchronous)
+		commits = '' if result['transactions'] is None else result['transactions']
+		reads = '' if result['reads_per_second'] is None else f"{result['reads_per_second']:.0f}"
+		print(f"{mode:<12}{result['saves_per_second']:>10.0f}{result['mean_us']:>10.1f}{result['p99_us']:>10.1f}{result['max_us']:>10.1f}{commits:>9}{reads:>10}")
+
+def main():
+	from src.components.profile_store import ProfileStore
+	parser = argparse.ArgumentParser(description="List, import and benchmark player profiles")
+	parser.add_argument('--db', type=Path, default=PROJECT_ROOT / ProfileStore.FILENAME)
+	commands = parser.add_subparsers(dest='command', required=True)
+	commands.add_parser('list', help="every profile's money and last save")
+	importer = commands.add_parser('import', help="add a pickled gamedata.sav as a profile")
+	importer.add_argument('save', type=Path)
+	importer.add_argument('name')
+	importer.add_argument('--replace', action='store_true', help="overwrite an existing profile; not one the game has loaded")
+	bench = commands.add_parser('benchmark', help="saves per second: pickle file, commit per save, write-back")
+	bench.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES)
+	bench.add_argument('--saves', type=int, default=5000)
+	bench.add_argument('--profiles', type=int, default=100)
+	bench.add_argument('--readers', type=int, default=1, help="connections listing profiles during the run")
+	bench.add_argument('--flush-interval', type=float, default=1.0)
+	bench.add_argument('--synchronous', default='NORMAL', choices=['OFF', 'NORMAL', 'FULL'])
+	args = parser.parse_args()
+	if args.command == 'benchmark':
+		benchmark(args)
+		return
+	if args.command == 'list':
+		if not args.db.exists(): parser.error(f"no profile database at {args.db}")
+		connection = sqlite3.connect(f"{args.db.resolve().as_uri()}?mode=ro", uri=True, timeout=5.0) # A reader only, like a dashboard
+		for name, money, updated in connection.execute(ProfileStore.SELECT_SUMMARY):
+			print(f"{name:<24}${money:<14}{datetime.fromtimestamp(updated):%Y-%m-%d %H:%M:%S}")
+		connection.close()
+		return
+	store = ProfileStore(args.db)
+	try: store.import_pickle(args.save, args.name, args.replace)
+	except ValueError as e: parser.error(str(e))
+	finally: store.close()
+	print(f"Imported {args.save} as '{args.name}'")
+
+if __name__ == "__main__":
+	main()
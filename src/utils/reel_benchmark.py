@@ -0,0 +1,128 @@
+# reel_benchmark.py
+"""
+Reel renderer benchmark: StripReel (one pre-rendered surface per reel) against TileReel (the viewport composed from
+symbol tiles each frame), see reel_renderer.py.
+
+Both renderers draw the game's own strips, then --reels generated strips of --stops visual stops (symbols alternating
+with blanks, like the game's), spinning at the slot screen's free-spin speed. For each it reports the time to build
+the reels, the pixel memory they own (the symbol images are shared with the asset cache and left out), and the time
+to draw every reel's viewport per frame, before present. It also draws both at the same positions and checks that
+the viewports are pixel for pixel the same. Exits 1 if they differ.
+
+Usage:
+	python -m src.utils.reel_benchmark                                 # game strips, then 5 reels of 64 stops
+	python -m src.utils.reel_benchmark --stops 128 --reels 8 --frames 2000
+	RENDER_BACKEND=texture python -m src.utils.reel_benchmark
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pygame
+
+from src.components.reel_renderer import RENDERERS, create_reel
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SIZE = (800, 480)
+BLANK = '□'
+
+def generated_strips(symbol_keys, reels, stops, seed):
+	rng = random.Random(seed)
+	return [[rng.choice(symbol_keys) if stop % 2 == 0 else BLANK for stop in range(stops)] for _ in range(reels)]
+
+def owned_bytes(reels):
+	"""Pixel bytes of the surfaces the reels hold themselves, not the shared symbol images."""
+	return sum(value.get_pitch() * value.get_height() for reel in reels for value in vars(reel).values() if isinstance(value, pygame.Surface))
+
+def positions(cycle_height, frames, speed):
+	"""Scroll positions of a reel spinning upwards at speed pixels per 60 Hz frame, wrapped like the screen's."""
+	y, result = 0.0, []
+	for _ in range(frames):
+		y -= speed
+		if y < 0: y += cycle_height
+		result.append(y)
+	return result
+
+def measure(kind, strips, symbol_images, viewport_size, canvas, prepare_surface, frames, speed):
+	started = time.perf_counter()
+	reels = [create_reel(kind, strip, symbol_images, viewport_size, prepare_surface) for strip in strips]
+	build_seconds = time.perf_counter() - started
+	tracks = [positions(reel.cycle_height, frames, speed) for reel in reels]
+	times = []
+	for frame in range(frames):
+		started = time.perf_counter()
+		for index, reel in enumerate(reels): reel.draw(canvas, (10 + index * (viewport_size[0] + 6), 10), tracks[index][frame])
+		times.append(time.perf_counter() - started)
+		pygame.event.pump()
+		canvas.present()
+	times.sort()
+	return {
+		'build_ms': build_seconds * 1000.0,
+		'owned_kb': owned_bytes(reels) / 1024.0,
+		'mean_us': sum(times) / len(times) * 1e6,
+		'p95_us': times[int(len(times) * 0.95)] * 1e6
+	}
+
+def mismatches(strips, symbol_images, viewport_size, canvas, prepare_surface, samples, seed):
+	"""Positions (reel, y) where the renderers draw different pixels, out of samples random ones per reel."""
+	rng = random.Random(seed)
+	found = []
+	for reel_index, strip in enumerate(strips):
+		reels = [create_reel(kind, strip, symbol_images, viewport_size, prepare_surface) for kind in RENDERERS]
+		for _ in range(samples):
+			y = rng.uniform(0, reels[0].cycle_height)
+			images = []
+			for reel in reels:
+				canvas.fill((255, 0, 255))
+				reel.draw(canvas, (0, 0), y)
+				images.append(pygame.image.tobytes(canvas.snapshot().subsurface((0, 0, *viewport_size)), 'RGB'))
+			if images[0] != images[1]: found.append((reel_index, y))
+	return found
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare the pre-rendered strip and tiled reel renderers")
+	parser.add_argument('--stops', type=int, default=64, help="visual stops per generated reel, blanks included")
+	parser.add_argument('--reels', type=int, default=5)
+	parser.add_argument('--frames', type=int, default=1000)
+	parser.add_argument('--samples', type=int, default=200, help="random positions per reel for the pixel comparison")
+	parser.add_argument('--seed', type=int, default=1)
+	args = parser.parse_args()
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.slot_game_screen import SlotGameScreen
+	from src.utils.render_benchmark import SweepDevice
+
+	pygame.init()
+	canvas = create_canvas(os.environ.get('RENDER_BACKEND', 'surface'), SIZE, "Reel benchmark")
+	asset_manager = AssetManager(PROJECT_ROOT)
+	screen = SlotGameScreen(canvas, SweepDevice(), asset_manager, GameData.load_or_create(Path(tempfile.mkdtemp()))) # For its symbol images and strips
+	symbol_images = screen.symbol_images
+	viewport_size = (screen.reel_viewport_width, screen.reel_viewport_height)
+	speed = screen.spin_speed_normal / 60.0
+	symbol_keys = [key for key in symbol_images if key != BLANK]
+	layouts = [
+		(f"game {len(screen.visual_strips_data)}x{len(screen.visual_strips_data[0])}", screen.visual_strips_data),
+		(f"{args.reels}x{args.stops}", generated_strips(symbol_keys, args.reels, args.stops, args.seed))
+	]
+	failures = 0
+	print(f"Canvas: {canvas.name}")
+	print(f"{'Reels':<12}{'Renderer':<10}{'build ms':>10}{'owned KB':>10}{'draw us':>10}{'p95 us':>10}")
+	for label, strips in layouts:
+		for kind in RENDERERS:
+			result = measure(kind, strips, symbol_images, viewport_size, canvas, asset_manager.prepare_surface, args.frames, speed)
+			print(f"{label:<12}{kind:<10}{result['build_ms']:>10.2f}{result['owned_kb']:>10.0f}{result['mean_us']:>10.1f}{result['p95_us']:>10.1f}")
+		found = mismatches(strips, symbol_images, viewport_size, canvas, asset_manager.prepare_surface, args.samples, args.seed)
+		if found:
+			failures += 1
+			print(f"{label:<12}pixels differ at {len(found)} of {args.samples * len(strips)} positions, e.g. reel {found[0][0]} y={found[0][1]:.2f}")
+		else: print(f"{label:<12}identical pixels at {args.samples * len(strips)} positions")
+	pygame.quit()
+	sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,180 @@
+# reel_optimizer.py
+"""
+Reel composition optimizer.
+
+Searches per-reel symbol counts for a target RTP and volatility. Every candidate is scored exactly
+from its symbol counts (no simulation): with c_r the count vector of reel r and P the dense payout
+table, the expected payout is sum(P[i,j,k] * c0[i] * c1[j] * c2[k]) / (N0 * N1 * N2), and the second
+moment is the same contraction over P squared. Whole populations of candidates are contracted in one
+einsum call, and independent searches run in a process pool, one seed stream per worker.
+
+Usage:
+	python -m src.utils.reel_optimizer --target-rtp 95.5 --target-sd 9 --min-blanks 10 --jackpot-odds 100000 400000 -o config/machine.json
+
+The output JSON loads with SlotMachine.from_definition().
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import string
+import time
+import numpy as np
+
+from src.components.slot_machine import SlotMachine
+
+logger = logging.getLogger(__name__)
+
+BLANK_SYMBOL = '□'
+
+class CompositionScorer:
+	"""Exact, vectorized statistics for batches of candidate compositions of one SlotMachine's symbols."""
+	def __init__(self, slot_machine):
+		self.slot_machine = slot_machine
+		payouts = slot_machine.dense_payouts.astype(np.float64)
+		reel_count = payouts.ndim
+		axes = string.ascii_lowercase[:reel_count]
+		# e.g. 'abc,zc,zb,za->z': contract the last reel first so intermediates stay (batch, symbols, ...)
+		self._contraction = f"{axes}," + ",".join(f"z{axis}" for axis in reversed(axes)) + "->z"
+		self.payouts = payouts
+		self.payouts_squared = payouts ** 2
+		self.jackpot_mask = (payouts == payouts.max()).astype(np.float64)
+
+	def score(self, counts):
+		"""
+		Args:
+			counts (np.ndarray): (batch, reels, symbols) symbol counts
+
+		Returns:
+			dict of (batch,) arrays: rtp (percent), sd (per unit bet), jackpot_odds (1 in N)
+		"""
+		counts = counts.astype(np.float64)
+		per_reel = [counts[:, reel] for reel in reversed(range(counts.shape[1]))]
+		combinations = np.prod(counts.sum(axis=2), axis=1)
+		mean = np.einsum(self._contraction, self.payouts, *per_reel, optimize=True) / combinations
+		second = np.einsum(self._contraction, self.payouts_squared, *per_reel, optimize=True) / combinations
+		jackpot = np.einsum(self._contraction, self.jackpot_mask, *per_reel, optimize=True) / combinations
+		with np.errstate(divide='ignore'):
+			jackpot_odds = np.where(jackpot > 0, 1.0 / jackpot, np.inf)
+		return {'rtp': mean * 100.0, 'sd': np.sqrt(np.maximum(second - mean ** 2, 0.0)), 'jackpot_odds': jackpot_odds}
+
+def _objective(stats, counts, settings, blank_index):
+	cost = ((stats['rtp'] - settings['target_rtp']) / settings['rtp_tolerance']) ** 2
+	if settings['target_sd'] is not None: cost = cost + ((stats['sd'] - settings['target_sd']) / settings['sd_tolerance']) ** 2
+	feasible = (counts >= settings['min_count']).all(axis=(1, 2))
+	if blank_index is not None: feasible &= (counts[:, :, blank_index] >= settings['min_blanks']).all(axis=1)
+	low, high = settings['jackpot_odds']
+	feasible &= (stats['jackpot_odds'] >= low) & (stats['jackpot_odds'] <= high) & np.isfinite(stats['jackpot_odds']) # A machine must be able to hit its top award
+	return np.where(feasible, cost, np.inf)
+
+def _mutate(counts, rng, min_count):
+	"""Moves one stop per reel-row from a random symbol to another, keeping every reel's total fixed."""
+	batch, reels, symbols = counts.shape
+	mutated = counts.copy()
+	rows = np.arange(batch)
+	reel = rng.integers(0, reels, batch)
+	source = rng.integers(0, symbols, batch)
+	target = (source + rng.integers(1, symbols, batch)) % symbols
+	movable = mutated[rows, reel, source] > min_count
+	mutated[rows[movable], reel[movable], source[movable]] -= 1
+	mutated[rows[movable], reel[movable], target[movable]] += 1
+	return mutated
+
+def search(settings, seed_sequence):
+	"""One independent search: a population hill-climbs with batched mutations for a fixed time."""
+	slot_machine = SlotMachine(settings['compositions'])
+	scorer = CompositionScorer(slot_machine)
+	blank_index = slot_machine.symbol_ids.get(BLANK_SYMBOL)
+	rng = np.random.default_rng(seed_sequence)
+	population_size, offspring = settings['population'], settings['offspring']
+	population = np.repeat(slot_machine.symbol_counts[None], population_size, axis=0)
+	for _ in range(settings['scramble']): population = _mutate(population, rng, settings['min_count']) # Spread the starting points out
+	costs = _objective(scorer.score(population), population, settings, blank_index)
+	evaluated = population_size
+	deadline = time.perf_counter() + settings['seconds']
+	while time.perf_counter() < deadline:
+		children = _mutate(np.repeat(population, offspring, axis=0), rng, settings['min_count'])
+		for _ in range(int(rng.integers(0, 3))): children = _mutate(children, rng, settings['min_count']) # Occasionally take bigger steps
+		child_costs = _objective(scorer.score(children), children, settings, blank_index).reshape(population_size, offspring)
+		evaluated += len(children)
+		best_child = child_costs.argmin(axis=1)
+		best_child_cost = child_costs[np.arange(population_size), best_child]
+		improved = best_child_cost <= costs
+		population[improved] = children.reshape(population_size, offspring, *children.shape[1:])[improved, best_child[improved]]
+		costs[improved] = best_child_cost[improved]
+	best = int(costs.argmin())
+	return float(costs[best]), population[best], evaluated
+
+def build_definition(slot_machine, counts):
+	scorer = CompositionScorer(slot_machine)
+	stats = {key: float(value[0]) for key, value in scorer.score(counts[None]).items()}
+	return {
+		'logical_strips_compositions': slot_machine.counts_to_compositions(counts),
+		'rtp': round(stats['rtp'], 4),
+		'standard_deviation': round(stats['sd'], 4),
+		'jackpot_odds': round(stats['jackpot_odds'], 1),
+		'reel_lengths': [int(total) for total in counts.sum(axis=1)]
+	}
+
+def main():
+	parser = argparse.ArgumentParser(description="Search reel compositions for a target RTP and volatility")
+	parser.add_argument('--target-rtp', type=float, required=True, help="percent, e.g. 95.5")
+	parser.add_argument('--rtp-tolerance', type=float, default=0.05, help="percent; cost is measured in these units")
+	parser.add_argument('--target-sd', type=float, help="standard deviation per unit bet (volatility)")
+	parser.add_argument('--sd-tolerance', type=float, default=0.5)
+	parser.add_argument('--reel-lengths', type=int, nargs='+', help="total stops per reel (default: current machine)")
+	parser.add_argument('--min-blanks', type=int, default=0, help="minimum blank stops on every reel")
+	parser.add_argument('--min-count', type=int, default=1, help="minimum stops for every symbol, so every paytable line stays reachable")
+	parser.add_argument('--jackpot-odds', type=float, nargs=2, default=(0.0, float('inf')), metavar=('MIN', 'MAX'), help="allowed 1-in-N band for the top award; candidates that can never hit it are always rejected")
+	parser.add_argument('--seconds', type=float, default=10.0, help="search time per worker")
+	parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+	parser.add_argument('--population', type=int, default=64)
+	parser.add_argument('--offspring', type=int, default=32, help="mutations scored per population member per step")
+	parser.add_argument('--seed', type=int)
+	parser.add_argument('-o', '--output', help="write the best machine definition to this JSON file")
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+	slot_machine = SlotMachine()
+	counts = slot_machine.symbol_counts.copy()
+	if args.reel_lengths: # Rescale the current compositions to the requested reel sizes
+		for reel, length in enumerate(args.reel_lengths):
+			scaled = np.maximum(args.min_count, np.floor(counts[reel] * length / counts[reel].sum())).astype(np.int64)
+			scaled[scaled.argmax()] += length - scaled.sum()
+			counts[reel] = scaled
+	settings = {
+		'compositions': slot_machine.counts_to_compositions(counts),
+		'target_rtp': args.target_rtp, 'rtp_tolerance': args.rtp_tolerance,
+		'target_sd': args.target_sd, 'sd_tolerance': args.sd_tolerance,
+		'min_blanks': args.min_blanks, 'min_count': args.min_count,
+		'jackpot_odds': tuple(args.jackpot_odds),
+		'seconds': args.seconds, 'population': args.population, 'offspring': args.offspring,
+		'scramble': int(counts.sum()) # Enough random moves to wander well away from the starting strips
+	}
+	seeds = np.random.SeedSequence(args.seed).spawn(args.workers)
+	logger.info(f"Searching with {args.workers} worker(s) for {args.seconds}s each")
+	started = time.perf_counter()
+	if args.workers > 1:
+		with multiprocessing.Pool(args.workers) as pool:
+			results = pool.starmap(search, [(settings, seed) for seed in seeds])
+	else:
+		results = [search(settings, seeds[0])]
+	elapsed = time.perf_counter() - started
+	evaluated = sum(result[2] for result in results)
+	cost, best_counts, _ = min(results, key=lambda result: result[0])
+	logger.info(f"Scored {evaluated:,} candidates in {elapsed:.1f}s ({evaluated / elapsed:,.0f}/s)")
+	if not np.isfinite(cost):
+		logger.error("No candidate satisfied the constraints. Loosen --min-blanks, --jackpot-odds or --min-count.")
+		return
+	definition = build_definition(SlotMachine(settings['compositions']), best_counts)
+	logger.info(f"Best: RTP {definition['rtp']}%, SD {definition['standard_deviation']}, jackpot 1 in {definition['jackpot_odds']:,.0f}")
+	text = json.dumps(definition, ensure_ascii=False, indent=2, allow_nan=False)
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			f.write(text)
+		logger.info(f"Machine definition written to {args.output}")
+	else:
+		print(text)
+
+if __name__ == "__main__":
+	main()
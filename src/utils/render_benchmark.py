@@ -0,0 +1,115 @@
+# render_benchmark.py
+"""
+Render backend benchmark.
+
+Renders every screen in SCREEN_CLASSES for a fixed number of frames on each backend and reports the
+time spent drawing and presenting a frame. The first frames run under the fade-in, so the fade path
+is measured too. Each backend runs in its own process, because an SDL window can't switch between a
+display surface and a renderer.
+
+With --scales and --output-sizes it runs every backend once per scale mode and panel size (see
+render_backend.py), so the cost of scaling the 800x480 frame up to each resolution shows as frame time.
+The Output column is the window size SDL actually gave; 'scaled' picks its own from the desktop.
+
+Usage:
+	python -m src.utils.render_benchmark                         # both backends, 300 frames per screen
+	SDL_VIDEODRIVER=dummy python -m src.utils.render_benchmark   # headless (texture backend on SDL's software renderer)
+	python -m src.utils.render_benchmark --backends surface --scales none nearest smooth --output-sizes 1280x768 1920x1080
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.components.render_backend import SCALE_MODES
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SIZE = (800, 480)
+
+class SweepDevice:
+	"""Stands in for Orifice: a slow full-range depth sweep driven by the frame counter."""
+	def __init__(self):
+		self.depth = 0
+		self.latched_change_time = None # No sample timestamps, so the latency tracer records nothing
+	def step(self, frame): self.depth = int(512 - 512 * math.cos(frame / 40.0))
+	def close(self): pass
+
+def parse_size(text):
+	width, height = text.lower().split('x')
+	return (int(width), int(height))
+
+def run_backend(backend, frames, fade, scale='none', output_size=None):
+	import pygame
+	from src.components.asset_manager import AssetManager
+	from src.components.game_data import GameData
+	from src.components.render_backend import create_canvas
+	from src.components.screens import SCREEN_CLASSES
+
+	pygame.init()
+	canvas = create_canvas(backend, SIZE, "Render benchmark", scale=scale, output_size=output_size)
+	asset_manager = AssetManager(PROJECT_ROOT)
+	game_data = GameData.load_or_create(Path(tempfile.mkdtemp())) # Never touch the real save
+	device = SweepDevice()
+	output = canvas.window.size if hasattr(canvas, 'window') else pygame.display.get_window_size()
+	results = {'backend': canvas.name, 'output': f"{output[0]}x{output[1]}", 'screens': {}}
+	for name, screen_class in SCREEN_CLASSES.items():
+		screen = screen_class(canvas, device, asset_manager, game_data)
+		screen.on_enter()
+		screen.fade_from_black(fade, screen.on_ready)
+		times = []
+		for frame in range(frames):
+			device.step(frame)
+			pygame.event.pump()
+			screen.advance(1.0 / 60.0)
+			started = time.perf_counter()
+			screen.render()
+			canvas.present()
+			times.append(time.perf_counter() - started)
+		times.sort()
+		results['screens'][name] = {
+			'mean_ms': sum(times) / len(times) * 1000.0,
+			'p50_ms': times[len(times) // 2] * 1000.0,
+			'p95_ms': times[int(len(times) * 0.95)] * 1000.0
+		}
+	if hasattr(canvas, 'uploads'): results['texture_uploads'] = canvas.uploads
+	pygame.quit()
+	return results
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare the surface and texture render backends")
+	parser.add_argument('--backends', nargs='+', default=['surface', 'texture'], choices=['surface', 'texture'])
+	parser.add_argument('--frames', type=int, default=300, help="frames rendered per screen")
+	parser.add_argument('--fade', type=float, default=0.4, help="fade-in seconds at the start of each screen")
+	parser.add_argument('--scales', nargs='+', default=['none'], choices=SCALE_MODES, help="how the 800x480 frame reaches the window")
+	parser.add_argument('--output-sizes', nargs='+', type=parse_size, default=[None], metavar='WxH', help="window sizes to scale to (default the desktop's)")
+	parser.add_argument('--child', help=argparse.SUPPRESS) # Internal: run one configuration and print JSON
+	parser.add_argument('--child-scale', default='none', help=argparse.SUPPRESS)
+	parser.add_argument('--child-size', type=parse_size, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+	if args.child:
+		print(json.dumps(run_backend(args.child, args.frames, args.fade, args.child_scale, args.child_size)))
+		return
+	runs = []
+	for backend in args.backends:
+		for scale in args.scales:
+			sizes = [None] if scale in ('none', 'scaled') else args.output_sizes # Those two don't take a size
+			for size in sizes:
+				command = [sys.executable, '-m', 'src.utils.render_benchmark', '--child', backend, '--frames', str(args.frames), '--fade', str(args.fade), '--child-scale', scale]
+				if size: command += ['--child-size', f"{size[0]}x{size[1]}"]
+				output = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True, env=os.environ, check=True).stdout
+				runs.append((backend, scale, json.loads(output.strip().splitlines()[-1])))
+	print(f"{'Backend':<10}{'Scale':<9}{'Output':<11}{'Screen':<18}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+	for requested, scale, results in runs:
+		label = results['backend'] if results['backend'] == requested else f"{requested}->{results['backend']}" # Shows a fallback
+		prefix = f"{label:<10}{scale:<9}{results['output']:<11}"
+		for name, stats in results['screens'].items():
+			print(f"{prefix}{name:<18}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+		if 'texture_uploads' in results: print(f"{prefix}{'texture uploads':<18}{results['texture_uploads']:>10}")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,134 @@
+# rng.py
+"""
+Reproducible, block-buffered random streams for reel stops.
+
+Every StopStream wraps its own NumPy Generator seeded from a SeedSequence, so a session or worker
+can be replayed from its seed and parallel workers get statistically independent streams via spawn().
+Stops are drawn a block at a time and handed out from a buffer, which makes a single spin a list
+lookup and keeps the sequence identical no matter how callers batch their draws.
+
+Run `python -m src.utils.rng` for the chi-square and reproducibility checks.
+"""
+import argparse
+import math
+import sys
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 4096
+
+class StopStream:
+	def __init__(self, reel_lengths, seed=None, block_size=DEFAULT_BLOCK_SIZE):
+		"""
+		Args:
+			reel_lengths (list[int]): number of logical stops on each reel
+			seed (int | np.random.SeedSequence | None): None draws fresh OS entropy
+			block_size (int): spins drawn per refill
+		"""
+		self.reel_lengths = np.asarray(reel_lengths, dtype=np.int64)
+		self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+		stops_seed, choice_seed = self.seed_sequence.spawn(2) # Visual choices get their own stream so they never shift the outcomes
+		self.generator = np.random.default_rng(stops_seed)
+		self.choice_generator = np.random.default_rng(choice_seed)
+		self.block_size = block_size
+		self._block = np.empty((0, len(self.reel_lengths)), dtype=np.int64)
+		self._block_rows = []
+		self._position = block_size # Empty buffer; first use triggers a refill
+		self._uniforms = []
+		self._uniform_position = 0
+
+	def spawn(self, count, block_size=None):
+		"""Independent child streams, e.g. one per session or worker process."""
+		return [StopStream(self.reel_lengths, child, block_size or self.block_size) for child in self.seed_sequence.spawn(count)]
+
+	def _refill(self):
+		self._block = self.generator.integers(0, self.reel_lengths, size=(self.block_size, len(self.reel_lengths)))
+		self._block_rows = self._block.tolist()
+		self._position = 0
+
+	def next_stops(self):
+		"""One spin's logical stop indices as a list of ints."""
+		if self._position == self.block_size: self._refill()
+		stops = self._block_rows[self._position]
+		self._position += 1
+		return stops
+
+	def draw(self, count):
+		"""A (count, reels) array of stops, continuing the same sequence next_stops() hands out."""
+		chunks = []
+		while count > 0:
+			if self._position == self.block_size: self._refill()
+			taken = min(count, self.block_size - self._position)
+			chunks.append(self._block[self._position:self._position + taken])
+			self._position += taken
+			count -= taken
+		if not chunks: return np.empty((0, len(self.reel_lengths)), dtype=np.int64)
+		return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+	def choice(self, options):
+		"""Uniform pick from a sequence, from the buffered visual-choice stream."""
+		if self._uniform_position == len(self._uniforms):
+			self._uniforms = self.choice_generator.random(self.block_size).tolist()
+			self._uniform_position = 0
+		u = self._uniforms[self._uniform_position]
+		self._uniform_position += 1
+		return options[int(u * len(options))]
+
+def chi_square_uniform(observed):
+	"""
+	Pearson chi-square test of observed counts against a uniform distribution.
+
+	Returns:
+		tuple: (statistic, degrees_of_freedom, p_value). The p-value uses the Wilson-Hilferty
+		normal approximation, which is accurate for the tens-to-hundreds of cells a reel has.
+	"""
+	observed = np.asarray(observed, dtype=np.float64)
+	expected = observed.sum() / len(observed)
+	statistic = float(((observed - expected) ** 2 / expected).sum())
+	dof = len(observed) - 1
+	z = ((statistic / dof) ** (1.0 / 3.0) - (1.0 - 2.0 / (9.0 * dof))) / math.sqrt(2.0 / (9.0 * dof))
+	return statistic, dof, 0.5 * math.erfc(z / math.sqrt(2.0))
+
+def stop_frequency_report(stream, spins):
+	"""Chi-square result per reel for `spins` draws from stream."""
+	stops = stream.draw(spins)
+	return [chi_square_uniform(np.bincount(stops[:, reel], minlength=length)) for reel, length in enumerate(stream.reel_lengths)]
+
+def run_checks(reel_lengths, spins, seed, streams, alpha):
+	failures = 0
+	root = StopStream(reel_lengths, seed)
+	for index, stream in enumerate([root] + root.spawn(streams)):
+		label = "root" if index == 0 else f"child {index}"
+		for reel, (statistic, dof, p_value) in enumerate(stop_frequency_report(stream, spins)):
+			passed = p_value >= alpha
+			failures += not passed
+			print(f"{label:>8} reel {reel}: chi2={statistic:9.2f} dof={dof:4d} p={p_value:.4f} {'ok' if passed else 'FAIL'}")
+
+	single = StopStream(reel_lengths, seed, block_size=257)
+	chunked = StopStream(reel_lengths, seed, block_size=257)
+	expected = np.array([single.next_stops() for _ in range(1000)])
+	actual = np.concatenate([chunked.draw(n) for n in (1, 99, 300, 600)])
+	reproducible = np.array_equal(expected, actual)
+	failures += not reproducible
+	print(f"same seed, different batching: {'identical' if reproducible else 'DIVERGED'}")
+
+	a, b = root.spawn(2)
+	overlap = np.mean(np.all(a.draw(spins) == b.draw(spins), axis=1)) # Fraction of identical spins between sibling streams
+	independent = overlap < 5.0 / np.prod(np.asarray(reel_lengths, dtype=np.float64)) + 1e-3
+	failures += not independent
+	print(f"sibling stream collision rate: {overlap:.6f} {'ok' if independent else 'FAIL'}")
+	return failures
+
+def main():
+	from src.components.slot_machine import SlotMachine
+	parser = argparse.ArgumentParser(description="Statistical checks for StopStream")
+	parser.add_argument('--spins', type=int, default=1_000_000)
+	parser.add_argument('--seed', type=int, default=20240601)
+	parser.add_argument('--streams', type=int, default=4, help="spawned child streams to check alongside the root")
+	parser.add_argument('--alpha', type=float, default=0.001, help="p-value below which a reel fails")
+	args = parser.parse_args()
+	failures = run_checks(SlotMachine().reel_lengths, args.spins, args.seed, args.streams, args.alpha)
+	print("PASS" if failures == 0 else f"{failures} check(s) failed")
+	sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+	main()